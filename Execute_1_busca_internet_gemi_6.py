@@ -5,11 +5,15 @@ Extrator FAPESP - Versão Funcional Completa
 Com batch configurável e formato de saída específico
 """
 
-import json
+import asyncio
+import hashlib
 import os
+import shelve
 import sys
 import time
+import unicodedata
 import pandas as pd
+from dataclasses import fields, make_dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -34,35 +38,69 @@ def configurar_api_key():
 # Importar dependências
 try:
     import google.generativeai as genai
-    from selenium import webdriver
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.common.keys import Keys
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.chrome.service import Service
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    from selenium.common.exceptions import TimeoutException, NoSuchElementException
+    from google.api_core import exceptions as google_exceptions
+    import orjson
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+    from playwright.async_api import async_playwright
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    from playwright.async_api import Error as PlaywrightError
     
-    try:
-        from webdriver_manager.chrome import ChromeDriverManager
-        WEBDRIVER_MANAGER_OK = True
-    except ImportError:
-        WEBDRIVER_MANAGER_OK = False
-        
 except ImportError as e:
     print(f"❌ Erro: {e}")
-    print("Execute: pip install google-generativeai selenium pandas webdriver-manager")
+    print("Execute: pip install google-generativeai playwright pandas pyarrow orjson")
+    print("Depois: playwright install chromium")
     sys.exit(1)
 
+# Opcional: barra de progresso da coleta no modo batch
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+# Opcional: lê perfis por HTTP, sem renderizar no navegador
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
 # Configurações
 CONFIG = {
     'PASTA_NOMES': Path("/home/phelipe/Documentos/Scrips_projeto_FAPES_PHELIPE/Olho_de_ferro/Passo_1_Lista_nomes_cvs"), #entrada dos arquivos
 'PASTA_RESULTADOS': Path("/home/phelipe/Documentos/Scrips_projeto_FAPES_PHELIPE/Olho_de_ferro/Passo_2_json_extraido"), #saida dos arquivos
-    'TIMEOUT_SELENIUM': 20,
+    'TIMEOUT_NAVEGADOR': 20,
+    'TIMEOUT_RESULTADO_BUSCA': 8,
+    'TIMEOUT_SONDA_BUSCA': 2,  # por seletor, ao descobrir qual campo de busca existe
     'DELAY_ENTRE_REQUESTS': 3,
-    'MAX_TENTATIVAS': 3
+    'CONCORRENCIA': 4,  # abas simultâneas no navegador
+    'CONCORRENCIA_GEMINI': 2,  # chamadas simultâneas ao Gemini
+    'GEMINI_RPM': 15,  # requisições por minuto permitidas pela cota da API
+    'SELETOR_PERFIL': 'main, #content, .researcher-profile',  # região útil da página
+    'MIN_CARACTERES_PERFIL': 200,  # abaixo disso usa o <body> inteiro
+    'MAX_CARACTERES_PAGINA': 10000,  # limite de texto enviado ao Gemini
+    'ARQUIVOS_INDIVIDUAIS': True,  # JSON por pesquisador (lidos pelos passos 2 e 3)
+    'USAR_CACHE': '--no-cache' not in sys.argv,  # reaproveita buscas de execuções anteriores
+    'VALIDADE_CACHE_DIAS': 30,
+    'VALIDADE_CACHE_GEMINI_DIAS': 90,  # respostas do Gemini por hash do prompt + modelo
+    'TAMANHO_BUFFER_NDJSON': 20,  # registros acumulados antes de cada gravação no NDJSON
+    'RELATORIOS_CSV': '--relatorios-csv' in sys.argv,  # relatórios finais em CSV em vez de Parquet/Feather
+    'MAX_TENTATIVAS': 3,  # navegações com falha ou bloqueio (429/503)
+    'ESPERA_BASE_TENTATIVA': 2  # segundos; dobra a cada nova tentativa
 }
 
+# Tags cujo conteúdo não é texto visível (removidas antes de ler o perfil por HTTP)
+TAGS_SEM_TEXTO = ['script', 'style', 'noscript', 'template']
+
+# Respostas do servidor que indicam "tente mais tarde"
+STATUS_TENTAR_NOVAMENTE = {429, 503}
+
+# Candidatos ao campo de busca da BV FAPESP, em ordem de preferência
+SELETORES_BUSCA = ['input[type="search"]', 'input[name="q"]', '#search']
+
+# Recursos que não influenciam o texto da página (bloqueados no navegador)
+RECURSOS_BLOQUEADOS = {'image', 'font', 'stylesheet', 'media'}
+
 # Modelos Gemini - EXPANDIDO
 MODELOS_GEMINI = {
     '1': {'name': 'gemini-1.5-flash', 'display': 'Gemini 1.5 Flash (Recomendado)', 'temperature': 0.1},
@@ -88,6 +126,134 @@ CAMPOS_CSV = [
     'status_processamento', 'modo_processamento'
 ]
 
+# Resultado de um pesquisador: um slot por campo (None = não extraído), sem dict por registro
+ResultadoPesquisador = make_dataclass(
+    'ResultadoPesquisador',
+    [(campo, Optional[str], None) for campo in CAMPOS_CSV],
+    slots=True
+)
+
+def resultado_para_dict(resultado):
+    """Só os campos preenchidos, como no JSON de saída"""
+    return {f.name: valor for f in fields(resultado)
+            if (valor := getattr(resultado, f.name)) is not None}
+
+# Rótulo usado na resposta do Gemini ("nome completo") -> campo ("nome_completo")
+MAPA_CAMPOS = {campo.replace('_', ' '): campo for campo in CAMPOS_CSV}
+
+# Uma linha "Rótulo: valor" da resposta do Gemini
+REGEX_LINHA_CAMPO = re.compile(r'^[ \t]*([^:\n]+?)[ \t]*:[ \t]*(.*)$', re.MULTILINE)
+
+# Campos triviais lidos direto do texto da página, sem passar pelo Gemini
+REGEX_PRE_EXTRACAO = {
+    'orcid': re.compile(r'\b\d{4}-\d{4}-\d{4}-\d{3}[\dX]\b'),
+    'email_contato': re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]*\w'),
+    'processos_fapesp': re.compile(r'\b\d{2}/\d{5}-\d\b'),
+    'url_lattes': re.compile(r'https?://lattes\.cnpq\.br/\d+'),
+}
+
+# Sanitização de nomes de arquivo
+REGEX_CARACTERES_INVALIDOS = re.compile(r'[^\w\s-]')
+REGEX_ESPACOS = re.compile(r'\s+')
+
+# Texto da região do perfil (ou do body, se a região faltar ou for curta demais),
+# lido com innerText dentro do navegador em uma única ida e volta
+JS_EXTRAIR_TEXTO = """([seletor, minimo]) => {
+    const regiao = document.querySelector(seletor);
+    const texto = regiao ? regiao.innerText : '';
+    return texto.length >= minimo ? texto : document.body.innerText;
+}"""
+
+# Formato de saída comum aos dois prompts (um rótulo por campo de CAMPOS_CSV)
+FORMATO_CAMPOS = """Nome Completo: [nome completo do pesquisador]
+Resumo Academico Completo: [TEXTO BIOGRÁFICO COMPLETO - COPIAR INTEGRALMENTE sem resumir, incluindo todos os detalhes sobre formação, experiência, bolsas, projetos, startup, etc. Este deve ser o texto mais longo da extração]
+Formacao Academica: [graduação, mestrado, doutorado, pós-doutorado com detalhes]
+Titulacao Atual: [título/cargo acadêmico atual]
+Instituicao Vinculo: [universidade/instituição de vínculo]
+Laboratorios Pesquisa: [laboratórios onde atua com detalhes]
+Linhas Pesquisa: [áreas de pesquisa detalhadas]
+Palavras Chave: [TODAS as palavras-chave listadas na página]
+Projetos Pesquisa: [projetos em andamento ou concluídos com detalhes]
+Historico Bolsas: [TODAS as bolsas mencionadas com datas e detalhes]
+Colaboracoes Internacionais: [parcerias internacionais]
+Producao Cientifica Destacada: [principais publicações com detalhes]
+Cargo Atual: [cargo/posição atual]
+Empresa Startup: [empresas ou startups vinculadas - ex: BIOLINKER]
+Areas Especializacao: [áreas de especialização]
+Tecnicas Utilizadas: [técnicas e métodos de pesquisa]
+Url Lattes: [link do currículo Lattes]
+Url Fapesp: [link do perfil FAPESP]
+Orcid: [ID ORCID completo]
+Email Contato: [email de contato]
+Pais Origem: [país de origem]
+BV Numeros Auxilios Contratados: [número de auxílios contratados]
+BV Numeros Auxilios Concluidos: [número de auxílios concluídos]  
+BV Numeros Bolsas Concluidas: [número de bolsas concluídas]
+BV Numeros Total Processos: [total de auxílios e bolsas]
+Colaboradores Frequentes: [lista de colaboradores mais frequentes]
+Auxilios Pesquisa Contratados: [lista detalhada de auxílios contratados recentes]
+Auxilios Pesquisa Concluidos: [lista detalhada de auxílios concluídos]
+Bolsas Concluidas: [lista detalhada de bolsas concluídas]
+Materias Agencia FAPESP: [matérias publicadas na Agência FAPESP]
+Materias Outras Midias: [matérias em outras mídias]
+Palavras Chave Detalhadas: [todas as palavras-chave com frequência de uso]
+Publicacoes Resultantes: [número e detalhes de publicações]
+Processos FAPESP: [números de processos específicos mencionados]
+"""
+
+# Prompt do modo individual ({nome}); o texto da página é concatenado ao final
+PROMPT_INDIVIDUAL = """Você é um especialista em extrair informações acadêmicas detalhadas de páginas da FAPESP. 
+
+PESQUISADOR: {nome}
+
+INSTRUÇÕES CRÍTICAS - LEIA ATENTAMENTE:
+1. Procure por um parágrafo biográfico longo que começa com formação acadêmica (ex: "Doutor em ciências pelo Instituto...")
+2. Este parágrafo DEVE ser copiado INTEGRALMENTE no campo "Resumo Academico Completo"
+3. NÃO RESUMIR, NÃO CORTAR, NÃO PARAFRASEAR - copie palavra por palavra
+4. Incluir também "(Fonte: Currículo Lattes)" se presente
+5. Para outros campos, extrair todas as informações disponíveis
+6. Para campos não encontrados, usar "Não encontrado"
+
+ATENÇÃO ESPECIAL: O texto biográfico principal (que geralmente é longo e detalhado) deve aparecer COMPLETO no campo "Resumo Academico Completo". Este é o texto mais importante da página.
+
+FORMATO DE SAÍDA OBRIGATÓRIO:
+
+""" + FORMATO_CAMPOS + """
+LEMBRE-SE: O campo "Resumo Academico Completo" deve conter o texto biográfico INTEGRAL, que é o conteúdo mais valioso da página.
+
+TEXTO DA PÁGINA:
+"""
+
+# Prompt do modo batch: instruções e formato aparecem uma única vez,
+# seguidos apenas dos textos das páginas ({total} = nº de pesquisadores)
+PROMPT_BATCH = """Você é um especialista em extrair informações acadêmicas detalhadas de páginas da FAPESP. 
+
+INSTRUÇÕES CRÍTICAS - LEIA ATENTAMENTE:
+1. Procure por um parágrafo biográfico longo que começa com formação acadêmica (ex: "Doutor em ciências pelo Instituto...")
+2. Este parágrafo DEVE ser copiado INTEGRALMENTE no campo "Resumo Academico Completo"
+3. NÃO RESUMIR, NÃO CORTAR, NÃO PARAFRASEAR - copie palavra por palavra
+4. Incluir também "(Fonte: Currículo Lattes)" se presente
+5. Para outros campos, extrair todas as informações disponíveis
+6. Para campos não encontrados, OMITA a linha do campo (não escreva "Não encontrado")
+
+ATENÇÃO ESPECIAL: O texto biográfico principal (que geralmente é longo e detalhado) deve aparecer COMPLETO no campo "Resumo Academico Completo". Este é o texto mais importante da página.
+
+PROCESSE TODOS OS {total} PESQUISADORES fornecidos abaixo.
+
+FORMATO DE SAÍDA OBRIGATÓRIO - Para cada pesquisador:
+
+=== PESQUISADOR [NUMERO] ===
+""" + FORMATO_CAMPOS + """
+LEMBRE-SE: O campo "Resumo Academico Completo" deve conter o texto biográfico INTEGRAL, que é o conteúdo mais valioso da página.
+
+DADOS DOS PESQUISADORES:
+"""
+
+# Partes fixas de cada prompt ao redor do seu único campo variável, separadas
+# uma vez na importação: por chamada só há a junção das partes
+PROMPT_INDIVIDUAL_ANTES, PROMPT_INDIVIDUAL_DEPOIS = PROMPT_INDIVIDUAL.split('{nome}')
+PROMPT_BATCH_ANTES, PROMPT_BATCH_DEPOIS = PROMPT_BATCH.split('{total}')
+
 class ExtratorFAPESP:
     """Extrator FAPESP com batch configurável"""
     
@@ -95,9 +261,22 @@ class ExtratorFAPESP:
         self.pasta_resultados = CONFIG['PASTA_RESULTADOS']
         self.pasta_nomes = CONFIG['PASTA_NOMES']
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.driver = None
+        self.playwright = None
+        self.browser = None
+        self.context = None
+        self.abas = None
+        self.seletor_busca = None  # descoberto uma vez e reaproveitado em todas as buscas
         self.modelo_gemini = None
-        self.wait = None
+        self.nome_modelo = None
+        self.limite_gemini = None
+        self.trava_ritmo_gemini = asyncio.Lock()
+        self.proxima_vaga_gemini = 0.0  # instante (monotonic) liberado para a próxima chamada
+        self.linhas_csv = []  # uma linha por pesquisador, gravadas juntas no final
+        self.registros_json = []  # buffer do NDJSON consolidado, descarregado aos blocos
+        self.cache = None  # shelve em PASTA_RESULTADOS, aberto em executar()
+        self.nomes_sucesso = set()  # nomes normalizados, preenchido à medida que os resultados são salvos
+        self.coletas = {}  # nome normalizado -> tarefa de coleta (nomes repetidos na mesma execução)
+        self.paginas = {}  # url -> texto já extraído nesta execução
         self.criar_pastas()
         
     def criar_pastas(self):
@@ -272,7 +451,7 @@ class ExtratorFAPESP:
     def ler_csv(self, arquivo_csv):
         """Lê nomes do arquivo CSV"""
         try:
-            df = pd.read_csv(arquivo_csv, encoding='utf-8')
+            df = pd.read_csv(arquivo_csv, encoding='utf-8', engine='pyarrow', dtype_backend='pyarrow')
             
             # Procurar coluna com nomes
             colunas_nomes = ['nome', 'name', 'pesquisador', 'researcher', 'Nome', 'Name']
@@ -284,8 +463,8 @@ class ExtratorFAPESP:
                     break
             
             if coluna_encontrada:
-                nomes = df[coluna_encontrada].dropna().astype(str).tolist()
-                nomes = [nome.strip() for nome in nomes if nome.strip()]
+                nomes = df[coluna_encontrada].dropna().astype("string").str.strip()
+                nomes = nomes[nomes.ne("")].tolist()
                 print(f"✅ {len(nomes)} nomes carregados de {arquivo_csv.name}")
                 return nomes
             else:
@@ -297,56 +476,125 @@ class ExtratorFAPESP:
             print(f"❌ Erro ao ler CSV: {e}")
             return None
     
-    def inicializar_selenium(self, headless=True):
-        """Inicializa Selenium"""
+    async def inicializar_navegador(self, headless=True):
+        """Inicializa Playwright (Chromium) com um único contexto persistente"""
         try:
-            print("🔄 Inicializando Selenium...")
-            
-            options = Options()
-            if headless:
-                options.add_argument('--headless=new')
-            
-            # Configurações essenciais
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--disable-gpu')
-            options.add_argument('--window-size=1920,1080')
-            options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-            options.add_argument('--disable-blink-features=AutomationControlled')
-            options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            options.add_experimental_option('useAutomationExtension', False)
-            
-            # Tentar diferentes métodos
-            if WEBDRIVER_MANAGER_OK:
-                try:
-                    service = Service(ChromeDriverManager().install())
-                    self.driver = webdriver.Chrome(service=service, options=options)
-                    print("✅ Selenium inicializado com WebDriver Manager")
-                except Exception:
-                    self.driver = webdriver.Chrome(options=options)
-                    print("✅ Selenium inicializado (método direto)")
-            else:
-                self.driver = webdriver.Chrome(options=options)
-                print("✅ Selenium inicializado (método direto)")
+            print("🔄 Inicializando navegador (Playwright)...")
+            
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(
+                headless=headless,
+                args=[
+                    '--no-sandbox',
+                    '--disable-dev-shm-usage',
+                    '--disable-gpu',
+                    '--disable-blink-features=AutomationControlled',
+                    # Imagens nem chegam a ser pedidas (o filtro de rotas cobre o resto)
+                    '--blink-settings=imagesEnabled=false',
+                    '--disable-extensions',
+                    '--disable-software-rasterizer',
+                    '--disable-background-networking'
+                ]
+            )
+            
+            # Contexto único reaproveitado durante toda a execução
+            self.context = await self.browser.new_context(
+                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+                viewport={'width': 1920, 'height': 1080}
+            )
+            self.context.set_default_timeout(CONFIG['TIMEOUT_NAVEGADOR'] * 1000)
+            await self.context.route("**/*", self.filtrar_recursos)
             
-            self.wait = WebDriverWait(self.driver, CONFIG['TIMEOUT_SELENIUM'])
+            # Pool fixo de abas, reaproveitadas de um pesquisador para o outro
+            self.abas = asyncio.Queue()
+            for _ in range(CONFIG['CONCORRENCIA']):
+                self.abas.put_nowait(await self.context.new_page())
             
-            # Teste básico
-            self.driver.get("https://www.google.com")
-            time.sleep(2)
-            print("✅ Teste de navegação OK")
+            await self.descobrir_seletor_busca()
+            
+            print(f"✅ Navegador inicializado ({CONFIG['CONCORRENCIA']} abas)")
             return True
             
         except Exception as e:
-            print(f"❌ Erro no Selenium: {e}")
+            print(f"❌ Erro no navegador: {e}")
             return False
     
-    def inicializar_gemini(self, modelo_info):
+    async def descobrir_seletor_busca(self):
+        """Abre a BV FAPESP uma vez e guarda qual seletor do campo de busca funciona"""
+        page = await self.abas.get()
+        try:
+            await self.navegar(page, "https://bv.fapesp.br")
+            if await self.procurar_campo_busca(page):
+                print(f"✅ Campo de busca: {self.seletor_busca}")
+            else:
+                print("⚠️ Campo de busca não identificado; será procurado a cada busca")
+        except Exception as e:
+            print(f"⚠️ Não foi possível sondar a BV FAPESP: {e}")
+        finally:
+            self.abas.put_nowait(page)
+    
+    async def procurar_campo_busca(self, page):
+        """Testa cada seletor candidato com timeout curto e guarda o que funcionar"""
+        for seletor in SELETORES_BUSCA:
+            try:
+                campo = await page.wait_for_selector(
+                    seletor, state="visible", timeout=CONFIG['TIMEOUT_SONDA_BUSCA'] * 1000
+                )
+                self.seletor_busca = seletor
+                return campo
+            except PlaywrightTimeoutError:
+                continue
+        return None
+    
+    async def navegar(self, page, url):
+        """Abre a URL com nova tentativa (backoff exponencial) em falha de rede, 429 ou 503"""
+        for tentativa in range(1, CONFIG['MAX_TENTATIVAS'] + 1):
+            espera = CONFIG['ESPERA_BASE_TENTATIVA'] * 2 ** (tentativa - 1)
+            try:
+                resposta = await page.goto(url, wait_until="domcontentloaded")
+            except PlaywrightError as e:
+                if tentativa == CONFIG['MAX_TENTATIVAS']:
+                    raise
+                motivo = (e.message or str(e)).partition('\n')[0]
+                print(f"⚠️ Falha ao abrir a página ({motivo}), nova tentativa em {espera}s")
+            else:
+                if resposta is None or resposta.status not in STATUS_TENTAR_NOVAMENTE:
+                    return resposta
+                if tentativa == CONFIG['MAX_TENTATIVAS']:
+                    raise PlaywrightError(f"HTTP {resposta.status} após {tentativa} tentativas: {url}")
+                retry_after = await resposta.header_value('retry-after')
+                if retry_after and retry_after.isdigit():
+                    espera = int(retry_after)
+                print(f"⚠️ HTTP {resposta.status}, nova tentativa em {espera}s")
+            await asyncio.sleep(espera)
+    
+    async def filtrar_recursos(self, route):
+        """Aborta imagens, fontes, CSS e mídia - só o texto da página é usado"""
+        if route.request.resource_type in RECURSOS_BLOQUEADOS:
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    async def fechar_navegador(self):
+        """Fecha contexto, browser e Playwright"""
+        try:
+            if self.context:
+                await self.context.close()
+            if self.browser:
+                await self.browser.close()
+                print("✅ Browser fechado")
+            if self.playwright:
+                await self.playwright.stop()
+        except Exception:
+            pass
+    
+    async def inicializar_gemini(self, modelo_info):
         """Inicializa Gemini"""
         try:
             print(f"🔄 Inicializando {modelo_info['display']}...")
             genai.configure(api_key=os.environ['GOOGLE_API_KEY'])
             
+            self.nome_modelo = modelo_info['name']
             self.modelo_gemini = genai.GenerativeModel(
                 modelo_info['name'],
                 generation_config=genai.types.GenerationConfig(
@@ -354,8 +602,11 @@ class ExtratorFAPESP:
                 )
             )
             
-            # Teste básico
-            response = self.modelo_gemini.generate_content("Teste: responda apenas 'OK'")
+            self.limite_gemini = asyncio.Semaphore(CONFIG['CONCORRENCIA_GEMINI'])
+            
+            # Teste básico pelo mesmo cliente assíncrono usado no processamento:
+            # o canal gRPC aberto aqui fica aquecido e é reaproveitado nas chamadas seguintes
+            response = await self.modelo_gemini.generate_content_async("Teste: responda apenas 'OK'")
             if response and response.text:
                 print("✅ Gemini inicializado e testado")
                 return True
@@ -367,60 +618,91 @@ class ExtratorFAPESP:
             print(f"❌ Erro no Gemini: {e}")
             return False
     
-    def buscar_pesquisador(self, nome):
+    async def buscar_pesquisador(self, page, nome):
         """Busca pesquisador na FAPESP"""
         try:
             print(f"🔍 Buscando: {nome}")
             
-            self.driver.get("https://bv.fapesp.br")
-            time.sleep(3)
+            await self.navegar(page, "https://bv.fapesp.br")
             
-            # Procurar campo de busca
-            seletores = ['input[type="search"]', 'input[name="q"]', '#search']
+            # Campo de busca: seletor já conhecido; se falhar, procura de novo entre os candidatos
             campo_busca = None
-            
-            for seletor in seletores:
+            if self.seletor_busca:
                 try:
-                    campo_busca = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, seletor)))
-                    break
-                except TimeoutException:
-                    continue
+                    campo_busca = await page.wait_for_selector(self.seletor_busca, state="visible")
+                except PlaywrightTimeoutError:
+                    pass
+            
+            if not campo_busca:
+                campo_busca = await self.procurar_campo_busca(page)
             
             if not campo_busca:
                 print("❌ Campo de busca não encontrado")
                 return None
             
             # Realizar busca
-            campo_busca.clear()
-            campo_busca.send_keys(nome)
-            campo_busca.send_keys(Keys.RETURN)
-            time.sleep(4)
+            await campo_busca.fill(nome)
+            await campo_busca.press("Enter")
             
             # Procurar resultado
-            links = self.driver.find_elements(By.CSS_SELECTOR, 'a[href*="/pesquisador/"]')
-            
-            if links:
-                url = links[0].get_attribute('href')
-                print(f"✅ Encontrado: {url}")
-                return url
-            else:
+            seletor_resultado = 'a[href*="/pesquisador/"]'
+            try:
+                await page.wait_for_selector(
+                    seletor_resultado,
+                    timeout=CONFIG['TIMEOUT_RESULTADO_BUSCA'] * 1000
+                )
+            except PlaywrightTimeoutError:
                 print(f"❌ Não encontrado: {nome}")
                 return None
+            
+            # a.href devolve a URL absoluta (o atributo href pode ser relativo)
+            url = await page.locator(seletor_resultado).first.evaluate("a => a.href")
+            print(f"✅ Encontrado: {url}")
+            return url
                 
         except Exception as e:
             print(f"❌ Erro na busca: {e}")
             return None
     
-    def extrair_dados_pagina(self, url):
+    async def extrair_texto_http(self, url):
+        """Caminho rápido: baixa o HTML do perfil sem renderizar (None se não der)"""
+        if LexborHTMLParser is None:
+            return None
+        try:
+            resposta = await self.context.request.get(url)
+            if not resposta.ok:
+                return None
+            
+            # Seleção, limpeza e extração de texto rodam no lexbor (C); a limpeza
+            # se restringe à região do perfil em vez da árvore inteira
+            regiao = LexborHTMLParser(await resposta.text()).css_first(CONFIG['SELETOR_PERFIL'])
+            texto = ''
+            if regiao:
+                regiao.strip_tags(TAGS_SEM_TEXTO)
+                texto = regiao.text(separator='\n', strip=True)
+            
+            # Região ausente ou curta: página depende de JS, fica para o navegador
+            return texto if len(texto) >= CONFIG['MIN_CARACTERES_PERFIL'] else None
+        except Exception:
+            return None
+    
+    async def extrair_dados_pagina(self, page, url):
         """Extrai dados da página"""
         try:
             print(f"📄 Extraindo: {url}")
             
-            self.driver.get(url)
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, 'body')))
-            time.sleep(3)
+            conteudo = await self.extrair_texto_http(url)
+            if conteudo:
+                print(f"✅ {len(conteudo)} caracteres extraídos (HTTP)")
+                return conteudo
             
-            conteudo = self.driver.find_element(By.TAG_NAME, 'body').text
+            await self.navegar(page, url)
+            
+            # Só a região do perfil: menus, cabeçalho e rodapé não vão para o Gemini.
+            # Uma única chamada ao navegador escolhe a região e cai no body se preciso
+            conteudo = await page.evaluate(
+                JS_EXTRAIR_TEXTO, [CONFIG['SELETOR_PERFIL'], CONFIG['MIN_CARACTERES_PERFIL']]
+            )
             print(f"✅ {len(conteudo)} caracteres extraídos")
             return conteudo
             
@@ -428,72 +710,166 @@ class ExtratorFAPESP:
             print(f"❌ Erro na extração: {e}")
             return None
     
-    def processar_individual_gemini(self, conteudo, nome_pesquisador):
+    def abrir_cache(self):
+        """Abre o cache em disco (desligado com --no-cache)"""
+        if not CONFIG['USAR_CACHE']:
+            print("🚫 Cache desativado")
+            return
+        try:
+            self.cache = shelve.open(str(self.pasta_resultados / '.cache_fapesp'))
+            print(f"🗄️ Cache: {len(self.cache)} entradas de execuções anteriores")
+        except Exception as e:
+            print(f"⚠️ Cache indisponível: {e}")
+            self.cache = None
+    
+    def chave_cache(self, nome):
+        """Nome normalizado: sem diferença de acentuação, maiúsculas ou espaços extras"""
+        texto = unicodedata.normalize('NFKD', nome)
+        texto = ''.join(c for c in texto if not unicodedata.combining(c))
+        return ' '.join(texto.casefold().split())
+    
+    def consultar_cache(self, nome):
+        """Entrada do cache ({url, conteudo, dados como dict}) ou None se ausente/expirada"""
+        if self.cache is None:
+            return None
+        entrada = self.cache.get(self.chave_cache(nome))
+        if not entrada or time.time() - entrada['salvo_em'] > CONFIG['VALIDADE_CACHE_DIAS'] * 86400:
+            return None
+        return entrada
+    
+    def guardar_cache(self, nome, **campos):
+        """Acrescenta campos à entrada do pesquisador e renova a validade"""
+        if self.cache is None:
+            return
+        chave = self.chave_cache(nome)
+        entrada = self.cache.get(chave, {})
+        entrada.update(campos, salvo_em=time.time())
+        self.cache[chave] = entrada
+    
+    def fechar_cache(self):
+        """Grava e fecha o cache"""
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+    
+    async def coletar_pesquisador(self, nome):
+        """Busca e extrai a página de um pesquisador (nomes repetidos compartilham a mesma coleta)"""
+        chave = self.chave_cache(nome)
+        if chave not in self.coletas:
+            self.coletas[chave] = asyncio.ensure_future(self.buscar_e_extrair(nome))
+        url, conteudo = await self.coletas[chave]
+        return nome, url, conteudo
+    
+    async def buscar_e_extrair(self, nome):
+        """Busca e extrai usando uma aba livre do pool, consultando antes o cache em disco"""
+        entrada = self.consultar_cache(nome)
+        if entrada and entrada.get('conteudo'):
+            print(f"🗄️ Página em cache: {nome}")
+            return entrada['url'], entrada['conteudo']
+        
+        page = await self.abas.get()
+        try:
+            url = await self.buscar_pesquisador(page, nome)
+            if url in self.paginas:
+                # Grafias diferentes do mesmo pesquisador levam ao mesmo perfil
+                conteudo = self.paginas[url]
+            else:
+                conteudo = await self.extrair_dados_pagina(page, url) if url else None
+        finally:
+            self.abas.put_nowait(page)
+        
+        if url and conteudo:
+            self.paginas[url] = conteudo
+            self.guardar_cache(nome, url=url, conteudo=conteudo)
+        return url, conteudo
+    
+    async def coletar_paginas(self, nomes, descricao=None):
+        """Coleta páginas em paralelo, limitado pelas CONFIG['CONCORRENCIA'] abas do pool"""
+        if tqdm is None or not descricao or not nomes:
+            return await asyncio.gather(*(self.coletar_pesquisador(nome) for nome in nomes))
+        
+        # Uma barra por grupo, redesenhada no máximo a cada 0,5 s
+        with tqdm(total=len(nomes), desc=descricao, leave=False, mininterval=0.5) as barra:
+            async def coletar(nome):
+                resultado = await self.coletar_pesquisador(nome)
+                barra.set_postfix_str(nome[:30], refresh=False)
+                barra.update()
+                return resultado
+            
+            return await asyncio.gather(*(coletar(nome) for nome in nomes))
+    
+    def pre_extrair_campos(self, conteudo):
+        """Extrai localmente ORCID, emails, processos e Lattes presentes no texto"""
+        campos = {}
+        for campo, regex in REGEX_PRE_EXTRACAO.items():
+            encontrados = list(dict.fromkeys(regex.findall(conteudo)))
+            if encontrados:
+                campos[campo] = encontrados[0] if campo == 'orcid' else ', '.join(encontrados)
+        return campos
+    
+    def aviso_campos_extraidos(self, campos):
+        """Linha que avisa o Gemini para não repetir os campos já extraídos"""
+        if not campos:
+            return ""
+        rotulos = ', '.join(campo.replace('_', ' ').title() for campo in campos)
+        return f"CAMPOS JÁ EXTRAÍDOS (omita essas linhas na resposta): {rotulos}\n"
+    
+    async def aguardar_vaga_gemini(self):
+        """Espaça o início das chamadas em 60/GEMINI_RPM segundos (só quem chama espera)"""
+        async with self.trava_ritmo_gemini:
+            agora = time.monotonic()
+            espera = self.proxima_vaga_gemini - agora
+            self.proxima_vaga_gemini = max(agora, self.proxima_vaga_gemini) + 60 / CONFIG['GEMINI_RPM']
+        if espera > 0:
+            await asyncio.sleep(espera)
+    
+    async def chamar_gemini(self, prompt):
+        """Chamada ao Gemini com limite de concorrência, ritmo da cota e nova tentativa em 429"""
+        for tentativa in range(1, CONFIG['MAX_TENTATIVAS'] + 1):
+            await self.aguardar_vaga_gemini()
+            try:
+                async with self.limite_gemini:
+                    return await self.modelo_gemini.generate_content_async(prompt)
+            except google_exceptions.ResourceExhausted:
+                if tentativa == CONFIG['MAX_TENTATIVAS']:
+                    raise
+                espera = CONFIG['ESPERA_BASE_TENTATIVA'] * 2 ** tentativa
+                print(f"⚠️ Cota do Gemini atingida (429), nova tentativa em {espera}s")
+                await asyncio.sleep(espera)
+    
+    async def gerar_texto_gemini(self, prompt):
+        """Texto da resposta do Gemini; prompt idêntico no mesmo modelo sai do cache em disco"""
+        chave = None
+        if self.cache is not None:
+            resumo = hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+            chave = f"gemini:{self.nome_modelo}:{resumo}"
+            entrada = self.cache.get(chave)
+            if entrada and time.time() - entrada['salvo_em'] <= CONFIG['VALIDADE_CACHE_GEMINI_DIAS'] * 86400:
+                print("🗄️ Resposta do Gemini em cache")
+                return entrada['texto']
+        
+        response = await self.chamar_gemini(prompt)
+        texto = response.text if response else None
+        if texto and chave:
+            self.cache[chave] = {'texto': texto, 'salvo_em': time.time()}
+        return texto
+    
+    async def processar_individual_gemini(self, conteudo, nome_pesquisador, campos_extraidos=None):
         """Processa com Gemini - FORMATO EXATO ESPECIFICADO"""
         try:
             print(f"🤖 Processando {nome_pesquisador} com Gemini...")
             
-            prompt = f"""Você é um especialista em extrair informações acadêmicas detalhadas de páginas da FAPESP. 
-
-PESQUISADOR: {nome_pesquisador}
-
-INSTRUÇÕES CRÍTICAS - LEIA ATENTAMENTE:
-1. Procure por um parágrafo biográfico longo que começa com formação acadêmica (ex: "Doutor em ciências pelo Instituto...")
-2. Este parágrafo DEVE ser copiado INTEGRALMENTE no campo "Resumo Academico Completo"
-3. NÃO RESUMIR, NÃO CORTAR, NÃO PARAFRASEAR - copie palavra por palavra
-4. Incluir também "(Fonte: Currículo Lattes)" se presente
-5. Para outros campos, extrair todas as informações disponíveis
-6. Para campos não encontrados, usar "Não encontrado"
-
-ATENÇÃO ESPECIAL: O texto biográfico principal (que geralmente é longo e detalhado) deve aparecer COMPLETO no campo "Resumo Academico Completo". Este é o texto mais importante da página.
-
-FORMATO DE SAÍDA OBRIGATÓRIO:
-
-Nome Completo: [nome completo do pesquisador]
-Resumo Academico Completo: [TEXTO BIOGRÁFICO COMPLETO - COPIAR INTEGRALMENTE sem resumir, incluindo todos os detalhes sobre formação, experiência, bolsas, projetos, startup, etc. Este deve ser o texto mais longo da extração]
-Formacao Academica: [graduação, mestrado, doutorado, pós-doutorado com detalhes]
-Titulacao Atual: [título/cargo acadêmico atual]
-Instituicao Vinculo: [universidade/instituição de vínculo]
-Laboratorios Pesquisa: [laboratórios onde atua com detalhes]
-Linhas Pesquisa: [áreas de pesquisa detalhadas]
-Palavras Chave: [TODAS as palavras-chave listadas na página]
-Projetos Pesquisa: [projetos em andamento ou concluídos com detalhes]
-Historico Bolsas: [TODAS as bolsas mencionadas com datas e detalhes]
-Colaboracoes Internacionais: [parcerias internacionais]
-Producao Cientifica Destacada: [principais publicações com detalhes]
-Cargo Atual: [cargo/posição atual]
-Empresa Startup: [empresas ou startups vinculadas - ex: BIOLINKER]
-Areas Especializacao: [áreas de especialização]
-Tecnicas Utilizadas: [técnicas e métodos de pesquisa]
-Url Lattes: [link do currículo Lattes]
-Url Fapesp: [link do perfil FAPESP]
-Orcid: [ID ORCID completo]
-Email Contato: [email de contato]
-Pais Origem: [país de origem]
-BV Numeros Auxilios Contratados: [número de auxílios contratados]
-BV Numeros Auxilios Concluidos: [número de auxílios concluídos]  
-BV Numeros Bolsas Concluidas: [número de bolsas concluídas]
-BV Numeros Total Processos: [total de auxílios e bolsas]
-Colaboradores Frequentes: [lista de colaboradores mais frequentes]
-Auxilios Pesquisa Contratados: [lista detalhada de auxílios contratados recentes]
-Auxilios Pesquisa Concluidos: [lista detalhada de auxílios concluídos]
-Bolsas Concluidas: [lista detalhada de bolsas concluídas]
-Materias Agencia FAPESP: [matérias publicadas na Agência FAPESP]
-Materias Outras Midias: [matérias em outras mídias]
-Palavras Chave Detalhadas: [todas as palavras-chave com frequência de uso]
-Publicacoes Resultantes: [número e detalhes de publicações]
-Processos FAPESP: [números de processos específicos mencionados]
+            prompt = "".join((
+                PROMPT_INDIVIDUAL_ANTES, nome_pesquisador, PROMPT_INDIVIDUAL_DEPOIS,
+                conteudo[:CONFIG['MAX_CARACTERES_PAGINA']],
+                "\n\n", self.aviso_campos_extraidos(campos_extraidos)
+            ))
 
-LEMBRE-SE: O campo "Resumo Academico Completo" deve conter o texto biográfico INTEGRAL, que é o conteúdo mais valioso da página.
-
-TEXTO DA PÁGINA:
-{conteudo[:10000]}"""
-
-            response = self.modelo_gemini.generate_content(prompt)
+            texto = await self.gerar_texto_gemini(prompt)
             
-            if response and response.text:
+            if texto:
                 print("✅ Gemini processou com sucesso")
-                return response.text
+                return texto
             else:
                 print("❌ Gemini retornou resposta vazia")
                 return None
@@ -502,78 +878,26 @@ TEXTO DA PÁGINA:
             print(f"❌ Erro no Gemini: {e}")
             return None
     
-    def processar_batch_gemini(self, dados_batch):
+    async def processar_batch_gemini(self, dados_batch):
         """Processa batch com Gemini - FORMATO EXATO ESPECIFICADO"""
         try:
             print(f"🤖 Processando batch de {len(dados_batch)} pesquisadores...")
             
-            prompt = f"""Você é um especialista em extrair informações acadêmicas detalhadas de páginas da FAPESP. 
-
-INSTRUÇÕES CRÍTICAS - LEIA ATENTAMENTE:
-1. Procure por um parágrafo biográfico longo que começa com formação acadêmica (ex: "Doutor em ciências pelo Instituto...")
-2. Este parágrafo DEVE ser copiado INTEGRALMENTE no campo "Resumo Academico Completo"
-3. NÃO RESUMIR, NÃO CORTAR, NÃO PARAFRASEAR - copie palavra por palavra
-4. Incluir também "(Fonte: Currículo Lattes)" se presente
-5. Para outros campos, extrair todas as informações disponíveis
-6. Para campos não encontrados, usar "Não encontrado"
-
-ATENÇÃO ESPECIAL: O texto biográfico principal (que geralmente é longo e detalhado) deve aparecer COMPLETO no campo "Resumo Academico Completo". Este é o texto mais importante da página.
-
-PROCESSE TODOS OS {len(dados_batch)} PESQUISADORES fornecidos abaixo.
-
-FORMATO DE SAÍDA OBRIGATÓRIO - Para cada pesquisador:
-
-=== PESQUISADOR [NUMERO] ===
-Nome Completo: [nome completo do pesquisador]
-Resumo Academico Completo: [TEXTO BIOGRÁFICO COMPLETO - COPIAR INTEGRALMENTE sem resumir, incluindo todos os detalhes sobre formação, experiência, bolsas, projetos, startup, etc. Este deve ser o texto mais longo da extração]
-Formacao Academica: [graduação, mestrado, doutorado, pós-doutorado com detalhes]
-Titulacao Atual: [título/cargo acadêmico atual]
-Instituicao Vinculo: [universidade/instituição de vínculo]
-Laboratorios Pesquisa: [laboratórios onde atua com detalhes]
-Linhas Pesquisa: [áreas de pesquisa detalhadas]
-Palavras Chave: [TODAS as palavras-chave listadas na página]
-Projetos Pesquisa: [projetos em andamento ou concluídos com detalhes]
-Historico Bolsas: [TODAS as bolsas mencionadas com datas e detalhes]
-Colaboracoes Internacionais: [parcerias internacionais]
-Producao Cientifica Destacada: [principais publicações com detalhes]
-Cargo Atual: [cargo/posição atual]
-Empresa Startup: [empresas ou startups vinculadas - ex: BIOLINKER]
-Areas Especializacao: [áreas de especialização]
-Tecnicas Utilizadas: [técnicas e métodos de pesquisa]
-Url Lattes: [link do currículo Lattes]
-Url Fapesp: [link do perfil FAPESP]
-Orcid: [ID ORCID completo]
-Email Contato: [email de contato]
-Pais Origem: [país de origem]
-BV Numeros Auxilios Contratados: [número de auxílios contratados]
-BV Numeros Auxilios Concluidos: [número de auxílios concluídos]  
-BV Numeros Bolsas Concluidas: [número de bolsas concluídas]
-BV Numeros Total Processos: [total de auxílios e bolsas]
-Colaboradores Frequentes: [lista de colaboradores mais frequentes]
-Auxilios Pesquisa Contratados: [lista detalhada de auxílios contratados recentes]
-Auxilios Pesquisa Concluidos: [lista detalhada de auxílios concluídos]
-Bolsas Concluidas: [lista detalhada de bolsas concluídas]
-Materias Agencia FAPESP: [matérias publicadas na Agência FAPESP]
-Materias Outras Midias: [matérias em outras mídias]
-Palavras Chave Detalhadas: [todas as palavras-chave com frequência de uso]
-Publicacoes Resultantes: [número e detalhes de publicações]
-Processos FAPESP: [números de processos específicos mencionados]
-
-LEMBRE-SE: O campo "Resumo Academico Completo" deve conter o texto biográfico INTEGRAL, que é o conteúdo mais valioso da página.
-
-DADOS DOS PESQUISADORES:
-"""
-            
-            for i, dados in enumerate(dados_batch, 1):
-                prompt += f"\n--- PESQUISADOR {i}: {dados['nome']} ---\n"
-                prompt += f"URL: {dados['url']}\n"
-                prompt += f"TEXTO DA PÁGINA:\n{dados['conteudo'][:10000]}\n\n"
+            partes = [PROMPT_BATCH_ANTES, str(len(dados_batch)), PROMPT_BATCH_DEPOIS]
+            partes.extend(
+                f"\n--- PESQUISADOR {i}: {dados['nome']} ---\n"
+                f"URL: {dados['url']}\n"
+                f"{self.aviso_campos_extraidos(dados['campos_extraidos'])}"
+                f"TEXTO DA PÁGINA:\n{dados['conteudo'][:CONFIG['MAX_CARACTERES_PAGINA']]}\n\n"
+                for i, dados in enumerate(dados_batch, 1)
+            )
+            prompt = "".join(partes)
             
-            response = self.modelo_gemini.generate_content(prompt)
+            texto = await self.gerar_texto_gemini(prompt)
             
-            if response and response.text:
+            if texto:
                 print("✅ Batch processado com sucesso")
-                return response.text
+                return texto
             else:
                 print("❌ Batch retornou resposta vazia")
                 return None
@@ -582,32 +906,30 @@ DADOS DOS PESQUISADORES:
             print(f"❌ Erro no batch: {e}")
             return None
     
-    def processar_resposta_gemini(self, resposta):
-        """Processa resposta do Gemini"""
-        dados = {}
+    def processar_resposta_gemini(self, resposta, campos_extraidos=None):
+        """Processa resposta do Gemini (campos já extraídos localmente têm prioridade)"""
+        dados = ResultadoPesquisador(**(campos_extraidos or {}))
         
         try:
-            linhas = resposta.strip().split('\n')
-            
-            for linha in linhas:
-                if ':' in linha:
-                    chave, valor = linha.split(':', 1)
-                    chave_limpa = chave.strip().lower().replace(' ', '_')
-                    valor_limpo = valor.strip()
-                    
-                    if valor_limpo and 'não encontrado' not in valor_limpo.lower():
-                        dados[chave_limpa] = valor_limpo
+            for linha in REGEX_LINHA_CAMPO.finditer(resposta):
+                campo = MAPA_CAMPOS.get(linha.group(1).strip('* ').lower())
+                if not campo or getattr(dados, campo) is not None:
+                    continue
+                
+                valor = linha.group(2).strip()
+                if valor and 'não encontrado' not in valor.casefold():
+                    setattr(dados, campo, valor)
             
-            dados['status_processamento'] = 'Sucesso'
-            print(f"✅ {len(dados)} campos extraídos")
+            dados.status_processamento = 'Sucesso'
+            print(f"✅ {len(resultado_para_dict(dados))} campos extraídos")
             
         except Exception as e:
             print(f"❌ Erro ao processar resposta: {e}")
-            dados = {'status_processamento': 'Erro no processamento'}
+            dados = ResultadoPesquisador(**(campos_extraidos or {}), status_processamento='Erro no processamento')
         
         return dados
     
-    def separar_resposta_batch(self, resposta_completa, nomes_batch, urls_batch):
+    def separar_resposta_batch(self, resposta_completa, nomes_batch, urls_batch, campos_batch=()):
         """Separa resposta do batch em dados individuais"""
         resultados = []
         
@@ -616,27 +938,28 @@ DADOS DOS PESQUISADORES:
             
             for i, secao in enumerate(secoes[1:], 1):
                 try:
-                    dados = self.processar_resposta_gemini(secao)
+                    campos_extraidos = campos_batch[i-1] if i <= len(campos_batch) else None
+                    dados = self.processar_resposta_gemini(secao, campos_extraidos)
                     
                     # Adicionar dados do batch
                     if i <= len(urls_batch):
-                        dados['url_fapesp'] = urls_batch[i-1]
+                        dados.url_fapesp = urls_batch[i-1]
                     
                     if i <= len(nomes_batch):
-                        if 'nome_completo' not in dados or dados['nome_completo'] == 'Não encontrado':
-                            dados['nome_completo'] = nomes_batch[i-1]
+                        if dados.nome_completo is None:
+                            dados.nome_completo = nomes_batch[i-1]
                     
-                    dados['modo_processamento'] = 'Batch Otimizado'
+                    dados.modo_processamento = 'Batch Otimizado'
                     resultados.append(dados)
                     
                 except Exception as e:
                     print(f"❌ Erro no pesquisador {i}: {e}")
                     nome_fallback = nomes_batch[i-1] if i <= len(nomes_batch) else f"Pesquisador {i}"
-                    resultados.append({
-                        'nome_completo': nome_fallback,
-                        'status_processamento': 'Erro no processamento',
-                        'modo_processamento': 'Batch Otimizado'
-                    })
+                    resultados.append(ResultadoPesquisador(
+                        nome_completo=nome_fallback,
+                        status_processamento='Erro no processamento',
+                        modo_processamento='Batch Otimizado'
+                    ))
             
             return resultados
             
@@ -646,9 +969,12 @@ DADOS DOS PESQUISADORES:
     
     def salvar_resultado(self, dados, nome_pesquisador, index):
         """Salva resultado individual"""
+        if dados.status_processamento == 'Sucesso' and dados.nome_completo:
+            self.nomes_sucesso.add(dados.nome_completo.strip().lower())
+        
         try:
-            nome_arquivo = re.sub(r'[^\w\s-]', '', nome_pesquisador)
-            nome_arquivo = re.sub(r'\s+', '_', nome_arquivo.strip())[:50]
+            nome_arquivo = REGEX_CARACTERES_INVALIDOS.sub('', nome_pesquisador)
+            nome_arquivo = REGEX_ESPACOS.sub('_', nome_arquivo.strip())[:50]
             nome_base = f"FAPESP_{nome_arquivo}_{self.timestamp}"
             
             # JSON
@@ -659,187 +985,287 @@ DADOS DOS PESQUISADORES:
                     "data_hora": datetime.now().isoformat(),
                     "versao": "funcional-completa",
                     "index": index,
-                    "modo": dados.get('modo_processamento', 'Individual')
+                    "modo": dados.modo_processamento or 'Individual'
                 },
-                "dados": dados
+                "dados": resultado_para_dict(dados)
             }
             
-            with open(arquivo_json, 'w', encoding='utf-8') as f:
-                json.dump(dados_json, f, indent=2, ensure_ascii=False)
-            
-            # CSV
-            arquivo_csv = self.pasta_resultados / f"{nome_base}.csv"
-            linha = {}
-            for campo in CAMPOS_CSV:
-                linha[campo] = dados.get(campo, 'Não encontrado')
+            if CONFIG['ARQUIVOS_INDIVIDUAIS']:
+                arquivo_json.write_bytes(orjson.dumps(dados_json, option=orjson.OPT_INDENT_2))
             
-            df = pd.DataFrame([linha])
-            df.to_csv(arquivo_csv, index=False, encoding='utf-8')
+            # CSV e NDJSON (acumulados e gravados uma única vez em salvar_consolidados)
+            self.registros_json.append(dados_json)
+            if len(self.registros_json) >= CONFIG['TAMANHO_BUFFER_NDJSON']:
+                self.descarregar_ndjson()
+            self.linhas_csv.append({campo: getattr(dados, campo) or 'Não encontrado' for campo in CAMPOS_CSV})
             
             print(f"💾 Salvo: {nome_base}")
             
         except Exception as e:
             print(f"❌ Erro ao salvar {nome_pesquisador}: {e}")
     
-    def processar_individual(self, nome, index):
-        """Processa um pesquisador individual"""
+    def descarregar_ndjson(self):
+        """Acrescenta o buffer ao NDJSON consolidado em uma única escrita e o esvazia"""
+        if not self.registros_json:
+            return
+        
+        try:
+            # .ndjson (e não .json) para não ser confundido com os arquivos individuais
+            arquivo_ndjson = self.pasta_resultados / f"FAPESP_consolidado_{self.timestamp}.ndjson"
+            with open(arquivo_ndjson, 'ab', buffering=1 << 20) as f:
+                f.write(b"".join(orjson.dumps(r) + b"\n" for r in self.registros_json))
+            self.registros_json.clear()
+            
+        except Exception as e:
+            print(f"❌ Erro ao gravar NDJSON consolidado: {e}")
+    
+    def salvar_consolidados(self):
+        """Grava o CSV consolidado e o restante do buffer do NDJSON"""
+        if not self.linhas_csv:
+            return
+        
+        self.descarregar_ndjson()
+        print(f"💾 NDJSON consolidado: FAPESP_consolidado_{self.timestamp}.ndjson")
+        
+        try:
+            arquivo_csv = self.pasta_resultados / f"FAPESP_consolidado_{self.timestamp}.csv"
+            pacsv.write_csv(pa.Table.from_pylist(self.linhas_csv), arquivo_csv)
+            print(f"💾 CSV consolidado: {arquivo_csv.name} ({len(self.linhas_csv)} pesquisadores)")
+            
+        except Exception as e:
+            print(f"❌ Erro ao salvar CSV consolidado: {e}")
+    
+    def resultado_em_cache(self, nome, index):
+        """Salva e devolve os dados já extraídos pelo Gemini em outra execução"""
+        entrada = self.consultar_cache(nome)
+        if not entrada or not entrada.get('dados'):
+            return None
+        print(f"🗄️ [{index}] {nome} - resultado em cache")
+        dados = ResultadoPesquisador(**entrada['dados'])
+        self.salvar_resultado(dados, nome, index)
+        return dados
+    
+    async def coletar_e_processar(self, nome, index):
+        """Coleta a página e já envia ao Gemini, sem esperar os demais nomes"""
+        dados = self.resultado_em_cache(nome, index)
+        if dados:
+            return dados
+        
+        nome, url, conteudo = await self.coletar_pesquisador(nome)
+        return await self.processar_individual(nome, index, url, conteudo)
+    
+    async def processar_individual(self, nome, index, url, conteudo):
+        """Processa um pesquisador individual a partir da página já coletada"""
         try:
             print(f"\n📋 [{index}] PROCESSANDO: {nome}")
             print("=" * 50)
             
             # Buscar
-            url = self.buscar_pesquisador(nome)
             if not url:
-                return {
-                    'nome_completo': nome,
-                    'status_processamento': 'Não encontrado',
-                    'modo_processamento': 'Individual'
-                }
+                return ResultadoPesquisador(
+                    nome_completo=nome,
+                    status_processamento='Não encontrado',
+                    modo_processamento='Individual'
+                )
             
             # Extrair
-            conteudo = self.extrair_dados_pagina(url)
             if not conteudo:
-                return {
-                    'nome_completo': nome,
-                    'status_processamento': 'Erro na extração',
-                    'modo_processamento': 'Individual'
-                }
+                return ResultadoPesquisador(
+                    nome_completo=nome,
+                    status_processamento='Erro na extração',
+                    modo_processamento='Individual'
+                )
+            
+            # Campos triviais saem por regex; o Gemini cuida do restante
+            campos_extraidos = self.pre_extrair_campos(conteudo)
             
             # Processar com Gemini
-            resposta = self.processar_individual_gemini(conteudo, nome)
+            resposta = await self.processar_individual_gemini(conteudo, nome, campos_extraidos)
             if not resposta:
-                return {
-                    'nome_completo': nome,
-                    'status_processamento': 'Erro no Gemini',
-                    'modo_processamento': 'Individual'
-                }
+                return ResultadoPesquisador(
+                    nome_completo=nome,
+                    status_processamento='Erro no Gemini',
+                    modo_processamento='Individual'
+                )
             
             # Processar resposta
-            dados = self.processar_resposta_gemini(resposta)
-            dados['url_fapesp'] = url
-            dados['modo_processamento'] = 'Individual'
+            dados = self.processar_resposta_gemini(resposta, campos_extraidos)
+            dados.url_fapesp = url
+            dados.modo_processamento = 'Individual'
+            if dados.status_processamento == 'Sucesso':
+                self.guardar_cache(nome, dados=resultado_para_dict(dados))
             
             # Salvar
             self.salvar_resultado(dados, nome, index)
             
             print(f"✅ [{index}] {nome} - CONCLUÍDO")
+            sys.stdout.flush()
             return dados
             
         except Exception as e:
             print(f"❌ [{index}] Erro geral: {e}")
-            return {
-                'nome_completo': nome,
-                'status_processamento': f'Erro: {str(e)[:100]}',
-                'modo_processamento': 'Individual'
-            }
+            return ResultadoPesquisador(
+                nome_completo=nome,
+                status_processamento=f'Erro: {str(e)[:100]}',
+                modo_processamento='Individual'
+            )
     
-    def processar_batch(self, nomes, batch_size):
+    async def processar_batch(self, nomes, batch_size):
         """Processa pesquisadores em batch"""
         try:
-            resultados_totais = []
-            
-            # Dividir em grupos
-            for i in range(0, len(nomes), batch_size):
-                grupo = nomes[i:i+batch_size]
-                numero_grupo = (i // batch_size) + 1
-                total_grupos = (len(nomes) + batch_size - 1) // batch_size
+            # Uma posição por nome da lista: cada resultado cai no seu lugar,
+            # qualquer que seja a ordem em que os grupos terminam
+            resultados_totais = [None] * len(nomes)
+            excedentes = []  # seções a mais devolvidas pelo Gemini, sem nome correspondente
+            tarefas_gemini = []
+            
+            # Dividir em grupos (uma vez, antes do laço)
+            grupos = [nomes[i:i+batch_size] for i in range(0, len(nomes), batch_size)]
+            total_grupos = len(grupos)
+            proxima_coleta = 0.0  # instante (monotonic) liberado para a próxima ida à FAPESP
+            
+            for numero_grupo, grupo in enumerate(grupos, 1):
+                i = (numero_grupo - 1) * batch_size
                 
                 print(f"\n🚀 GRUPO {numero_grupo}/{total_grupos}")
                 print(f"📋 {len(grupo)} pesquisadores: {', '.join(grupo)}")
                 print("=" * 60)
                 
-                # Coletar dados
+                # Coletar dados (abas em paralelo)
                 dados_batch = []
-                nomes_batch = []
-                urls_batch = []
                 
-                for nome in grupo:
-                    print(f"🔍 Coletando: {nome}")
-                    
-                    url = self.buscar_pesquisador(nome)
+                # Já processados em execuções anteriores não voltam ao navegador nem ao Gemini
+                pendentes = []
+                posicoes = []
+                for posicao, nome in enumerate(grupo, i):
+                    dados = self.resultado_em_cache(nome, posicao + 1)
+                    if dados:
+                        resultados_totais[posicao] = dados
+                    else:
+                        pendentes.append(nome)
+                        posicoes.append(posicao)
+                
+                # Intervalo mínimo entre coletas, descontado o tempo já decorrido;
+                # grupos inteiramente em cache não acessam a FAPESP e não esperam
+                if pendentes:
+                    delay = proxima_coleta - time.monotonic()
+                    if delay > 0:
+                        print(f"⏳ Aguardando {delay:.1f} segundos...")
+                        await asyncio.sleep(delay)
+                    proxima_coleta = time.monotonic() + CONFIG['DELAY_ENTRE_REQUESTS']
+                
+                print(f"🔍 Coletando {len(pendentes)} páginas em paralelo...")
+                sys.stdout.flush()
+                coletas = await self.coletar_paginas(pendentes, f"Grupo {numero_grupo}/{total_grupos}")
+                
+                for posicao, (nome, url, conteudo) in zip(posicoes, coletas):
                     if url:
-                        conteudo = self.extrair_dados_pagina(url)
                         if conteudo:
                             dados_batch.append({
+                                'posicao': posicao,
                                 'nome': nome,
                                 'url': url,
-                                'conteudo': conteudo
+                                'conteudo': conteudo,
+                                'campos_extraidos': self.pre_extrair_campos(conteudo)
                             })
-                            nomes_batch.append(nome)
-                            urls_batch.append(url)
-                            print(f"✅ Coletado: {nome}")
                         else:
                             print(f"❌ Erro na extração: {nome}")
                     else:
                         print(f"❌ Não encontrado: {nome}")
                 
+                print(f"✅ {len(dados_batch)}/{len(pendentes)} páginas coletadas")
+                
                 if dados_batch:
-                    print(f"\n🤖 Processando {len(dados_batch)} pesquisadores em batch...")
-                    
-                    # Processar com Gemini
-                    resposta_batch = self.processar_batch_gemini(dados_batch)
-                    
-                    if resposta_batch:
-                        # Separar resultados
-                        resultados_grupo = self.separar_resposta_batch(resposta_batch, nomes_batch, urls_batch)
-                        
-                        # Salvar individuais
-                        for j, resultado in enumerate(resultados_grupo):
-                            index_global = i + j + 1
-                            nome_pesquisador = resultado.get('nome_completo', f'Pesquisador_{index_global}')
-                            self.salvar_resultado(resultado, nome_pesquisador, index_global)
-                            resultados_totais.append(resultado)
-                        
-                        print(f"✅ Grupo {numero_grupo} processado: {len(resultados_grupo)} resultados")
+                    # Gemini roda em segundo plano enquanto o próximo grupo é coletado
+                    print(f"\n🤖 Enviando {len(dados_batch)} pesquisadores ao Gemini em batch...")
+                    tarefas_gemini.append(asyncio.create_task(
+                        self.processar_grupo_gemini(dados_batch, numero_grupo)
+                    ))
+            
+            for resultados_grupo in await asyncio.gather(*tarefas_gemini):
+                for posicao, resultado in resultados_grupo:
+                    if posicao is None:
+                        excedentes.append(resultado)
                     else:
-                        print(f"❌ Erro no processamento do grupo {numero_grupo}")
-                
-                # Delay entre grupos
-                if i + batch_size < len(nomes):
-                    delay = CONFIG['DELAY_ENTRE_REQUESTS']
-                    print(f"⏳ Aguardando {delay} segundos...")
-                    time.sleep(delay)
+                        resultados_totais[posicao] = resultado
             
-            return resultados_totais
+            # Nomes não encontrados ou sem página não geram resultado no modo batch
+            return [r for r in resultados_totais if r is not None] + excedentes
             
         except Exception as e:
             print(f"❌ Erro no batch: {e}")
             return []
     
-    def gerar_relatorios_finais(self, nomes_iniciais, resultados):
-        """Gera relatórios CSV de comparação e de nomes não encontrados."""
+    async def processar_grupo_gemini(self, dados_batch, numero_grupo):
+        """Envia um grupo coletado ao Gemini, separa e salva os resultados (pares posição, resultado)"""
+        resposta_batch = await self.processar_batch_gemini(dados_batch)
+        
+        if not resposta_batch:
+            print(f"❌ Erro no processamento do grupo {numero_grupo}")
+            return []
+        
+        # Separar resultados
+        nomes_batch = [dados['nome'] for dados in dados_batch]
+        urls_batch = [dados['url'] for dados in dados_batch]
+        campos_batch = [dados['campos_extraidos'] for dados in dados_batch]
+        resultados_grupo = self.separar_resposta_batch(resposta_batch, nomes_batch, urls_batch, campos_batch)
+        
+        # Salvar individuais
+        posicionados = []
+        for j, resultado in enumerate(resultados_grupo):
+            posicao = dados_batch[j]['posicao'] if j < len(dados_batch) else None
+            index_global = (posicao if posicao is not None else dados_batch[0]['posicao'] + j) + 1
+            nome_pesquisador = resultado.nome_completo or f'Pesquisador_{index_global}'
+            self.salvar_resultado(resultado, nome_pesquisador, index_global)
+            if posicao is not None and resultado.status_processamento == 'Sucesso':
+                self.guardar_cache(nomes_batch[j], dados=resultado_para_dict(resultado))
+            posicionados.append((posicao, resultado))
+        self.descarregar_ndjson()
+        
+        print(f"✅ Grupo {numero_grupo} processado: {len(resultados_grupo)} resultados")
+        sys.stdout.flush()
+        return posicionados
+    
+    def salvar_relatorio(self, df, nome_base, formato):
+        """Grava um relatório em Parquet (zstd) ou Feather (lz4); em CSV com --relatorios-csv"""
+        if CONFIG['RELATORIOS_CSV']:
+            arquivo = self.pasta_resultados / f"{nome_base}.csv"
+            df.to_csv(arquivo, index=False, encoding='utf-8', lineterminator='\n')
+        elif formato == 'parquet':
+            arquivo = self.pasta_resultados / f"{nome_base}.parquet"
+            df.to_parquet(arquivo, index=False, compression='zstd', compression_level=3)
+        else:
+            arquivo = self.pasta_resultados / f"{nome_base}.feather"
+            df.to_feather(arquivo, compression='lz4')
+        return arquivo
+    
+    def gerar_relatorios_finais(self, nomes_iniciais):
+        """Gera relatórios de comparação e de nomes não encontrados."""
         try:
             print("\n📊 Gerando relatórios finais...")
             
-            # Usar nomes iniciais como a fonte da verdade
-            dados_comparacao = []
-            nomes_nao_encontrados = []
-            
-            # Criar um conjunto de nomes encontrados com sucesso para busca rápida
-            nomes_sucesso = {r.get('nome_completo', '').strip().lower() 
-                             for r in resultados 
-                             if r.get('status_processamento') == 'Sucesso'}
-
-            for nome in nomes_iniciais:
-                if nome.strip().lower() in nomes_sucesso:
-                    status = 'Encontrado'
-                else:
-                    status = 'Não Encontrado'
-                    nomes_nao_encontrados.append(nome)
-                
-                dados_comparacao.append({'nome_pesquisado': nome, 'status': status})
+            # Usar nomes iniciais como a fonte da verdade (kernels do Arrow, sem laço Python)
+            nomes = pa.array(nomes_iniciais, type=pa.string())
+            encontrado = pc.is_in(
+                pc.utf8_lower(pc.utf8_trim_whitespace(nomes)),
+                value_set=pa.array(list(self.nomes_sucesso), type=pa.string())
+            )
 
-            if dados_comparacao:
-                df_comp = pd.DataFrame(dados_comparacao)
-                arquivo_comp = self.pasta_resultados / f"relatorio_comparativo_{self.timestamp}.csv"
-                df_comp.to_csv(arquivo_comp, index=False, encoding='utf-8')
+            if len(nomes):
+                df_comp = pa.table({
+                    'nome_pesquisado': nomes,
+                    'status': pc.if_else(encontrado, 'Encontrado', 'Não Encontrado')
+                }).to_pandas()
+                arquivo_comp = self.salvar_relatorio(df_comp, f"relatorio_comparativo_{self.timestamp}", 'parquet')
                 print(f"✅ Relatório de comparação salvo em: {arquivo_comp}")
 
             # 2. Gerar lista de não encontrados
-            if nomes_nao_encontrados:
-                df_nao_encontrados = pd.DataFrame(nomes_nao_encontrados, columns=['nome_nao_encontrado'])
-                arquivo_nao_encontrados = self.pasta_resultados / f"nomes_nao_encontrados_{self.timestamp}.csv"
-                df_nao_encontrados.to_csv(arquivo_nao_encontrados, index=False, encoding='utf-8')
+            nomes_nao_encontrados = pc.filter(nomes, pc.invert(encontrado))
+            if len(nomes_nao_encontrados):
+                df_nao_encontrados = pa.table({'nome_nao_encontrado': nomes_nao_encontrados}).to_pandas()
+                arquivo_nao_encontrados = self.salvar_relatorio(
+                    df_nao_encontrados, f"nomes_nao_encontrados_{self.timestamp}", 'feather'
+                )
                 print(f"✅ Lista de nomes não encontrados salva em: {arquivo_nao_encontrados}")
             else:
                 print("👍 Todos os nomes da lista foram encontrados.")
@@ -847,7 +1273,7 @@ DADOS DOS PESQUISADORES:
         except Exception as e:
             print(f"❌ Erro ao gerar relatórios finais: {e}")
     
-    def executar(self):
+    async def executar(self):
         """Execução principal"""
         try:
             self.mostrar_banner()
@@ -883,37 +1309,34 @@ DADOS DOS PESQUISADORES:
             # Inicialização
             headless = input("🖥️ Executar sem mostrar browser? (S/n): ").lower() != 'n'
             
-            if not self.inicializar_selenium(headless):
+            if not await self.inicializar_navegador(headless):
                 return False
             
-            if not self.inicializar_gemini(modelo_info):
+            if not await self.inicializar_gemini(modelo_info):
                 return False
             
+            self.abrir_cache()
+            
             # Processamento
             tempo_inicio = time.time()
             
             if batch_otimizado:
                 print(f"\n⚡ PROCESSAMENTO EM BATCH OTIMIZADO")
-                resultados = self.processar_batch(nomes, batch_size)
+                resultados = await self.processar_batch(nomes, batch_size)
             else:
                 print(f"\n🔄 PROCESSAMENTO INDIVIDUAL")
-                resultados = []
-                
-                for i, nome in enumerate(nomes, 1):
-                    resultado = self.processar_individual(nome, i)
-                    resultados.append(resultado)
-                    
-                    if i < len(nomes):
-                        delay = CONFIG['DELAY_ENTRE_REQUESTS']
-                        print(f"⏳ Aguardando {delay} segundos...")
-                        time.sleep(delay)
+                print(f"🔍 Coletando {len(nomes)} páginas ({CONFIG['CONCORRENCIA']} abas em paralelo)...")
+                resultados = list(await asyncio.gather(
+                    *(self.coletar_e_processar(nome, i) for i, nome in enumerate(nomes, 1))
+                ))
             
-            # Gerar relatórios finais
-            self.gerar_relatorios_finais(nomes, resultados)
+            # Gerar arquivos consolidados e relatórios finais
+            self.salvar_consolidados()
+            self.gerar_relatorios_finais(nomes)
             
             # Estatísticas
             tempo_total = time.time() - tempo_inicio
-            sucessos = sum(1 for r in resultados if r.get('status_processamento') == 'Sucesso')
+            sucessos = sum(1 for r in resultados if r.status_processamento == 'Sucesso')
             
             print(f"\n🏁 PROCESSAMENTO CONCLUÍDO!")
             print(f"⏱️ Tempo total: {tempo_total/60:.1f} minutos")
@@ -934,15 +1357,17 @@ DADOS DOS PESQUISADORES:
             print(f"\n❌ Erro geral: {e}")
             return False
         finally:
-            if self.driver:
-                try:
-                    self.driver.quit()
-                    print("✅ Browser fechado")
-                except:
-                    pass
+            self.fechar_cache()
+            await self.fechar_navegador()
 
 def main():
     """Função principal"""
+    # Saída em blocos: o progresso é descarregado ao fim de cada grupo/pesquisador
+    # (e antes de cada input), não a cada linha impressa. IDLE/Jupyter trocam o
+    # sys.stdout por objetos sem reconfigure: lá fica o buffer padrão
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=False, write_through=False)
+    
     print("🔬 EXTRATOR FAPESP - VERSÃO FUNCIONAL COMPLETA")
     print("⚡ Batch configurável + Modelos 2.0/2.5 + Formato específico")
     print()
@@ -953,11 +1378,13 @@ def main():
     extrator = ExtratorFAPESP()
     
     try:
-        sucesso = extrator.executar()
+        sucesso = asyncio.run(extrator.executar())
         if sucesso:
             print("\n🎉 EXTRAÇÃO CONCLUÍDA COM SUCESSO!")
         else:
             print("\n💥 EXTRAÇÃO FINALIZADA COM PROBLEMAS")
+    except KeyboardInterrupt:
+        print("\n⏹️ Interrompido pelo usuário")
     except Exception as e:
         print(f"\n💥 ERRO CRÍTICO: {e}")
     finally:
@@ -3,13 +3,116 @@
 """
 Script Robusto para Conversão CSV → Excel - Projeto FAPES
 Auto-detecção de arquivos
+Gera também um Parquet da análise completa (--sem-excel dispensa a planilha)
 """
 
-import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import xlsxwriter
 import os
-import glob
+import sys
+import json
+from itertools import repeat
 from datetime import datetime
 
+# O Parquet é sempre gerado; o Excel pode ser dispensado com --sem-excel
+GERAR_EXCEL = '--sem-excel' not in sys.argv
+
+# constant_memory grava cada linha em disco assim que a próxima começa;
+# textos que parecem URL ou fórmula são gravados como texto simples
+OPCOES_XLSXWRITER = {
+    'constant_memory': True,
+    'strings_to_urls': False,
+    'strings_to_formulas': False,
+    'default_date_format': 'dd/mm/yyyy hh:mm:ss',
+    'remove_timezone': True,
+    # XML temporário das abas em RAM quando há /dev/shm; zip64 para planilhas acima de 4GB
+    'tmpdir': '/dev/shm' if os.path.isdir('/dev/shm') else None,
+    'use_zip64': True
+}
+
+# Justificativas do Gemini podem ter quebras de linha dentro das aspas;
+# texto vazio vira nulo, como no pd.read_csv padrão
+OPCOES_LEITURA_CSV = pacsv.ParseOptions(newlines_in_values=True)
+OPCOES_CONVERSAO_CSV = pacsv.ConvertOptions(strings_can_be_null=True)
+
+# Linhas convertidas para objetos Python de cada vez na escrita do Excel
+TAMANHO_LOTE = 50_000
+
+# CSVs podem vir compactados; o pyarrow descompacta pela extensão
+EXTENSOES_CSV = ('.csv', '.csv.gz')
+
+# Termos que identificam cada arquivo, em ordem de prioridade
+# (equivalem aos antigos padrões glob *clientes*viáveis*.csv etc.)
+PADROES_VIAVEIS = [
+    ('clientes', 'viáveis'),
+    ('clientes', 'viaveis'),
+    ('lista_clientes_viaveis',),
+    ('viaveis',)
+]
+
+PADROES_NEGATIVOS = [
+    ('fatores', 'negativos'),
+    ('lista_n', 'fatores'),
+    ('n_fatores',),
+    ('negativos',)
+]
+
+PADROES_ARQUIVOS = {
+    'viaveis': PADROES_VIAVEIS,
+    'negativos': PADROES_NEGATIVOS
+}
+
+# Arquivos encontrados por pasta; vale enquanto o mtime da pasta não mudar
+CACHE_ARQUIVOS = os.path.join(os.path.expanduser('~'), '.cache', 'fapes_arquivos_encontrados.json')
+
+def consultar_cache_arquivos(input_dir, mtime):
+    """Retorna os arquivos da execução anterior se a pasta não mudou desde então"""
+    try:
+        with open(CACHE_ARQUIVOS, encoding='utf-8') as f:
+            entrada = json.load(f).get(input_dir)
+    except (OSError, ValueError):
+        return None
+    
+    if not entrada or entrada.get('mtime') != mtime:
+        return None
+    if not all(os.path.exists(arquivo) for arquivo in entrada['arquivos']):
+        return None
+    return entrada['arquivos']
+
+def guardar_cache_arquivos(input_dir, mtime, arquivos):
+    """Registra os arquivos encontrados para a pasta"""
+    try:
+        with open(CACHE_ARQUIVOS, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    
+    cache[input_dir] = {'mtime': mtime, 'arquivos': list(arquivos)}
+    try:
+        os.makedirs(os.path.dirname(CACHE_ARQUIVOS), exist_ok=True)
+        with open(CACHE_ARQUIVOS, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"   ⚠️ Não foi possível salvar o cache de arquivos: {e}")
+
+# Coluna que identifica de qual lista veio cada registro
+COLUNA_ORIGEM = 'origem_dataset'
+
+def classificar_arquivos(input_dir, nomes_csv):
+    """Numa única passada pelos nomes, guarda para cada categoria o arquivo
+    que atende ao padrão de maior prioridade (no empate, o de maior nome: o mais recente)"""
+    melhores = {}
+    for nome in nomes_csv:
+        minusculo = nome.lower()
+        for categoria, padroes in PADROES_ARQUIVOS.items():
+            prioridade = next((i for i, termos in enumerate(padroes)
+                               if all(termo in minusculo for termo in termos)), None)
+            if prioridade is not None and prioridade < melhores.get(categoria, (len(padroes),))[0]:
+                melhores[categoria] = (prioridade, nome)
+    return {categoria: os.path.join(input_dir, nome) for categoria, (_, nome) in melhores.items()}
+
 def encontrar_arquivos(input_dir):
     """Encontra automaticamente os arquivos CSV necessários"""
     
@@ -19,124 +122,188 @@ def encontrar_arquivos(input_dir):
         print(f"❌ Diretório não existe: {input_dir}")
         return None, None
     
-    # Padrões para buscar os arquivos
-    padroes_viaveis = [
-        "*clientes*viáveis*.csv",
-        "*clientes*viaveis*.csv", 
-        "*lista_clientes_viaveis*.csv",
-        "*viaveis*.csv"
-    ]
-    
-    padroes_negativos = [
-        "*fatores*negativos*.csv",
-        "*lista_N*fatores*.csv",
-        "*N_fatores*.csv",
-        "*negativos*.csv"
-    ]
+    # Criar, remover ou renomear arquivos altera o mtime da pasta
+    mtime = os.stat(input_dir).st_mtime_ns
+    em_cache = consultar_cache_arquivos(input_dir, mtime)
+    if em_cache:
+        print("   ⚡ Pasta inalterada, usando arquivos da execução anterior")
+        for arquivo in em_cache:
+            print(f"   ✓ Encontrado: {os.path.basename(arquivo)}")
+        return tuple(em_cache)
     
-    arquivo_viaveis = None
-    arquivo_negativos = None
+    # Uma única listagem da pasta; os padrões são testados sobre os nomes, do mais
+    # novo para o mais antigo (lista_..._<AAAAmmdd_HHMMSS>.csv: a última execução vence)
+    with os.scandir(input_dir) as entradas:
+        nomes_csv = sorted((entrada.name for entrada in entradas
+                            if entrada.is_file() and entrada.name.endswith(EXTENSOES_CSV)), reverse=True)
+    encontrados = classificar_arquivos(input_dir, nomes_csv)
     
     # Buscar arquivo de clientes viáveis
     print("\n📁 Procurando arquivo de clientes viáveis...")
-    for padrao in padroes_viaveis:
-        arquivos = glob.glob(os.path.join(input_dir, padrao))
-        if arquivos:
-            arquivo_viaveis = arquivos[0]  # Pega o primeiro encontrado
-            print(f"   ✓ Encontrado: {os.path.basename(arquivo_viaveis)}")
-            break
-    
-    if not arquivo_viaveis:
+    arquivo_viaveis = encontrados.get('viaveis')
+    if arquivo_viaveis:
+        print(f"   ✓ Encontrado: {os.path.basename(arquivo_viaveis)}")
+    else:
         print("   ❌ Arquivo de clientes viáveis não encontrado")
     
     # Buscar arquivo de fatores negativos  
     print("\n📁 Procurando arquivo de fatores negativos...")
-    for padrao in padroes_negativos:
-        arquivos = glob.glob(os.path.join(input_dir, padrao))
-        if arquivos:
-            arquivo_negativos = arquivos[0]  # Pega o primeiro encontrado
-            print(f"   ✓ Encontrado: {os.path.basename(arquivo_negativos)}")
-            break
-    
-    if not arquivo_negativos:
+    arquivo_negativos = encontrados.get('negativos')
+    if arquivo_negativos:
+        print(f"   ✓ Encontrado: {os.path.basename(arquivo_negativos)}")
+    else:
         print("   ❌ Arquivo de fatores negativos não encontrado")
     
     # Listar todos os CSVs disponíveis se não encontrou
     if not arquivo_viaveis or not arquivo_negativos:
         print(f"\n📋 Todos os arquivos CSV disponíveis em {input_dir}:")
-        todos_csvs = glob.glob(os.path.join(input_dir, "*.csv"))
-        if todos_csvs:
-            for i, csv_file in enumerate(sorted(todos_csvs), 1):
-                print(f"   {i:2d}. {os.path.basename(csv_file)}")
+        if nomes_csv:
+            for i, csv_file in enumerate(nomes_csv, 1):
+                print(f"   {i:2d}. {csv_file}")
         else:
             print("   ❌ Nenhum arquivo CSV encontrado!")
+    else:
+        guardar_cache_arquivos(input_dir, mtime, (arquivo_viaveis, arquivo_negativos))
     
     return arquivo_viaveis, arquivo_negativos
 
+def ler_csv(caminho):
+    """Lê um CSV (ou .csv.gz) com o parser multithread do pyarrow, com tipos inferidos uma vez"""
+    return pacsv.read_csv(caminho, parse_options=OPCOES_LEITURA_CSV, convert_options=OPCOES_CONVERSAO_CSV)
+
 def carregar_e_processar(arquivo_viaveis, arquivo_negativos):
-    """Carrega e processa os arquivos CSV"""
+    """Carrega os arquivos CSV como tabelas Arrow (colunares e compactas)"""
     
     try:
         # Carregar dados
         print(f"\n📊 Carregando dados...")
-        df_viaveis = pd.read_csv(arquivo_viaveis, encoding='utf-8')
-        print(f"   ✓ Clientes viáveis: {len(df_viaveis)} registros")
+        tabela_viaveis = ler_csv(arquivo_viaveis)
+        print(f"   ✓ Clientes viáveis: {tabela_viaveis.num_rows} registros")
         
-        df_negativos = pd.read_csv(arquivo_negativos, encoding='utf-8')
-        print(f"   ✓ Fatores negativos: {len(df_negativos)} registros")
+        tabela_negativos = ler_csv(arquivo_negativos)
+        print(f"   ✓ Fatores negativos: {tabela_negativos.num_rows} registros")
         
-        # Adicionar identificação
-        df_viaveis['origem_dataset'] = 'Clientes Viáveis'
-        df_negativos['origem_dataset'] = 'Fatores Negativos'
+        # A combinação é feita na escrita da aba principal, sem concat em memória
+        print(f"   ✓ Total combinado: {tabela_viaveis.num_rows + tabela_negativos.num_rows} registros")
         
-        # Combinar
-        df_completo = pd.concat([df_viaveis, df_negativos], ignore_index=True)
-        print(f"   ✓ Total combinado: {len(df_completo)} registros")
-        
-        return df_completo, df_viaveis, df_negativos
+        return tabela_viaveis, tabela_negativos
         
     except Exception as e:
         print(f"❌ Erro ao processar arquivos: {e}")
-        return None, None, None
+        return None, None
 
-def salvar_excel(df_completo, df_viaveis, df_negativos, output_dir):
-    """Salva os dados em Excel"""
+def lotes_de_registros(tabela, origem):
+    """Gera os registros da tabela em lotes de TAMANHO_LOTE linhas, já com a origem no fim.
+
+    Só um lote por vez é convertido em objetos Python.
+    """
+    for lote in tabela.to_batches(max_chunksize=TAMANHO_LOTE):
+        # Cada coluna vira tipos nativos (str, float, datetime) de uma vez, com None
+        # nos nulos, e as linhas saem prontas para o write_row sem NaN nem pd.Timestamp
+        colunas = [coluna.to_pylist() for coluna in lote.columns]
+        yield list(zip(*colunas, repeat(origem, lote.num_rows)))
+        
+        # Solta o lote já gravado antes de converter o próximo
+        del colunas
+
+def escrever_registros(worksheet, linha, registros, posicoes=None):
+    """Grava os registros a partir de `linha` e retorna a próxima linha livre.
+
+    `posicoes` indica a coluna de cada valor quando a aba tem mais colunas que o registro.
+    """
+    for registro in registros:
+        if posicoes is None:
+            worksheet.write_row(linha, 0, registro)
+        else:
+            for coluna, valor in zip(posicoes, registro):
+                worksheet.write(linha, coluna, valor)
+        linha += 1
+    return linha
+
+def salvar_parquet(tabela_viaveis, tabela_negativos, output_dir, momento):
+    """Salva a análise completa em Parquet, bem mais rápido de gravar e ler que o Excel"""
+    
+    os.makedirs(output_dir, exist_ok=True)
+    nome_arquivo = f"analise_fapes_{momento.strftime('%Y%m%d_%H%M%S')}.parquet"
+    caminho_saida = os.path.join(output_dir, nome_arquivo)
+    
+    try:
+        print(f"\n💾 Salvando arquivo Parquet...")
+        
+        # Origem como coluna dicionário: um valor por linha custa só o índice
+        partes = [
+            tabela.append_column(COLUNA_ORIGEM, pa.repeat(origem, tabela.num_rows).dictionary_encode())
+            for tabela, origem in ((tabela_viaveis, 'Clientes Viáveis'), (tabela_negativos, 'Fatores Negativos'))
+        ]
+        
+        # Mesma união de colunas da aba principal; tipos divergentes são promovidos
+        tabela_completa = pa.concat_tables(partes, promote_options='permissive')
+        pq.write_table(tabela_completa, caminho_saida, compression='zstd')
+        
+        print(f"   ✅ Sucesso! Arquivo salvo: {nome_arquivo}")
+        return caminho_saida
+        
+    except Exception as e:
+        print(f"❌ Erro ao salvar Parquet: {e}")
+        return None
+
+def salvar_excel(tabela_viaveis, tabela_negativos, output_dir, momento):
+    """Salva os dados em Excel; `momento` marca tanto o nome do arquivo quanto as estatísticas"""
     
     # Criar diretório se não existir
     os.makedirs(output_dir, exist_ok=True)
     
     # Nome do arquivo com timestamp
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    timestamp = momento.strftime('%Y%m%d_%H%M%S')
     nome_arquivo = f"analise_fapes_{timestamp}.xlsx"
     caminho_saida = os.path.join(output_dir, nome_arquivo)
     
     try:
         print(f"\n💾 Salvando arquivo Excel...")
         
-        with pd.ExcelWriter(caminho_saida, engine='openpyxl') as writer:
-            # Aba principal
-            df_completo.to_excel(writer, sheet_name='Análise Completa', index=False)
+        with xlsxwriter.Workbook(caminho_saida, OPCOES_XLSXWRITER) as workbook:
+            formato_cabecalho = workbook.add_format({'bold': True, 'border': 1})
             
-            # Abas separadas
-            df_viaveis.to_excel(writer, sheet_name='Clientes Viáveis', index=False)
-            df_negativos.to_excel(writer, sheet_name='Fatores Negativos', index=False)
+            # Cada lista vira uma aba própria, com o nome da origem
+            partes = [(tabela_viaveis, 'Clientes Viáveis'), (tabela_negativos, 'Fatores Negativos')]
             
-            # Estatísticas básicas
-            stats_data = {
-                'Métrica': [
-                    'Total de Registros',
-                    'Clientes Viáveis', 
-                    'Fatores Negativos',
-                    'Data de Processamento'
-                ],
-                'Valor': [
-                    len(df_completo),
-                    len(df_viaveis),
-                    len(df_negativos),
-                    datetime.now().strftime('%d/%m/%Y %H:%M:%S')
-                ]
-            }
-            pd.DataFrame(stats_data).to_excel(writer, sheet_name='Estatísticas', index=False)
+            # Aba principal: mesma união de colunas que o pd.concat faria
+            cabecalho_completo = []
+            for tabela, _ in partes:
+                colunas_parte = tabela.column_names + [COLUNA_ORIGEM]
+                cabecalho_completo += [coluna for coluna in colunas_parte if coluna not in cabecalho_completo]
+            aba_completa = workbook.add_worksheet('Análise Completa')
+            aba_completa.write_row(0, 0, cabecalho_completo, formato_cabecalho)
+            linha_completa = 1
+            
+            # Cada lote é convertido uma vez e gravado na aba própria e na principal
+            for tabela, origem in partes:
+                colunas_parte = tabela.column_names + [COLUNA_ORIGEM]
+                posicoes = [cabecalho_completo.index(coluna) for coluna in colunas_parte]
+                if posicoes == list(range(len(posicoes))):
+                    # Colunas alinhadas com o cabeçalho: grava a linha inteira de uma vez
+                    posicoes = None
+                
+                aba = workbook.add_worksheet(origem)
+                aba.write_row(0, 0, colunas_parte, formato_cabecalho)
+                linha = 1
+                
+                for registros in lotes_de_registros(tabela, origem):
+                    linha = escrever_registros(aba, linha, registros)
+                    linha_completa = escrever_registros(aba_completa, linha_completa, registros, posicoes)
+                    del registros
+            
+            # Estatísticas básicas: tabela fixa, gravada direto na aba
+            estatisticas = [
+                ('Total de Registros', tabela_viaveis.num_rows + tabela_negativos.num_rows),
+                ('Clientes Viáveis', tabela_viaveis.num_rows),
+                ('Fatores Negativos', tabela_negativos.num_rows),
+                ('Data de Processamento', momento.strftime('%d/%m/%Y %H:%M:%S'))
+            ]
+            worksheet = workbook.add_worksheet('Estatísticas')
+            worksheet.write_row(0, 0, ('Métrica', 'Valor'), formato_cabecalho)
+            for linha, estatistica in enumerate(estatisticas, 1):
+                worksheet.write_row(linha, 0, estatistica)
         
         print(f"   ✅ Sucesso! Arquivo salvo: {nome_arquivo}")
         print(f"   📁 Local: {caminho_saida}")
@@ -148,6 +315,9 @@ def salvar_excel(df_completo, df_viaveis, df_negativos, output_dir):
 
 def main():
     """Função principal"""
+    # Um único instante para o nome do arquivo e a aba de estatísticas
+    momento = datetime.now()
+    
     print("=" * 80)
     print("CONVERSOR CSV → EXCEL - PROJETO FAPES")
     print("Auto-detecção de arquivos")
@@ -167,22 +337,25 @@ def main():
         return
     
     # Processar dados
-    df_completo, df_viaveis, df_negativos = carregar_e_processar(arquivo_viaveis, arquivo_negativos)
+    tabela_viaveis, tabela_negativos = carregar_e_processar(arquivo_viaveis, arquivo_negativos)
     
-    if df_completo is None:
+    if tabela_viaveis is None:
         print(f"❌ Falha no processamento dos dados.")
         return
     
-    # Salvar Excel
-    arquivo_final = salvar_excel(df_completo, df_viaveis, df_negativos, output_dir)
+    # Salvar Parquet e, salvo --sem-excel, a planilha
+    arquivos_gerados = [salvar_parquet(tabela_viaveis, tabela_negativos, output_dir, momento)]
+    if GERAR_EXCEL:
+        arquivos_gerados.append(salvar_excel(tabela_viaveis, tabela_negativos, output_dir, momento))
     
-    if arquivo_final:
+    if all(arquivos_gerados):
         print(f"\n🎉 PROCESSO CONCLUÍDO COM SUCESSO!")
         print(f"📊 Resumo:")
-        print(f"   • Total de registros: {len(df_completo)}")
-        print(f"   • Clientes viáveis: {len(df_viaveis)}")
-        print(f"   • Fatores negativos: {len(df_negativos)}")
-        print(f"   • Arquivo gerado: {os.path.basename(arquivo_final)}")
+        print(f"   • Total de registros: {tabela_viaveis.num_rows + tabela_negativos.num_rows}")
+        print(f"   • Clientes viáveis: {tabela_viaveis.num_rows}")
+        print(f"   • Fatores negativos: {tabela_negativos.num_rows}")
+        for arquivo in arquivos_gerados:
+            print(f"   • Arquivo gerado: {os.path.basename(arquivo)}")
     else:
         print(f"❌ Falha ao gerar arquivo final.")
 
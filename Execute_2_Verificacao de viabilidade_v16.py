@@ -5,8 +5,15 @@ Implementa sistema RAG completo com segmentação final em 6 listas
 VERSÃO REFATORADA PARA GOOGLE GEMINI API
 """
 
+import os
+import sys
 import json
+import orjson
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 from pathlib import Path
 from typing import Dict, List, Any, Tuple
 from datetime import datetime
@@ -14,11 +21,286 @@ import sqlite3
 import hashlib
 import time
 import re
+import random
 import requests
+from requests.adapters import HTTPAdapter
 import unicodedata
+import threading
+from enum import IntEnum
+from pydantic import BaseModel, ValidationError
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# Formatos gravados em cada export; --formatos=csv,json,xlsx,parquet escolhe outros
+# (JSON e XLSX só quando pedidos)
+FORMATOS_DISPONIVEIS = ('csv', 'json', 'xlsx', 'parquet')
+FORMATOS_EXPORT = next(
+    (tuple(f for f in arg.split('=', 1)[1].lower().split(',') if f in FORMATOS_DISPONIVEIS)
+     for arg in sys.argv if arg.startswith('--formatos=')),
+    ()
+) or ('csv', 'parquet')
+
+# Leitura dos arquivos em blocos de 1 MB ao gerar hashes
+TAMANHO_BLOCO_HASH = 1 << 20
+
+# Cerca markdown (```json ... ```) em volta do JSON devolvido pelo Gemini
+REGEX_CERCA_JSON = re.compile(r"^```(?:json)?\s*|\s*```$", re.MULTILINE)
+
+
+# Ordem fixa dos critérios (colunas das matrizes de critérios)
+CRITERIOS = ('PA1', 'PA2', 'PA3', 'PA4', 'S1', 'S2', 'S3',
+             'C1', 'C2', 'C3', 'C4', 'C5', 'F1', 'F2', 'F3', 'F4', 'N1', 'N2')
+CATEGORIAS = ('PA', 'S', 'C', 'F')
+
+# Resultado usado quando o Gemini não consegue classificar (usar sempre .copy())
+RESULTADO_FALSO = dict.fromkeys(CRITERIOS, False)
+
+# Peso de cada critério (linhas, na ordem de CRITERIOS) em cada categoria (colunas);
+# N1/N2 não pontuam. Pontuação da categoria = soma ponderada / máximo * 10
+PESOS_CRITERIOS = np.array([
+    [2, 0, 0, 0], [2, 0, 0, 0], [1, 0, 0, 0], [1, 0, 0, 0],
+    [0, 1, 0, 0], [0, 1, 0, 0], [0, 1, 0, 0],
+    [0, 0, 1, 0], [0, 0, 1, 0], [0, 0, 1, 0], [0, 0, 1, 0], [0, 0, 1, 0],
+    [0, 0, 0, 1], [0, 0, 0, 1], [0, 0, 0, 1], [0, 0, 0, 1],
+    [0, 0, 0, 0], [0, 0, 0, 0]
+], dtype=np.float64)
+PONTUACAO_MAXIMA = np.array([6, 3, 5, 4], dtype=np.float64)
+
+# Critérios empacotados num inteiro: bit i = CRITERIOS[i]. Cada categoria ocupa
+# (primeiro bit, quantidade de bits); N1/N2 ficam nos bits 16 e 17
+FAIXAS_CATEGORIAS = {'PA': (0, 4), 'S': (4, 3), 'C': (7, 5), 'F': (12, 4)}
+BIT_FATORES_NEGATIVOS = 16
+
+# Início comum a todos os prompts (batch e individual). Fica idêntico entre
+# chamadas para aproveitar o cache implícito de prefixo do Gemini
+PREFIXO_PROMPT = """
+SISTEMA DE CLASSIFICAÇÃO DE CLIENTES BIOTECNOLÓGICOS
+
+CRITÉRIOS DE CLASSIFICAÇÃO:
+
+=== CATEGORIA PA: PRODUÇÃO DE PROTEÍNA ===
+PA1 (Peso 2): Expressão e purificação de proteínas recombinantes
+PA2 (Peso 2): Enzimas biotecnológicas e biocatálise  
+PA3 (Peso 1): Técnicas ELISA, Western blot, biossensores
+PA4 (Peso 1): Cromatografia, espectrometria de massas
+
+=== CATEGORIA S: SÍNTESE DE GENE ===
+S1: Síntese e expressão gênica
+S2: Clonagem molecular, PCR, CRISPR
+S3: Circuitos genéticos, biologia sintética
+
+=== CATEGORIA C: CFPS ===
+C1: Cell-free protein synthesis
+C2: Proteínas tóxicas/difíceis
+C3: Screening de fármacos
+C4: Aplicações educacionais  
+C5: Cristalografia de proteínas
+
+=== CATEGORIA F: FATORES DE CRESCIMENTO ===
+F1: Cultura celular, células-tronco
+F2: Fermentação, biorreatores
+F3: Embriologia, reprodução assistida
+F4: Engenharia de tecidos
+
+=== FATORES NEGATIVOS ===
+N1: Área SEM uso direto de proteínas recombinantes
+N2: Área NÃO correlata à biotecnologia
+"""
+
+# Threads que leem, fazem hash e consultam o cache dos arquivos antes do Gemini
+TRABALHADORES_PREPARACAO = 16
+
+# Resultados do cache mantidos em memória (LRU) para evitar idas ao SQLite
+TAMANHO_MEMORIA_CACHE = 16384
+
+# Limites das evidências no prompt: por evidência e total por cliente
+MAX_CARACTERES_EVIDENCIA = 200
+MAX_CARACTERES_EVIDENCIAS = 4000
+
+# Tamanho máximo dos textos longos nos arquivos exportados
+LIMITES_TEXTO_EXPORT = {'linhas_pesquisa': 300, 'justificativa_classificacao': 500}
+
+# Colunas escalares do resultado com tipo fixo (tabela Arrow); os dicts de
+# critérios seguem como objetos Python
+ESQUEMA_RESULTADO = pa.schema(
+    [('nome', pa.string()), ('instituicao', pa.string()), ('titulacao', pa.string()),
+     ('linhas_pesquisa', pa.string()), ('curriculo_lattes', pa.string())]
+    + [(f'pontuacao_{c}', pa.float64()) for c in CATEGORIAS]
+    + [('pontuacao_media', pa.float64())]
+    + [(f'classificacao_{c}', pa.string()) for c in CATEGORIAS]
+    + [('fator_N1', pa.bool_()), ('fator_N2', pa.bool_()),
+       ('classificacao_final', pa.string()), ('justificativa_classificacao', pa.string()),
+       ('arquivo_origem', pa.string()), ('timestamp', pa.string())]
+)
+
+
+class CriteriosCliente(BaseModel):
+    """Resposta do Gemini para um cliente (campos extras como nome/cliente_id são ignorados)"""
+    PA1: bool
+    PA2: bool
+    PA3: bool
+    PA4: bool
+    S1: bool
+    S2: bool
+    S3: bool
+    C1: bool
+    C2: bool
+    C3: bool
+    C4: bool
+    C5: bool
+    F1: bool
+    F2: bool
+    F3: bool
+    F4: bool
+    N1: bool
+    N2: bool
+
+
+class RespostaBatch(BaseModel):
+    """Resposta do Gemini para um batch"""
+    clientes: List[CriteriosCliente]
+
+
+class Nivel(IntEnum):
+    """Classificação de uma categoria; o nome é o texto exportado"""
+    BAIXA = 1
+    MODERADA = 2
+    ALTA = 3
+
+
+class Cliente(IntEnum):
+    """Classificação final do cliente, ordenada por prioridade"""
+    INADEQUADO = 0
+    BAIXA_PRIORIDADE = 1
+    REGULAR = 2
+    PRIORITARIO = 3
+    ESTRATEGICO = 4
+    
+    @property
+    def rotulo(self) -> str:
+        return ROTULOS_CLIENTE[self]
+
+
+ROTULOS_CLIENTE = {
+    Cliente.INADEQUADO: "CLIENTE INADEQUADO",
+    Cliente.BAIXA_PRIORIDADE: "CLIENTE BAIXA PRIORIDADE",
+    Cliente.REGULAR: "CLIENTE REGULAR",
+    Cliente.PRIORITARIO: "CLIENTE PRIORITÁRIO",
+    Cliente.ESTRATEGICO: "CLIENTE ESTRATÉGICO"
+}
+
+# Classificações por categoria como categoria ordenada (BAIXA < MODERADA < ALTA):
+# um código int8 por célula em vez de uma string
+TIPO_NIVEL = pd.CategoricalDtype([nivel.name for nivel in Nivel], ordered=True)
+
+# Desempate da segmentação quando duas categorias têm a mesma classificação
+ORDEM_DESEMPATE = ('C', 'F', 'PA', 'S')
+
+
+class RateLimiter:
+    """Token bucket de requisições e tokens por minuto, compartilhado entre threads"""
+    
+    def __init__(self, requisicoes_por_minuto: int, tokens_por_minuto: int):
+        self.requisicoes_por_minuto = requisicoes_por_minuto
+        self.tokens_por_minuto = tokens_por_minuto
+        self._requisicoes = float(requisicoes_por_minuto)
+        self._tokens = float(tokens_por_minuto)
+        self._bloqueado_ate = 0.0
+        self._ultima_recarga = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _recarregar(self, agora: float):
+        decorrido = agora - self._ultima_recarga
+        self._ultima_recarga = agora
+        self._requisicoes = min(self.requisicoes_por_minuto,
+                                self._requisicoes + decorrido * self.requisicoes_por_minuto / 60)
+        self._tokens = min(self.tokens_por_minuto,
+                           self._tokens + decorrido * self.tokens_por_minuto / 60)
+    
+    def adquirir(self, tokens_estimados: int = 0):
+        """Bloqueia até haver quota para uma requisição com ~tokens_estimados"""
+        tokens_estimados = min(tokens_estimados, self.tokens_por_minuto)
+        
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                self._recarregar(agora)
+                espera = self._bloqueado_ate - agora
+                
+                if espera <= 0:
+                    espera = max(
+                        (1 - self._requisicoes) * 60 / self.requisicoes_por_minuto,
+                        (tokens_estimados - self._tokens) * 60 / self.tokens_por_minuto
+                    )
+                    if espera <= 0:
+                        self._requisicoes -= 1
+                        self._tokens -= tokens_estimados
+                        return
+            
+            time.sleep(espera)
+    
+    def penalizar(self, segundos: float):
+        """Suspende todas as threads após um 429 (Retry-After do servidor)"""
+        with self._lock:
+            self._bloqueado_ate = max(self._bloqueado_ate, time.monotonic() + segundos)
+
+
+# Gravação dos arquivos exportados: funções de módulo para poderem rodar em
+# outros processos (ProcessPoolExecutor) sem serializar o classificador
+
+def gravar_formatos(df_export: pd.DataFrame, caminho_base: str, formatos=FORMATOS_EXPORT):
+    """Grava os formatos pedidos em paralelo; devolve o erro do Excel (ou None)"""
+    gravadores = {'csv': gravar_csv, 'json': gravar_json, 'xlsx': gravar_excel, 'parquet': gravar_parquet}
+    
+    with ThreadPoolExecutor(max_workers=max(len(formatos), 1)) as executor:
+        futuros = {formato: executor.submit(gravadores[formato], df_export, f"{caminho_base}.{formato}")
+                   for formato in formatos}
+
+        # Falha nos demais formatos interrompe o export, como antes; a do Excel só é reportada
+        for formato, futuro in futuros.items():
+            if formato != 'xlsx':
+                futuro.result()
+        return futuros['xlsx'].exception() if 'xlsx' in futuros else None
+
+
+def gravar_csv(df_export: pd.DataFrame, path_csv: str):
+    """Grava o CSV (UTF-8) com o writer multithread do pyarrow"""
+    try:
+        tabela = pa.Table.from_pandas(df_export, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Coluna com tipos misturados não converte para Arrow: usa o writer do pandas
+        df_export.to_csv(path_csv, index=False, encoding='utf-8')
+        return
+
+    pacsv.write_csv(tabela, path_csv, write_options=pacsv.WriteOptions(include_header=True, quoting_style='needed'))
+
+
+def gravar_json(df_export: pd.DataFrame, path_json: str):
+    """Grava os registros em JSON com orjson (NaN vira null, como no to_json)"""
+    registros = df_export.to_dict(orient='records')
+    Path(path_json).write_bytes(orjson.dumps(registros, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+
+
+def gravar_parquet(df_export: pd.DataFrame, path_parquet: str):
+    """Grava o Parquet (colunar, zstd) para os passos seguintes do pipeline"""
+    df_export.to_parquet(path_parquet, engine='pyarrow', compression='zstd', index=False)
+
+
+def gravar_excel(df_export: pd.DataFrame, path_xlsx: str):
+    """Grava o XLSX com xlsxwriter (mais rápido que openpyxl); sem xlsxwriter, usa openpyxl"""
+    # constant_memory fica de fora: o pandas grava coluna a coluna e esse modo
+    # só aceita escrita linha a linha (descartaria as células)
+    try:
+        with pd.ExcelWriter(path_xlsx, engine='xlsxwriter', engine_kwargs={'options': {
+                'strings_to_urls': False, 'strings_to_formulas': False}}) as writer:
+            df_export.to_excel(writer, index=False)
+    except ImportError:
+        df_export.to_excel(path_xlsx, index=False, engine='openpyxl')
+
 
 class ClientClassifierRAGGemini:
-    def __init__(self, model_name: str = "gemini-2.5-flash", batch_size: int = 3, modo_conservador: bool = True):
+    def __init__(self, model_name: str = "gemini-2.5-flash", batch_size: int = 3, modo_conservador: bool = True,
+                 max_concorrencia: int = 3):
         """Inicializa classificador RAG com processamento em batch usando Gemini"""
         
         # CHAVE API FORNECIDA PELO USUÁRIO
@@ -32,6 +314,7 @@ class ClientClassifierRAGGemini:
         self.modo_conservador = modo_conservador
         if modo_conservador:
             batch_size = min(batch_size, 10)  # Max 2 clientes por batch
+            max_concorrencia = min(max_concorrencia, 2)
             print("🐌 MODO CONSERVADOR ATIVADO: Processamento mais lento mas seguro")
         
         # Modelos disponíveis do Gemini com suas configurações
@@ -45,7 +328,9 @@ class ClientClassifierRAGGemini:
                 "temperatura": 0.1,
                 "thinking": True,
                 "descricao": "Modelo de pensamento mais avançado",
-                "rate_limit_safe": False  # Modelo premium com limites mais restritivos
+                "rate_limit_safe": False,  # Modelo premium com limites mais restritivos
+                "rpm": 5,
+                "tpm": 250_000
             },
             "gemini-2.5-flash": {
                 "nome": "Gemini 2.5 Flash", 
@@ -55,7 +340,9 @@ class ClientClassifierRAGGemini:
                 "temperatura": 0.1,
                 "thinking": True,
                 "descricao": "Melhor custo-benefício com recursos completos",
-                "rate_limit_safe": True
+                "rate_limit_safe": True,
+                "rpm": 10,
+                "tpm": 250_000
             },
             "gemini-2.5-flash-lite": {
                 "nome": "Gemini 2.5 Flash-Lite",
@@ -65,7 +352,9 @@ class ClientClassifierRAGGemini:
                 "temperatura": 0.1,
                 "thinking": True,
                 "descricao": "Otimizado para eficiência de custo",
-                "rate_limit_safe": True
+                "rate_limit_safe": True,
+                "rpm": 15,
+                "tpm": 250_000
             },
             
             # GEMINI 2.0 SERIES
@@ -77,7 +366,9 @@ class ClientClassifierRAGGemini:
                 "temperatura": 0.1,
                 "thinking": False,
                 "descricao": "Recursos avançados e velocidade superior",
-                "rate_limit_safe": False
+                "rate_limit_safe": False,
+                "rpm": 15,
+                "tpm": 1_000_000
             },
             "gemini-2.0-flash-lite": {
                 "nome": "Gemini 2.0 Flash-Lite",
@@ -87,7 +378,9 @@ class ClientClassifierRAGGemini:
                 "temperatura": 0.1,
                 "thinking": False,
                 "descricao": "Otimizado para baixa latência",
-                "rate_limit_safe": True
+                "rate_limit_safe": True,
+                "rpm": 30,
+                "tpm": 1_000_000
             },
             
             # GEMINI 1.5 SERIES - MODELOS ESTÁVEIS
@@ -99,7 +392,9 @@ class ClientClassifierRAGGemini:
                 "temperatura": 0.1,
                 "thinking": False,
                 "descricao": "Modelo estável para raciocínio complexo",
-                "rate_limit_safe": False
+                "rate_limit_safe": False,
+                "rpm": 2,
+                "tpm": 32_000
             },
             "gemini-1.5-flash": {
                 "nome": "Gemini 1.5 Flash",
@@ -109,7 +404,9 @@ class ClientClassifierRAGGemini:
                 "temperatura": 0.1,
                 "thinking": False,
                 "descricao": "Rápido e versátil para múltiplas tarefas",
-                "rate_limit_safe": True
+                "rate_limit_safe": True,
+                "rpm": 15,
+                "tpm": 1_000_000
             }
         }
         
@@ -122,6 +419,24 @@ class ClientClassifierRAGGemini:
         self.model_config = self.modelos_disponiveis[model_name]
         self.batch_size = batch_size
         
+        # Batches enviados ao Gemini ao mesmo tempo (chamadas de rede em threads)
+        self.max_concorrencia = max(1, max_concorrencia)
+        
+        # Quota por minuto (RPM/TPM) compartilhada por todas as chamadas.
+        # No modo conservador usa metade: mesmo com a rajada inicial do bucket
+        # nenhuma janela de 60s passa do limite nominal
+        fator_quota = 0.5 if modo_conservador else 1.0
+        self.rate_limiter = RateLimiter(
+            max(1, int(self.model_config['rpm'] * fator_quota)),
+            max(1, int(self.model_config['tpm'] * fator_quota))
+        )
+        
+        # Sessão HTTP única: conexões TLS com a API ficam abertas entre chamadas e
+        # tentativas. Retries ficam em chamar_gemini_api, não no adapter
+        self.http = requests.Session()
+        self.http.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=0))
+        self.timeout_http = (10, 90)  # (conexão, leitura) em segundos
+        
         # Configurações de rate limiting baseadas no modelo
         if not self.model_config['rate_limit_safe']:
             print(f"⚠️ Modelo {self.model_config['nome']} pode ter limites restritivos")
@@ -129,6 +444,17 @@ class ClientClassifierRAGGemini:
                 self.batch_size = 1  # Processamento individual para modelos premium
                 print("🔄 Forçando processamento individual para evitar rate limits")
         
+        # Tamanho de batch adaptativo (AIMD): +1 a cada batch aceito, metade a cada
+        # falha (resposta inválida, 400, 429, timeout). No modo conservador nunca
+        # passa do batch_size configurado
+        self.batch_size_atual = self.batch_size
+        self.batch_size_min = 1
+        self.batch_size_max = self.batch_size if modo_conservador else max(self.batch_size, 50)
+        self._lock_batch_size = threading.Lock()
+        
+        # Nível de cada categoria pré-calculado para todas as combinações de critérios
+        self._tabelas_niveis = self._montar_tabelas_niveis()
+        
         self.cache_db = "client_classifier_rag_cache_gemini.db"
         self.setup_cache()
         
@@ -227,6 +553,8 @@ class ClientClassifierRAGGemini:
         print(f"   API: Google Gemini API")
         print(f"   Thinking: {'✅ Ativado' if self.model_config['thinking'] else '❌ Não disponível'}")
         print(f"   Batch Size: {self.batch_size} clientes por chamada")
+        print(f"   Concorrência: até {self.max_concorrencia} batches simultâneos")
+        print(f"   Quota: {self.rate_limiter.requisicoes_por_minuto} req/min, {self.rate_limiter.tokens_por_minuto:,} tokens/min")
         print(f"   Critérios: {len(self.criterios_keywords)} critérios de classificação")
         print(f"   Sistema: Retrieval Normalizado + Batch Processing")
         print(f"   Rate Limit Safe: {'✅' if self.model_config['rate_limit_safe'] else '⚠️'}")
@@ -261,9 +589,18 @@ class ClientClassifierRAGGemini:
             return False
     
     def setup_cache(self):
-        """Setup cache SQLite"""
-        conn = sqlite3.connect(self.cache_db)
-        cursor = conn.cursor()
+        """Setup cache SQLite: uma conexão para toda a execução, em modo WAL"""
+        self._conn = sqlite3.connect(self.cache_db, check_same_thread=False, isolation_level=None)
+        self._lock_cache = threading.Lock()
+        self._escritas_pendentes = []
+        self._memoria_cache = OrderedDict()  # ('arquivo'|'conteudo', hash) -> resultado
+        
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA temp_store=MEMORY')
+        self._conn.execute('PRAGMA mmap_size=268435456')  # leituras via mmap (até 256 MB)
+        
+        cursor = self._conn.cursor()
         
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS gemini_classifications (
@@ -279,8 +616,21 @@ class ClientClassifierRAGGemini:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        # Bancos antigos: adiciona a coluna do hash de conteúdo
+        colunas = [linha[1] for linha in cursor.execute('PRAGMA table_info(gemini_classifications)')]
+        if 'conteudo_hash' not in colunas:
+            cursor.execute('ALTER TABLE gemini_classifications ADD COLUMN conteudo_hash TEXT')
+        
+        # file_hash já é indexado pelo UNIQUE; a busca por conteúdo precisa do seu índice
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_conteudo_hash
+            ON gemini_classifications(conteudo_hash, timestamp)
+        ''')
+        
+        # Linhas gravadas com o hash MD5 antigo (32 hex; o BLAKE2b atual tem 64)
+        self._cache_tem_md5 = cursor.execute(
+            'SELECT 1 FROM gemini_classifications WHERE length(file_hash) = 32 LIMIT 1'
+        ).fetchone() is not None
     
     def normalizar_texto(self, texto: str) -> str:
         """Normaliza texto: remove acentos, minúsculas, compacta espaços"""
@@ -360,13 +710,41 @@ class ClientClassifierRAGGemini:
         except:
             return ""
     
+    def formatar_evidencias(self, evidencias: Dict[str, List[str]], por_criterio: int,
+                            max_caracteres: int = MAX_CARACTERES_EVIDENCIA, max_evidencias: int = None,
+                            reticencias: bool = False) -> str:
+        """Bloco de evidências de um cliente, cortado por evidência e no total (MAX_CARACTERES_EVIDENCIAS)"""
+        partes = []
+        total_caracteres = 0
+        adicionadas = 0
+        
+        for criterio_id, evidencias_list in evidencias.items():
+            trechos = []
+            for evidencia in evidencias_list[:por_criterio]:
+                trecho = evidencia[:max_caracteres]
+                if total_caracteres + len(trecho) > MAX_CARACTERES_EVIDENCIAS:
+                    break
+                if max_evidencias is not None and adicionadas >= max_evidencias:
+                    break
+                trechos.append(f"  - {trecho}{'...' if reticencias else ''}\n")
+                total_caracteres += len(trecho)
+                adicionadas += 1
+            
+            # Critério sem evidência incluída não ganha cabeçalho
+            if trechos:
+                partes.append(f"\n{criterio_id}:\n")
+                partes.extend(trechos)
+        
+        return ''.join(partes)
+    
     def montar_prompt_batch(self, clientes_batch: List[Dict[str, Any]]) -> str:
         """Monta prompt estruturado para processamento em batch"""
         
         num_clientes = len(clientes_batch)
         
-        prompt = f"""
-SISTEMA DE CLASSIFICAÇÃO EM BATCH - {num_clientes} CLIENTES BIOTECNOLÓGICOS
+        # Prefixo fixo primeiro; o que muda por chamada (quantidade, clientes) vem depois
+        prompt = PREFIXO_PROMPT + f"""
+CLASSIFICAÇÃO EM BATCH - {num_clientes} CLIENTES
 
 INSTRUÇÕES CRÍTICAS:
 - Analise CADA cliente individualmente
@@ -374,36 +752,6 @@ INSTRUÇÕES CRÍTICAS:
 - Seja RIGOROSO: só marque true se houver evidência DIRETA
 - Responda com JSON válido para TODOS os clientes
 
-CRITÉRIOS DE CLASSIFICAÇÃO:
-
-=== CATEGORIA PA: PRODUÇÃO DE PROTEÍNA ===
-PA1 (Peso 2): Expressão e purificação de proteínas recombinantes
-PA2 (Peso 2): Enzimas biotecnológicas e biocatálise  
-PA3 (Peso 1): Técnicas ELISA, Western blot, biossensores
-PA4 (Peso 1): Cromatografia, espectrometria de massas
-
-=== CATEGORIA S: SÍNTESE DE GENE ===
-S1: Síntese e expressão gênica
-S2: Clonagem molecular, PCR, CRISPR
-S3: Circuitos genéticos, biologia sintética
-
-=== CATEGORIA C: CFPS ===
-C1: Cell-free protein synthesis
-C2: Proteínas tóxicas/difíceis
-C3: Screening de fármacos
-C4: Aplicações educacionais  
-C5: Cristalografia de proteínas
-
-=== CATEGORIA F: FATORES DE CRESCIMENTO ===
-F1: Cultura celular, células-tronco
-F2: Fermentação, biorreatores
-F3: Embriologia, reprodução assistida
-F4: Engenharia de tecidos
-
-=== FATORES NEGATIVOS ===
-N1: Área SEM uso direto de proteínas recombinantes
-N2: Área NÃO correlata à biotecnologia
-
 CLIENTES PARA ANÁLISE:
 """
         
@@ -423,17 +771,8 @@ EVIDÊNCIAS ENCONTRADAS:
 """
             
             # Adiciona evidências organizadas (limitado para não exceder tokens)
-            evidencias_adicionadas = 0
-            max_evidencias_por_cliente = 10
-            
-            for criterio_id, evidencias_list in evidencias.items():
-                if evidencias_list and evidencias_adicionadas < max_evidencias_por_cliente:
-                    prompt += f"\n{criterio_id}:\n"
-                    for evidencia in evidencias_list[:2]:
-                        prompt += f"  - {evidencia[:150]}...\n"
-                        evidencias_adicionadas += 1
-                        if evidencias_adicionadas >= max_evidencias_por_cliente:
-                            break
+            prompt += self.formatar_evidencias(evidencias, por_criterio=2, max_caracteres=150,
+                                               max_evidencias=10, reticencias=True)
         
         prompt += f"""
 
@@ -506,7 +845,26 @@ CRÍTICO:
         
         return payload
     
-    def chamar_gemini_api(self, prompt: str, usar_thinking: bool = False, max_tentativas: int = 5) -> str:
+    def _ajustar_batch_size(self, sucesso: bool):
+        """AIMD do tamanho de batch: cresce 1 em caso de sucesso, cai pela metade em falha"""
+        with self._lock_batch_size:
+            if sucesso:
+                self.batch_size_atual = min(self.batch_size_max, self.batch_size_atual + 1)
+            else:
+                self.batch_size_atual = max(self.batch_size_min, self.batch_size_atual // 2)
+    
+    @staticmethod
+    def _aguardar_backoff(tentativa: int, base: float = 1.0, teto: float = 30.0, prazo: float = None) -> float:
+        """Backoff exponencial com jitter; nunca dorme além do prazo (time.monotonic)"""
+        delay = min(teto, base * 2 ** tentativa) * random.uniform(0.5, 1.5)
+        if prazo is not None:
+            delay = max(0.0, min(delay, prazo - time.monotonic()))
+        print(f"    ⏱️  Aguardando {delay:.1f}s antes da próxima tentativa...")
+        time.sleep(delay)
+        return delay
+    
+    def chamar_gemini_api(self, prompt: str, usar_thinking: bool = False, max_tentativas: int = 5,
+                          num_clientes: int = 1, prazo_segundos: float = 300) -> str:
         """Chama a API do Gemini com rate limiting robusto"""
         
         url = f"{self.base_url}/{self.model}:generateContent?key={self.api_key}"
@@ -516,18 +874,20 @@ CRÍTICO:
             "Content-Type": "application/json"
         }
         
-        # Delays progressivos mais agressivos para rate limiting
-        delays = [1, 3, 8, 15, 30]  # Segundos
+        # Estimativa de tokens: ~4 caracteres por token na entrada + 18 critérios por cliente na saída
+        tokens_estimados = len(prompt) // 4 + 18 * num_clientes
+        
+        # Tempo total máximo da chamada, somando tentativas e esperas
+        prazo = time.monotonic() + prazo_segundos
         
         for tentativa in range(max_tentativas):
+            if tentativa > 0 and time.monotonic() >= prazo:
+                print(f"    ⏰ Prazo de {prazo_segundos}s esgotado")
+                break
+            
             try:
-                # Delay antes de cada tentativa (exceto a primeira)
-                if tentativa > 0:
-                    delay = delays[min(tentativa-1, len(delays)-1)]
-                    print(f"    ⏱️  Aguardando {delay}s antes da tentativa {tentativa + 1}...")
-                    time.sleep(delay)
-                
-                response = requests.post(url, json=payload, headers=headers, timeout=90)
+                self.rate_limiter.adquirir(tokens_estimados)
+                response = self.http.post(url, json=payload, headers=headers, timeout=self.timeout_http)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -537,8 +897,6 @@ CRÍTICO:
                         
                         if 'content' in candidate and 'parts' in candidate['content']:
                             text_content = candidate['content']['parts'][0].get('text', '')
-                            # Pequeno delay após sucesso para evitar burst
-                            time.sleep(0.5)
                             return text_content
                         else:
                             raise ValueError("Estrutura de resposta inválida")
@@ -546,39 +904,47 @@ CRÍTICO:
                         raise ValueError("Nenhum candidato na resposta")
                 
                 elif response.status_code == 429:
-                    # Rate limit hit - delay mais longo
-                    delay_rate_limit = min(60, 10 * (2 ** tentativa))  # Max 60s
-                    print(f"    🚫 Rate limit atingido! Aguardando {delay_rate_limit}s...")
-                    time.sleep(delay_rate_limit)
+                    # Rate limit hit - Retry-After do servidor, senão backoff com jitter;
+                    # a espera suspende o bucket para todas as threads
+                    retry_after = response.headers.get('Retry-After', '')
+                    if retry_after.isdigit():
+                        delay_rate_limit = int(retry_after)
+                    else:
+                        delay_rate_limit = min(60, 10 * (2 ** tentativa)) * random.uniform(0.5, 1.5)
+                    print(f"    🚫 Rate limit atingido! Aguardando {delay_rate_limit:.0f}s...")
+                    self.rate_limiter.penalizar(delay_rate_limit)
+                    self._ajustar_batch_size(False)
                     
                 elif response.status_code == 403:
                     print(f"    ❌ Acesso negado (403). Verifique a chave API e permissões.")
-                    time.sleep(5)
+                    self._aguardar_backoff(tentativa, prazo=prazo)
                     
                 elif response.status_code == 400:
                     error_data = response.json() if response.headers.get('content-type', '').startswith('application/json') else {}
                     error_msg = error_data.get('error', {}).get('message', response.text)
                     print(f"    ❌ Erro 400: {error_msg}")
-                    time.sleep(2)
+                    self._ajustar_batch_size(False)
+                    self._aguardar_backoff(tentativa, prazo=prazo)
                     
                 else:
                     error_msg = f"Erro HTTP {response.status_code}: {response.text[:200]}"
                     print(f"    ⚠️ Tentativa {tentativa + 1}: {error_msg}")
-                    time.sleep(3)
+                    self._aguardar_backoff(tentativa, prazo=prazo)
                     
             except requests.exceptions.Timeout:
                 print(f"    ⚠️ Tentativa {tentativa + 1}: Timeout na requisição")
-                time.sleep(5)
+                self._ajustar_batch_size(False)
+                self._aguardar_backoff(tentativa, base=2.0, prazo=prazo)
                 
             except requests.exceptions.ConnectionError:
                 print(f"    ⚠️ Tentativa {tentativa + 1}: Erro de conexão")
-                time.sleep(5)
+                self._aguardar_backoff(tentativa, base=2.0, prazo=prazo)
                 
             except Exception as e:
                 print(f"    ⚠️ Tentativa {tentativa + 1}: Erro - {str(e)[:100]}")
-                time.sleep(3)
+                self._aguardar_backoff(tentativa, prazo=prazo)
         
-        raise Exception(f"Falha após {max_tentativas} tentativas - possível limite de quota atingido")
+        raise Exception(f"Falha após {tentativa + 1} tentativas - possível limite de quota atingido")
     
     def classificar_batch_gemini(self, clientes_batch: List[Dict[str, Any]], max_tentativas: int = 3) -> List[Dict[str, bool]]:
         """Processa batch de clientes com Gemini"""
@@ -595,69 +961,57 @@ CRÍTICO:
                     print(f"    🧠 Modo thinking ativado")
                 
                 # Chama API Gemini
-                resposta = self.chamar_gemini_api(prompt, usar_thinking)
+                resposta = self.chamar_gemini_api(prompt, usar_thinking, num_clientes=num_clientes)
                 
                 # Limpa resposta
-                resposta = resposta.replace('```json', '').replace('```', '').strip()
-                
-                # Parse JSON
-                resultado_batch = json.loads(resposta)
+                resposta = REGEX_CERCA_JSON.sub('', resposta.strip())
                 
-                # Valida estrutura
-                if 'clientes' not in resultado_batch:
-                    raise ValueError("Estrutura JSON inválida: falta campo 'clientes'")
+                # Parse e validação (estrutura, 18 critérios booleanos por cliente) numa passada
+                resultado_batch = RespostaBatch.model_validate_json(resposta)
                 
-                clientes_resultado = resultado_batch['clientes']
+                clientes_resultado = resultado_batch.clientes
                 
                 if len(clientes_resultado) != num_clientes:
                     raise ValueError(f"Número incorreto de clientes: esperado {num_clientes}, recebido {len(clientes_resultado)}")
                 
-                # Valida critérios para cada cliente
-                criterios_esperados = ['PA1', 'PA2', 'PA3', 'PA4', 'S1', 'S2', 'S3', 
-                                     'C1', 'C2', 'C3', 'C4', 'C5', 'F1', 'F2', 'F3', 'F4', 'N1', 'N2']
-                
-                resultados_validados = []
-                
-                for i, cliente_resultado in enumerate(clientes_resultado):
-                    if not all(k in cliente_resultado for k in criterios_esperados):
-                        raise ValueError(f"Cliente {i+1}: critérios faltando")
-                    
-                    # Extrai apenas os critérios
-                    criterios_cliente = {k: cliente_resultado[k] for k in criterios_esperados}
-                    resultados_validados.append(criterios_cliente)
+                resultados_validados = [cliente.model_dump() for cliente in clientes_resultado]
                 
                 print(f"    ✅ Batch processado com sucesso: {num_clientes} clientes")
+                self._ajustar_batch_size(True)
                 return resultados_validados
                 
-            except json.JSONDecodeError as e:
-                print(f"    ⚠️ Tentativa {tentativa + 1}: Erro JSON - {str(e)[:100]}")
-                time.sleep(1)
+            except ValidationError as e:
+                print(f"    ⚠️ Tentativa {tentativa + 1}: Resposta inválida ({e.error_count()} erro(s)) - {e.errors()[0]['msg'][:100]}")
+                self._ajustar_batch_size(False)
+                self._aguardar_backoff(tentativa)
                 
             except ValueError as e:
                 print(f"    ⚠️ Tentativa {tentativa + 1}: {e}")
-                time.sleep(1)
+                self._ajustar_batch_size(False)
+                self._aguardar_backoff(tentativa)
                 
             except Exception as e:
                 print(f"    ⚠️ Tentativa {tentativa + 1}: Erro API - {str(e)[:100]}")
-                time.sleep(2)
+                self._aguardar_backoff(tentativa, base=2.0)
         
-        # Fallback: processamento individual
+        # Fallback: processamento individual, em paralelo (a quota continua
+        # controlada pelo rate_limiter dentro de chamar_gemini_api)
         print(f"    🔄 Fallback: processamento individual para {num_clientes} clientes")
-        resultados_fallback = []
         
-        for cliente_info in clientes_batch:
-            try:
-                prompt_individual = self.montar_prompt_classificacao(cliente_info['dados'], cliente_info['evidencias'])
-                resultado_individual = self.classificar_com_gemini(prompt_individual, max_tentativas=2)
-                resultados_fallback.append(resultado_individual)
-            except:
-                # Último fallback: todos False
-                resultado_vazio = {k: False for k in ['PA1', 'PA2', 'PA3', 'PA4', 'S1', 'S2', 'S3', 
-                                                    'C1', 'C2', 'C3', 'C4', 'C5', 'F1', 'F2', 'F3', 'F4', 'N1', 'N2']}
-                resultados_fallback.append(resultado_vazio)
+        with ThreadPoolExecutor(max_workers=min(8, num_clientes)) as executor:
+            resultados_fallback = list(executor.map(self._classificar_individual, clientes_batch))
         
         return resultados_fallback
     
+    def _classificar_individual(self, cliente_info: Dict[str, Any]) -> Dict[str, bool]:
+        """Classificação individual de um cliente do batch (fallback)"""
+        try:
+            prompt_individual = self.montar_prompt_classificacao(cliente_info['dados'], cliente_info['evidencias'])
+            return self.classificar_com_gemini(prompt_individual, max_tentativas=2)
+        except:
+            # Último fallback: todos False
+            return RESULTADO_FALSO.copy()
+    
     def montar_prompt_classificacao(self, dados: Dict[str, Any], evidencias: Dict[str, List[str]]) -> str:
         """Monta prompt estruturado para o Gemini (individual)"""
         
@@ -665,56 +1019,21 @@ CRÍTICO:
         instituicao = dados.get('instituicao_vinculo', '')
         linhas = dados.get('linhas_pesquisa', '')
         
-        prompt = f"""
-SISTEMA DE CLASSIFICAÇÃO DE CLIENTES BIOTECNOLÓGICOS
-
-CLIENTE: {nome}
-INSTITUIÇÃO: {instituicao}  
-ÁREA: {linhas}
-
+        # Prefixo fixo primeiro; os dados do cliente vêm depois
+        prompt = PREFIXO_PROMPT + f"""
 INSTRUÇÕES:
 Analise as evidências encontradas e classifique CADA critério como True/False.
 Seja RIGOROSO: só marque True se houver evidência CLARA e DIRETA.
 
-CRITÉRIOS DE CLASSIFICAÇÃO:
-
-=== CATEGORIA PA: PRODUÇÃO DE PROTEÍNA ===
-PA1 (Peso 2): Expressão e purificação de proteínas recombinantes
-PA2 (Peso 2): Enzimas biotecnológicas e biocatálise  
-PA3 (Peso 1): Técnicas ELISA, Western blot, biossensores
-PA4 (Peso 1): Cromatografia, espectrometria de massas
-
-=== CATEGORIA S: SÍNTESE DE GENE ===
-S1: Síntese e expressão gênica
-S2: Clonagem molecular, PCR, CRISPR
-S3: Circuitos genéticos, biologia sintética
-
-=== CATEGORIA C: CFPS ===
-C1: Cell-free protein synthesis
-C2: Proteínas tóxicas/difíceis
-C3: Screening de fármacos
-C4: Aplicações educacionais  
-C5: Cristalografia de proteínas
-
-=== CATEGORIA F: FATORES DE CRESCIMENTO ===
-F1: Cultura celular, células-tronco
-F2: Fermentação, biorreatores
-F3: Embriologia, reprodução assistida
-F4: Engenharia de tecidos
-
-=== FATORES NEGATIVOS ===
-N1: Área SEM uso direto de proteínas recombinantes
-N2: Área NÃO correlata à biotecnologia
+CLIENTE: {nome}
+INSTITUIÇÃO: {instituicao}  
+ÁREA: {linhas}
 
 EVIDÊNCIAS ENCONTRADAS:
 """
         
         # Adiciona evidências organizadas
-        for criterio_id, evidencias_list in evidencias.items():
-            if evidencias_list:
-                prompt += f"\n{criterio_id}:\n"
-                for evidencia in evidencias_list[:3]:
-                    prompt += f"  - {evidencia}\n"
+        prompt += self.formatar_evidencias(evidencias, por_criterio=3)
         
         prompt += """
 
@@ -758,202 +1077,186 @@ IMPORTANTE: Responda APENAS o JSON, sem explicações adicionais.
                 resposta = self.chamar_gemini_api(prompt, usar_thinking)
                 
                 # Limpa resposta se necessário
-                resposta = resposta.replace('```json', '').replace('```', '').strip()
-                
-                # Parse JSON
-                criterios_resultado = json.loads(resposta)
-                
-                # Valida se todos os critérios estão presentes
-                esperados = ['PA1', 'PA2', 'PA3', 'PA4', 'S1', 'S2', 'S3', 
-                           'C1', 'C2', 'C3', 'C4', 'C5', 'F1', 'F2', 'F3', 'F4', 'N1', 'N2']
+                resposta = REGEX_CERCA_JSON.sub('', resposta.strip())
                 
-                if all(k in criterios_resultado for k in esperados):
-                    return criterios_resultado
-                else:
-                    print(f"    ⚠️ Tentativa {tentativa + 1}: Critérios faltando na resposta")
+                # Parse e validação dos 18 critérios
+                return CriteriosCliente.model_validate_json(resposta).model_dump()
                     
-            except json.JSONDecodeError as e:
-                print(f"    ⚠️ Tentativa {tentativa + 1}: Erro JSON - {e}")
-                time.sleep(1)
+            except ValidationError as e:
+                print(f"    ⚠️ Tentativa {tentativa + 1}: Resposta inválida ({e.error_count()} erro(s)) - {e.errors()[0]['msg'][:100]}")
+                self._aguardar_backoff(tentativa)
                 
             except Exception as e:
                 print(f"    ⚠️ Tentativa {tentativa + 1}: Erro API - {e}")
-                time.sleep(2)
+                self._aguardar_backoff(tentativa, base=2.0)
         
         # Fallback: retorna todos False
         print(f"    ❌ Falha após {max_tentativas} tentativas - usando fallback")
-        return {k: False for k in ['PA1', 'PA2', 'PA3', 'PA4', 'S1', 'S2', 'S3', 
-                                  'C1', 'C2', 'C3', 'C4', 'C5', 'F1', 'F2', 'F3', 'F4', 'N1', 'N2']}
+        return RESULTADO_FALSO.copy()
     
     def calcular_pontuacoes_categorias(self, criterios: Dict[str, bool]) -> Dict[str, float]:
         """Calcula pontuações de 0-10 para cada categoria"""
-        pontuacoes = {}
-        
-        # CATEGORIA PA (Produção de Proteína - Acadêmico)
-        pontuacao_bruta_pa = (
-            (criterios.get('PA1', False) * 2) + 
-            (criterios.get('PA2', False) * 2) + 
-            (criterios.get('PA3', False) * 1) + 
-            (criterios.get('PA4', False) * 1)
-        )
-        pontuacoes['PA'] = (pontuacao_bruta_pa / 6) * 10
+        return self.calcular_pontuacoes_batch([criterios])[0]
+    
+    def calcular_pontuacoes_batch(self, criterios_lista: List[Dict[str, bool]]) -> List[Dict[str, float]]:
+        """Pontuações de 0-10 por categoria para vários clientes numa só multiplicação de matrizes"""
+        matriz = np.array([[c.get(k, False) for k in CRITERIOS] for c in criterios_lista], dtype=np.uint8)
+        pontuacoes = (matriz @ PESOS_CRITERIOS) / PONTUACAO_MAXIMA * 10
+        return [dict(zip(CATEGORIAS, linha)) for linha in pontuacoes.tolist()]
+    
+    def codificar_criterios(self, criterios: Dict[str, bool]) -> int:
+        """Empacota os 18 critérios num inteiro (bit i = CRITERIOS[i])"""
+        codigo = 0
+        for i, criterio in enumerate(CRITERIOS):
+            if criterios.get(criterio, False):
+                codigo |= 1 << i
+        return codigo
+    
+    def _montar_tabelas_niveis(self) -> Dict[str, Tuple[Nivel, ...]]:
+        """Tabela por categoria: índice = bits da categoria + N1/N2 -> Nivel (via classificar_categoria)"""
+        tabelas = {}
+        
+        for categoria, (inicio, quantidade) in FAIXAS_CATEGORIAS.items():
+            tabela = []
+            for indice in range(1 << (quantidade + 2)):
+                criterios = {CRITERIOS[inicio + j]: bool(indice >> j & 1) for j in range(quantidade)}
+                criterios['N1'] = bool(indice >> quantidade & 1)
+                criterios['N2'] = bool(indice >> (quantidade + 1) & 1)
+                pontuacao = self.calcular_pontuacoes_categorias(criterios)[categoria]
+                tabela.append(self.classificar_categoria(categoria, pontuacao, criterios))
+            tabelas[categoria] = tuple(tabela)
+        
+        return tabelas
+    
+    def classificar_categorias(self, criterios: Dict[str, bool]) -> Dict[str, Nivel]:
+        """Nível das quatro categorias por consulta às tabelas pré-calculadas"""
+        codigo = self.codificar_criterios(criterios)
+        negativos = codigo >> BIT_FATORES_NEGATIVOS
         
-        # CATEGORIA S (Síntese de Gene)
-        pontuacao_bruta_s = (
-            criterios.get('S1', False) + 
-            criterios.get('S2', False) + 
-            criterios.get('S3', False)
-        )
-        pontuacoes['S'] = (pontuacao_bruta_s / 3) * 10
-        
-        # CATEGORIA C (CFPS)
-        pontuacao_bruta_c = (
-            criterios.get('C1', False) + 
-            criterios.get('C2', False) + 
-            criterios.get('C3', False) + 
-            criterios.get('C4', False) + 
-            criterios.get('C5', False)
-        )
-        pontuacoes['C'] = (pontuacao_bruta_c / 5) * 10
-        
-        # CATEGORIA F (Fatores de Crescimento)
-        pontuacao_bruta_f = (
-            criterios.get('F1', False) + 
-            criterios.get('F2', False) + 
-            criterios.get('F3', False) + 
-            criterios.get('F4', False)
-        )
-        pontuacoes['F'] = (pontuacao_bruta_f / 4) * 10
+        classificacoes = {}
+        for categoria, (inicio, quantidade) in FAIXAS_CATEGORIAS.items():
+            indice = (codigo >> inicio & ((1 << quantidade) - 1)) | (negativos << quantidade)
+            classificacoes[categoria] = self._tabelas_niveis[categoria][indice]
         
-        return pontuacoes
+        return classificacoes
     
-    def classificar_categoria(self, categoria: str, pontuacao: float, criterios: Dict[str, bool]) -> str:
+    def classificar_categoria(self, categoria: str, pontuacao: float, criterios: Dict[str, bool]) -> Nivel:
         """Classifica uma categoria individual considerando fatores negativos"""
         n1 = criterios.get('N1', False)
         n2 = criterios.get('N2', False)
         
         if categoria == 'PA':
             if n1:
-                return "BAIXA"
+                return Nivel.BAIXA
             elif n2:
-                classificacao_normal = self._classificacao_normal_pa(pontuacao, criterios)
-                return min(classificacao_normal, "MODERADA", key=lambda x: {"ALTA": 3, "MODERADA": 2, "BAIXA": 1}[x])
+                return min(self._classificacao_normal_pa(pontuacao, criterios), Nivel.MODERADA)
             else:
                 return self._classificacao_normal_pa(pontuacao, criterios)
         
         elif categoria == 'S':
             if n2:
-                return "BAIXA"
+                return Nivel.BAIXA
             elif n1:
-                classificacao_normal = self._classificacao_normal_s(pontuacao)
-                return min(classificacao_normal, "MODERADA", key=lambda x: {"ALTA": 3, "MODERADA": 2, "BAIXA": 1}[x])
+                return min(self._classificacao_normal_s(pontuacao), Nivel.MODERADA)
             else:
                 return self._classificacao_normal_s(pontuacao)
         
         elif categoria == 'C':
             if n1:
-                return "BAIXA"
+                return Nivel.BAIXA
             elif n2:
-                classificacao_normal = self._classificacao_normal_c(pontuacao)
-                return min(classificacao_normal, "MODERADA", key=lambda x: {"ALTA": 3, "MODERADA": 2, "BAIXA": 1}[x])
+                return min(self._classificacao_normal_c(pontuacao), Nivel.MODERADA)
             else:
                 return self._classificacao_normal_c(pontuacao)
         
         elif categoria == 'F':
             if n2 or n1:
-                classificacao_normal = self._classificacao_normal_f(pontuacao)
-                return min(classificacao_normal, "MODERADA", key=lambda x: {"ALTA": 3, "MODERADA": 2, "BAIXA": 1}[x])
+                return min(self._classificacao_normal_f(pontuacao), Nivel.MODERADA)
             else:
                 return self._classificacao_normal_f(pontuacao)
     
-    def _classificacao_normal_pa(self, pontuacao: float, criterios: Dict[str, bool]) -> str:
+    def _classificacao_normal_pa(self, pontuacao: float, criterios: Dict[str, bool]) -> Nivel:
         """Classificação normal para PA"""
         pa1_ou_pa2 = criterios.get('PA1', False) or criterios.get('PA2', False)
         pa3_ou_pa4 = criterios.get('PA3', False) or criterios.get('PA4', False)
         
         if pa1_ou_pa2 and pa3_ou_pa4:
-            return "ALTA"
+            return Nivel.ALTA
         elif pontuacao >= 3.33:
-            return "MODERADA"
+            return Nivel.MODERADA
         else:
-            return "BAIXA"
+            return Nivel.BAIXA
     
-    def _classificacao_normal_s(self, pontuacao: float) -> str:
+    def _classificacao_normal_s(self, pontuacao: float) -> Nivel:
         if pontuacao >= 6.67:
-            return "ALTA"
+            return Nivel.ALTA
         elif pontuacao >= 3.33:
-            return "MODERADA"
+            return Nivel.MODERADA
         else:
-            return "BAIXA"
+            return Nivel.BAIXA
     
-    def _classificacao_normal_c(self, pontuacao: float) -> str:
+    def _classificacao_normal_c(self, pontuacao: float) -> Nivel:
         if pontuacao >= 4.0:
-            return "ALTA"
+            return Nivel.ALTA
         elif pontuacao >= 2.0:
-            return "MODERADA"
+            return Nivel.MODERADA
         else:
-            return "BAIXA"
+            return Nivel.BAIXA
     
-    def _classificacao_normal_f(self, pontuacao: float) -> str:
+    def _classificacao_normal_f(self, pontuacao: float) -> Nivel:
         if pontuacao >= 5.0:
-            return "ALTA"
+            return Nivel.ALTA
         elif pontuacao >= 2.5:
-            return "MODERADA"
+            return Nivel.MODERADA
         else:
-            return "BAIXA"
+            return Nivel.BAIXA
     
-    def classificar_cliente_final(self, classificacoes_categorias: Dict[str, str], 
-                                pontuacao_media: float, criterios: Dict[str, bool]) -> str:
+    def classificar_cliente_final(self, classificacoes_categorias: Dict[str, Nivel], 
+                                pontuacao_media: float, criterios: Dict[str, bool]) -> Cliente:
         """Classificação final do cliente"""
         n1 = criterios.get('N1', False)
         n2 = criterios.get('N2', False)
         
         if n1 and n2:
-            return "CLIENTE INADEQUADO"
+            return Cliente.INADEQUADO
         
-        altas = sum(1 for classe in classificacoes_categorias.values() if classe == "ALTA")
+        altas = sum(1 for classe in classificacoes_categorias.values() if classe == Nivel.ALTA)
         
         if n2:
-            classificacao_base = self._classificacao_base(altas, pontuacao_media)
-            return min(classificacao_base, "CLIENTE REGULAR", 
-                      key=lambda x: {"CLIENTE ESTRATÉGICO": 4, "CLIENTE PRIORITÁRIO": 3, 
-                                    "CLIENTE REGULAR": 2, "CLIENTE BAIXA PRIORIDADE": 1}[x])
+            return min(self._classificacao_base(altas, pontuacao_media), Cliente.REGULAR)
         elif n1:
-            classificacao_base = self._classificacao_base(altas, pontuacao_media)
-            return min(classificacao_base, "CLIENTE PRIORITÁRIO",
-                      key=lambda x: {"CLIENTE ESTRATÉGICO": 4, "CLIENTE PRIORITÁRIO": 3, 
-                                    "CLIENTE REGULAR": 2, "CLIENTE BAIXA PRIORIDADE": 1}[x])
+            return min(self._classificacao_base(altas, pontuacao_media), Cliente.PRIORITARIO)
         else:
             return self._classificacao_base(altas, pontuacao_media)
     
-    def _classificacao_base(self, altas: int, pontuacao_media: float) -> str:
+    def _classificacao_base(self, altas: int, pontuacao_media: float) -> Cliente:
         if altas >= 2 and pontuacao_media >= 6.0:
-            return "CLIENTE ESTRATÉGICO"
+            return Cliente.ESTRATEGICO
         elif altas >= 1 and pontuacao_media >= 5.0:
-            return "CLIENTE PRIORITÁRIO"
+            return Cliente.PRIORITARIO
         elif pontuacao_media >= 3.0:
-            return "CLIENTE REGULAR"
+            return Cliente.REGULAR
         else:
-            return "CLIENTE BAIXA PRIORIDADE"
+            return Cliente.BAIXA_PRIORIDADE
     
-    def gerar_justificativa(self, classificacao_final: str, classificacoes: Dict[str, str], 
+    def gerar_justificativa(self, classificacao_final: Cliente, classificacoes: Dict[str, Nivel], 
                           criterios: Dict[str, bool], pontuacao_media: float) -> str:
         """Gera justificativa de uma linha para a classificação"""
         
         n1 = criterios.get('N1', False)
         n2 = criterios.get('N2', False)
-        altas = sum(1 for classe in classificacoes.values() if classe == "ALTA")
+        altas = sum(1 for classe in classificacoes.values() if classe == Nivel.ALTA)
         
-        if classificacao_final == "CLIENTE INADEQUADO":
+        if classificacao_final == Cliente.INADEQUADO:
             return "Cliente inadequado: sem uso de proteínas recombinantes e área não correlata à biotecnologia"
-        elif classificacao_final == "CLIENTE ESTRATÉGICO":
+        elif classificacao_final == Cliente.ESTRATEGICO:
             return f"Cliente estratégico: {altas} categoria(s) ALTA, pontuação média {pontuacao_media:.1f}, perfil ideal para produtos"
-        elif classificacao_final == "CLIENTE PRIORITÁRIO":
+        elif classificacao_final == Cliente.PRIORITARIO:
             if n1:
                 return f"Cliente prioritário: {altas} categoria(s) ALTA mas limitado por não usar proteínas recombinantes diretamente"
             else:
                 return f"Cliente prioritário: {altas} categoria(s) ALTA, pontuação média {pontuacao_media:.1f}, bom potencial"
-        elif classificacao_final == "CLIENTE REGULAR":
+        elif classificacao_final == Cliente.REGULAR:
             if n2:
                 return f"Cliente regular: área parcialmente correlata, pontuação média {pontuacao_media:.1f}, potencial limitado"
             else:
@@ -961,48 +1264,114 @@ IMPORTANTE: Responda APENAS o JSON, sem explicações adicionais.
         else:
             return f"Cliente baixa prioridade: pontuação média {pontuacao_media:.1f}, poucas categorias relevantes"
     
-    def gerar_hash_arquivo(self, filepath: str) -> str:
-        """Gera hash do arquivo"""
+    def gerar_hash_arquivo(self, filepath: str, algoritmo: str = 'blake2b') -> str:
+        """Gera hash do arquivo lendo em blocos (md5 só para chaves antigas do cache)"""
+        h = hashlib.blake2b(digest_size=32) if algoritmo == 'blake2b' else hashlib.new(algoritmo)
         with open(filepath, 'rb') as f:
-            return hashlib.md5(f.read()).hexdigest()
+            for bloco in iter(lambda: f.read(TAMANHO_BLOCO_HASH), b''):
+                h.update(bloco)
+        return h.hexdigest()
     
-    def get_cached_result(self, file_hash: str) -> Dict[str, Any]:
-        """Recupera resultado do cache"""
-        conn = sqlite3.connect(self.cache_db)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT criterios_json, pontuacoes_json, classificacao_final, justificativa 
-            FROM gemini_classifications WHERE file_hash = ?
-        ''', (file_hash,))
-        
-        result = cursor.fetchone()
-        conn.close()
+    def migrar_hash_cache(self, hash_antigo: str, hash_novo: str):
+        """Regrava a chave de uma linha do cache (MD5 antigo -> BLAKE2b)"""
+        with self._lock_cache:
+            self._conn.execute('UPDATE gemini_classifications SET file_hash = ? WHERE file_hash = ?',
+                               (hash_novo, hash_antigo))
+    
+    def gerar_hash_conteudo(self, dados: Dict[str, Any], evidencias: Dict[str, List[str]]) -> str:
+        """Hash do que vai ao prompt (nome, instituição, área e evidências normalizados)"""
+        conteudo = [
+            self.normalizar_texto(str(dados.get('nome_completo', ''))),
+            self.normalizar_texto(str(dados.get('instituicao_vinculo', ''))),
+            self.normalizar_texto(str(dados.get('linhas_pesquisa', ''))),
+            evidencias
+        ]
+        texto = json.dumps(conteudo, ensure_ascii=False, sort_keys=True)
+        return hashlib.blake2b(texto.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def get_cached_result(self, file_hash: str, conteudo_hash: str = None) -> Dict[str, Any]:
+        """Recupera resultado do cache pelo hash do arquivo ou, se informado, pelo hash do conteúdo"""
+        chave = ('arquivo', file_hash) if conteudo_hash is None else ('conteudo', conteudo_hash)
+        
+        with self._lock_cache:
+            resultado = self._memoria_cache.get(chave)
+            if resultado is not None:
+                self._memoria_cache.move_to_end(chave)
+                return resultado
+            
+            if conteudo_hash is None:
+                cursor = self._conn.execute('''
+                    SELECT criterios_json, pontuacoes_json, classificacao_final, justificativa 
+                    FROM gemini_classifications WHERE file_hash = ?
+                ''', (file_hash,))
+            else:
+                cursor = self._conn.execute('''
+                    SELECT criterios_json, pontuacoes_json, classificacao_final, justificativa 
+                    FROM gemini_classifications WHERE conteudo_hash = ?
+                    ORDER BY timestamp DESC LIMIT 1
+                ''', (conteudo_hash,))
+            
+            result = cursor.fetchone()
         
         if result:
-            return {
-                'criterios': json.loads(result[0]),
-                'pontuacoes': json.loads(result[1]),
+            resultado = {
+                'criterios': orjson.loads(result[0]),
+                'pontuacoes': orjson.loads(result[1]),
                 'classificacao_final': result[2],
                 'justificativa': result[3]
             }
+            self._lembrar_resultado(chave, resultado)
+            return resultado
         return None
     
+    def _lembrar_resultado(self, chave: Tuple[str, str], resultado: Dict[str, Any]):
+        """Guarda resultado na LRU em memória, descartando o menos usado quando cheia"""
+        with self._lock_cache:
+            self._memoria_cache[chave] = resultado
+            self._memoria_cache.move_to_end(chave)
+            if len(self._memoria_cache) > TAMANHO_MEMORIA_CACHE:
+                self._memoria_cache.popitem(last=False)
+    
     def save_result_cache(self, file_hash: str, nome: str, criterios: Dict[str, bool], 
-                         pontuacoes: Dict[str, float], classificacao_final: str, justificativa: str):
-        """Salva resultado no cache"""
-        conn = sqlite3.connect(self.cache_db)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO gemini_classifications 
-            (file_hash, nome, criterios_json, pontuacoes_json, classificacao_final, justificativa, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (file_hash, nome, json.dumps(criterios), json.dumps(pontuacoes), 
-              classificacao_final, justificativa, datetime.now().isoformat()))
-        
-        conn.commit()
-        conn.close()
+                         pontuacoes: Dict[str, float], classificacao_final: str, justificativa: str,
+                         conteudo_hash: str = None):
+        """Enfileira resultado para o cache (gravado em lote por _flush_cache)"""
+        linha = (file_hash, nome, orjson.dumps(criterios).decode(), orjson.dumps(pontuacoes).decode(), 
+                 classificacao_final, justificativa, datetime.now().isoformat(), conteudo_hash)
+        
+        with self._lock_cache:
+            self._escritas_pendentes.append(linha)
+        
+        # Memória já reflete a escrita, mesmo antes do _flush_cache
+        resultado = {
+            'criterios': criterios,
+            'pontuacoes': pontuacoes,
+            'classificacao_final': classificacao_final,
+            'justificativa': justificativa
+        }
+        self._lembrar_resultado(('arquivo', file_hash), resultado)
+        if conteudo_hash:
+            self._lembrar_resultado(('conteudo', conteudo_hash), resultado)
+    
+    def _flush_cache(self):
+        """Grava as escritas pendentes numa única transação"""
+        with self._lock_cache:
+            if not self._escritas_pendentes:
+                return
+            
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.executemany('''
+                    INSERT OR REPLACE INTO gemini_classifications 
+                    (file_hash, nome, criterios_json, pontuacoes_json, classificacao_final, justificativa, timestamp, conteudo_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', self._escritas_pendentes)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            
+            self._escritas_pendentes.clear()
     
     def processar_resultado_cached(self, dados_cliente: Dict[str, Any], cached_result: Dict[str, Any], arquivo: Path) -> Dict[str, Any]:
         """Processa resultado do cache"""
@@ -1014,16 +1383,16 @@ IMPORTANTE: Responda APENAS o JSON, sem explicações adicionais.
         return self.montar_resultado_final(dados_cliente, criterios_resultado, pontuacoes, classificacao_final, justificativa, arquivo)
     
     def processar_resultado_individual(self, dados_cliente: Dict[str, Any], criterios_resultado: Dict[str, bool], 
-                                     arquivo: Path, file_hash: str) -> Dict[str, Any]:
+                                     arquivo: Path, file_hash: str, conteudo_hash: str = None,
+                                     pontuacoes: Dict[str, float] = None) -> Dict[str, Any]:
         """Processa resultado individual e salva no cache"""
         
-        # Calcula pontuações e classificações
-        pontuacoes = self.calcular_pontuacoes_categorias(criterios_resultado)
+        # Calcula pontuações (se não vieram calculadas com o batch) e classificações
+        if pontuacoes is None:
+            pontuacoes = self.calcular_pontuacoes_categorias(criterios_resultado)
         
         # Classifica cada categoria
-        classificacoes = {}
-        for categoria in ['PA', 'S', 'C', 'F']:
-            classificacoes[categoria] = self.classificar_categoria(categoria, pontuacoes[categoria], criterios_resultado)
+        classificacoes = self.classificar_categorias(criterios_resultado)
         
         # Pontuação média geral
         pontuacao_media = sum(pontuacoes.values()) / len(pontuacoes)
@@ -1034,9 +1403,13 @@ IMPORTANTE: Responda APENAS o JSON, sem explicações adicionais.
         # Gera justificativa
         justificativa = self.gerar_justificativa(classificacao_final, classificacoes, criterios_resultado, pontuacao_media)
         
+        # Cache e DataFrame guardam o texto da classificação
+        classificacao_final = classificacao_final.rotulo
+        
         # Salva no cache
         nome = dados_cliente.get('nome_completo', '')
-        self.save_result_cache(file_hash, nome, criterios_resultado, pontuacoes, classificacao_final, justificativa)
+        self.save_result_cache(file_hash, nome, criterios_resultado, pontuacoes, classificacao_final, justificativa,
+                               conteudo_hash)
         
         return self.montar_resultado_final(dados_cliente, criterios_resultado, pontuacoes, classificacao_final, justificativa, arquivo)
     
@@ -1045,15 +1418,14 @@ IMPORTANTE: Responda APENAS o JSON, sem explicações adicionais.
         """Monta estrutura final do resultado"""
         
         # Separa critérios por categoria
-        criterios_PA = {k: v for k, v in criterios_resultado.items() if k.startswith('PA')}
-        criterios_S = {k: v for k, v in criterios_resultado.items() if k.startswith('S')}
-        criterios_C = {k: v for k, v in criterios_resultado.items() if k.startswith('C')}
-        criterios_F = {k: v for k, v in criterios_resultado.items() if k.startswith('F')}
+        criterios_por_categoria = {}
+        for categoria, (inicio, quantidade) in FAIXAS_CATEGORIAS.items():
+            criterios_por_categoria[categoria] = {
+                k: criterios_resultado[k] for k in CRITERIOS[inicio:inicio + quantidade] if k in criterios_resultado
+            }
         
         # Classifica cada categoria
-        classificacoes = {}
-        for categoria in ['PA', 'S', 'C', 'F']:
-            classificacoes[categoria] = self.classificar_categoria(categoria, pontuacoes[categoria], criterios_resultado)
+        classificacoes = self.classificar_categorias(criterios_resultado)
         
         # Pontuação média
         pontuacao_media = sum(pontuacoes.values()) / len(pontuacoes)
@@ -1066,10 +1438,10 @@ IMPORTANTE: Responda APENAS o JSON, sem explicações adicionais.
             'curriculo_lattes': dados_cliente.get('curriculo_lattes', dados_cliente.get('link_lattes', '')),
             
             # Critérios por categoria separados
-            'criterios_PA': criterios_PA,
-            'criterios_S': criterios_S,
-            'criterios_C': criterios_C,
-            'criterios_F': criterios_F,
+            'criterios_PA': criterios_por_categoria['PA'],
+            'criterios_S': criterios_por_categoria['S'],
+            'criterios_C': criterios_por_categoria['C'],
+            'criterios_F': criterios_por_categoria['F'],
             
             # Critérios individuais (mantém para compatibilidade)
             'criterios_atendidos': criterios_resultado,
@@ -1082,10 +1454,10 @@ IMPORTANTE: Responda APENAS o JSON, sem explicações adicionais.
             'pontuacao_media': pontuacao_media,
             
             # Classificações por categoria
-            'classificacao_PA': classificacoes['PA'],
-            'classificacao_S': classificacoes['S'],
-            'classificacao_C': classificacoes['C'],
-            'classificacao_F': classificacoes['F'],
+            'classificacao_PA': classificacoes['PA'].name,
+            'classificacao_S': classificacoes['S'].name,
+            'classificacao_C': classificacoes['C'].name,
+            'classificacao_F': classificacoes['F'].name,
             
             # Fatores negativos
             'fator_N1': criterios_resultado.get('N1', False),
@@ -1100,106 +1472,178 @@ IMPORTANTE: Responda APENAS o JSON, sem explicações adicionais.
             'timestamp': datetime.now().isoformat()
         }
     
+    def _preparar_arquivo(self, arquivo: Path) -> Tuple[str, Any, str]:
+        """Prepara um arquivo: ('cache', resultado) | ('pendente', cliente p/ Gemini) | ('erro', None), + mensagem"""
+        try:
+            with open(arquivo, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            
+            if 'dados' not in data:
+                return 'erro', None, f"    ❌ {arquivo.name}: dados inválidos"
+            
+            dados_cliente = data['dados']
+            nome = dados_cliente.get('nome_completo', '')
+            
+            if not nome:
+                return 'erro', None, f"    ❌ {arquivo.name}: nome não encontrado"
+            
+            # Verifica cache individual
+            file_hash = self.gerar_hash_arquivo(str(arquivo))
+            cached_result = self.get_cached_result(file_hash)
+            
+            # Cache criado antes do BLAKE2b: procura pelo MD5 e migra a chave
+            if not cached_result and self._cache_tem_md5:
+                hash_md5 = self.gerar_hash_arquivo(str(arquivo), 'md5')
+                cached_result = self.get_cached_result(hash_md5)
+                if cached_result:
+                    self.migrar_hash_cache(hash_md5, file_hash)
+            
+            if cached_result:
+                resultado_cache = self.processar_resultado_cached(dados_cliente, cached_result, arquivo)
+                return 'cache', resultado_cache, f"    📋 {arquivo.name}: cache hit"
+            
+            # RETRIEVAL: Extrai evidências
+            evidencias = self.extrair_informacoes_relevantes(dados_cliente)
+            
+            # Arquivo mudou (formatação, campos fora do prompt) mas o conteúdo
+            # enviado ao Gemini é o mesmo: reaproveita a classificação
+            conteudo_hash = self.gerar_hash_conteudo(dados_cliente, evidencias)
+            cached_result = self.get_cached_result(file_hash, conteudo_hash)
+            
+            if cached_result:
+                self.save_result_cache(file_hash, nome, cached_result['criterios'], cached_result['pontuacoes'],
+                                       cached_result['classificacao_final'], cached_result['justificativa'],
+                                       conteudo_hash)
+                resultado_cache = self.processar_resultado_cached(dados_cliente, cached_result, arquivo)
+                return 'cache', resultado_cache, f"    📋 {arquivo.name}: cache hit (conteúdo)"
+            
+            cliente = {
+                'dados': dados_cliente,
+                'evidencias': evidencias,
+                'arquivo': arquivo,
+                'file_hash': file_hash,
+                'conteudo_hash': conteudo_hash
+            }
+            return 'pendente', cliente, f"    ✅ {arquivo.name}: {nome[:40]}"
+            
+        except Exception as e:
+            return 'erro', None, f"    ❌ {arquivo.name}: erro - {e}"
+    
     def processar_arquivos_batch(self, arquivos_json: List[Path]) -> pd.DataFrame:
         """Processa arquivos JSON em batches para otimizar custos"""
         
         print(f"🚀 Processando {len(arquivos_json)} arquivos em batches de {self.batch_size}...")
         
         resultados = []
-        total_batches = (len(arquivos_json) + self.batch_size - 1) // self.batch_size
         
-        for batch_idx in range(0, len(arquivos_json), self.batch_size):
-            batch_arquivos = arquivos_json[batch_idx:batch_idx + self.batch_size]
-            batch_num = (batch_idx // self.batch_size) + 1
-            
-            print(f"\n📦 BATCH {batch_num}/{total_batches} - {len(batch_arquivos)} arquivos:")
-            
-            # Prepara dados do batch
-            clientes_batch = []
+        # Prepara todos os arquivos antes de chamar o Gemini: cache hits saem direto,
+        # o restante forma batches completos
+        print(f"\n📂 Preparando arquivos...")
+        clientes_pendentes = []
+        
+        # Leitura, hash, consulta ao cache e retrieval em paralelo; map mantém a
+        # ordem dos arquivos (e das mensagens)
+        with ThreadPoolExecutor(max_workers=TRABALHADORES_PREPARACAO) as executor:
+            for tipo, valor, mensagem in executor.map(self._preparar_arquivo, arquivos_json):
+                print(mensagem)
+                if tipo == 'cache':
+                    resultados.append(valor)
+                elif tipo == 'pendente':
+                    clientes_pendentes.append(valor)
+        
+        # GENERATION: batches seguem em paralelo; o espaçamento fica a cargo
+        # do rate_limiter compartilhado em chamar_gemini_api. Cada batch é montado
+        # só na hora do envio, com o tamanho ajustado pelos batches anteriores
+        fila = deque(clientes_pendentes)
+        resultados_por_batch = {}
+        
+        with ThreadPoolExecutor(max_workers=self.max_concorrencia) as executor:
+            em_andamento = {}
+            batch_num = 0
             
-            for arquivo in batch_arquivos:
-                try:
-                    with open(arquivo, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    if 'dados' not in data:
-                        print(f"    ❌ {arquivo.name}: dados inválidos")
-                        continue
-                    
-                    dados_cliente = data['dados']
-                    nome = dados_cliente.get('nome_completo', '')
-                    
-                    if not nome:
-                        print(f"    ❌ {arquivo.name}: nome não encontrado")
-                        continue
-                    
-                    # Verifica cache individual
-                    file_hash = self.gerar_hash_arquivo(str(arquivo))
-                    cached_result = self.get_cached_result(file_hash)
+            while fila or em_andamento:
+                while fila and len(em_andamento) < self.max_concorrencia:
+                    tamanho = self.batch_size_atual
+                    clientes_batch = [fila.popleft() for _ in range(min(tamanho, len(fila)))]
+                    batch_num += 1
+                    print(f"\n📦 BATCH {batch_num} - {len(clientes_batch)} clientes enviado ao Gemini "
+                          f"(batch size atual: {tamanho}, restam {len(fila)})")
+                    futuro = executor.submit(self.classificar_batch_gemini, clientes_batch)
+                    em_andamento[futuro] = (batch_num, clientes_batch)
+                
+                concluidos, _ = wait(em_andamento, return_when=FIRST_COMPLETED)
+                
+                for futuro in concluidos:
+                    num, clientes_batch = em_andamento.pop(futuro)
+                    resultados_por_batch[num] = resultados_batch_final = []
                     
-                    if cached_result:
-                        print(f"    📋 {arquivo.name}: cache hit")
-                        resultado_cache = self.processar_resultado_cached(dados_cliente, cached_result, arquivo)
-                        resultados.append(resultado_cache)
+                    try:
+                        resultados_batch = futuro.result()
+                    except Exception as e:
+                        print(f"    ❌ Erro no batch: {e}")
                         continue
                     
-                    # RETRIEVAL: Extrai evidências
-                    evidencias = self.extrair_informacoes_relevantes(dados_cliente)
-                    
-                    clientes_batch.append({
-                        'dados': dados_cliente,
-                        'evidencias': evidencias,
-                        'arquivo': arquivo,
-                        'file_hash': file_hash
-                    })
-                    
-                    print(f"    ✅ {arquivo.name}: {nome[:40]}")
-                    
-                except Exception as e:
-                    print(f"    ❌ {arquivo.name}: erro - {e}")
-                    continue
-            
-            # Processa batch se houver clientes válidos
-            if clientes_batch:
-                try:
-                    # GENERATION: Gemini processa batch
-                    resultados_batch = self.classificar_batch_gemini(clientes_batch)
+                    # Pontua o batch inteiro de uma vez; valor inválido vindo do
+                    # modelo faz cair no cálculo por cliente (e no erro só daquele cliente)
+                    try:
+                        pontuacoes_batch = self.calcular_pontuacoes_batch(resultados_batch)
+                    except (TypeError, ValueError):
+                        pontuacoes_batch = [None] * len(resultados_batch)
                     
                     # Processa resultados individuais
-                    for i, (cliente_info, criterios_resultado) in enumerate(zip(clientes_batch, resultados_batch)):
+                    for i, (cliente_info, criterios_resultado, pontuacoes) in enumerate(
+                            zip(clientes_batch, resultados_batch, pontuacoes_batch)):
                         try:
                             resultado = self.processar_resultado_individual(
                                 cliente_info['dados'], 
                                 criterios_resultado, 
                                 cliente_info['arquivo'],
-                                cliente_info['file_hash']
+                                cliente_info['file_hash'],
+                                cliente_info['conteudo_hash'],
+                                pontuacoes
                             )
-                            resultados.append(resultado)
+                            resultados_batch_final.append(resultado)
                             
                         except Exception as e:
                             print(f"    ❌ Erro processando resultado {i+1}: {e}")
-                            
-                except Exception as e:
-                    print(f"    ❌ Erro no batch: {e}")
-                    continue
-            
-            # Rate limiting entre batches - MUITO mais conservador
-            if batch_num < total_batches:
-                if self.modo_conservador:
-                    delay_entre_batches = 10  # 10 segundos entre batches
-                else:
-                    delay_entre_batches = 5   # 5 segundos entre batches
-                
-                print(f"    ⏱️  Aguardando {delay_entre_batches}s antes do próximo batch...")
-                time.sleep(delay_entre_batches)
+                    
+                    self._flush_cache()
+        
+        # Resultados na ordem de envio dos batches, independente de qual terminou antes
+        for num in sorted(resultados_por_batch):
+            resultados.extend(resultados_por_batch[num])
         
         if not resultados:
             raise ValueError("Nenhum arquivo processado com sucesso")
         
-        # Cria DataFrame
-        df = pd.DataFrame(resultados)
-        df = df.sort_values('pontuacao_media', ascending=False).reset_index(drop=True)
-        df['rank'] = range(1, len(df) + 1)
+        return self.montar_dataframe_resultados(resultados)
+    
+    def montar_dataframe_resultados(self, resultados: List[Dict[str, Any]]) -> pd.DataFrame:
+        """Monta o DataFrame já ordenado por pontuação, via tabela Arrow por colunas"""
+        campos = list(dict.fromkeys(campo for resultado in resultados for campo in resultado))
+        colunas = {campo: [resultado.get(campo) for resultado in resultados] for campo in campos}
+        
+        # Ordenação em C sobre a coluna float64; os dicts seguem a mesma ordem
+        tabela = pa.table({campo.name: colunas.get(campo.name, [None] * len(resultados))
+                           for campo in ESQUEMA_RESULTADO}, schema=ESQUEMA_RESULTADO)
+        ordem = pc.sort_indices(tabela, sort_keys=[('pontuacao_media', 'descending')])
+        
+        df = tabela.take(ordem).to_pandas()
+        indices = ordem.to_numpy()
+        for campo in campos:
+            if campo.startswith('criterios_'):
+                # Colunas de critérios sempre com dict ({} quando ausente): a
+                # expansão no export não precisa checar tipo linha a linha
+                valores = colunas[campo]
+                df[campo] = [valores[i] if isinstance(valores[i], dict) else {} for i in indices]
+            elif campo not in ESQUEMA_RESULTADO.names:
+                df[campo] = [colunas[campo][i] for i in indices]
+        
+        df = df[campos]
+        df['rank'] = np.arange(1, len(df) + 1, dtype=np.int32)
+        
+        for categoria in CATEGORIAS:
+            df[f'classificacao_{categoria}'] = df[f'classificacao_{categoria}'].astype(TIPO_NIVEL)
         
         return df
     
@@ -1220,7 +1664,10 @@ IMPORTANTE: Responda APENAS o JSON, sem explicações adicionais.
         print(f"   💰 Economia estimada: ~{((len(arquivos_json) - len(arquivos_json)//self.batch_size) / len(arquivos_json)) * 100:.0f}% em custos de API")
         
         # Processa em batches
-        df_resultados = self.processar_arquivos_batch(arquivos_json)
+        try:
+            df_resultados = self.processar_arquivos_batch(arquivos_json)
+        finally:
+            self._flush_cache()
         
         print(f"\n✅ PROCESSAMENTO CONCLUÍDO:")
         print(f"   📊 {len(df_resultados)} clientes processados com sucesso")
@@ -1231,36 +1678,10 @@ IMPORTANTE: Responda APENAS o JSON, sem explicações adicionais.
     def exportar_resultados(self, df: pd.DataFrame, caminho_saida: str):
         """Exporta resultados para CSV com listas separadas por categoria"""
         
-        # Prepara DataFrame para export
-        df_export = df.copy()
-        
-        # Expande critérios PA em colunas individuais
-        for criterio_id in ['PA1', 'PA2', 'PA3', 'PA4']:
-            df_export[f'PA_{criterio_id}'] = df_export['criterios_PA'].apply(
-                lambda x: x.get(criterio_id, False) if isinstance(x, dict) else False
-            )
-        
-        # Expande critérios S em colunas individuais  
-        for criterio_id in ['S1', 'S2', 'S3']:
-            df_export[f'S_{criterio_id}'] = df_export['criterios_S'].apply(
-                lambda x: x.get(criterio_id, False) if isinstance(x, dict) else False
-            )
-        
-        # Expande critérios C em colunas individuais
-        for criterio_id in ['C1', 'C2', 'C3', 'C4', 'C5']:
-            df_export[f'C_{criterio_id}'] = df_export['criterios_C'].apply(
-                lambda x: x.get(criterio_id, False) if isinstance(x, dict) else False
-            )
-        
-        # Expande critérios F em colunas individuais
-        for criterio_id in ['F1', 'F2', 'F3', 'F4']:
-            df_export[f'F_{criterio_id}'] = df_export['criterios_F'].apply(
-                lambda x: x.get(criterio_id, False) if isinstance(x, dict) else False
-            )
-        
-        # Fatores negativos
-        df_export['N_N1'] = df_export['fator_N1']
-        df_export['N_N2'] = df_export['fator_N2']
+        # Expande os critérios de cada categoria em colunas individuais (PA_PA1, ..., F_F4)
+        # e os fatores negativos, tudo numa única concatenação
+        fatores_negativos = pd.DataFrame({'N_N1': df['fator_N1'], 'N_N2': df['fator_N2']}, index=df.index)
+        df_export = pd.concat([df, self.expandir_criterios(df), fatores_negativos], axis=1)
         
         # Reorganiza colunas na ordem desejada
         colunas_ordenadas = [
@@ -1281,89 +1702,72 @@ IMPORTANTE: Responda APENAS o JSON, sem explicações adicionais.
         ]
         
         # Seleciona apenas colunas que existem
-        colunas_existentes = [col for col in colunas_ordenadas if col in df_export.columns]
-        df_export = df_export[colunas_existentes]
+        df_export = df_export[pd.Index(colunas_ordenadas).intersection(df_export.columns, sort=False)]
         
         # Remove colunas complexas desnecessárias
         colunas_remover = ['criterios_atendidos', 'criterios_PA', 'criterios_S', 'criterios_C', 'criterios_F']
-        df_export = df_export.drop([col for col in colunas_remover if col in df_export.columns], axis=1)
+        df_export = df_export.drop(columns=colunas_remover, errors='ignore')
         
         # Limita texto longo
-        if 'linhas_pesquisa' in df_export.columns:
-            df_export['linhas_pesquisa'] = df_export['linhas_pesquisa'].str[:300]
-            
-        if 'justificativa_classificacao' in df_export.columns:
-            df_export['justificativa_classificacao'] = df_export['justificativa_classificacao'].str[:500]
+        self.limitar_textos(df_export)
         
         base_path = Path(caminho_saida).with_suffix('')
-        path_csv = f"{base_path}.csv"
-        path_json = f"{base_path}.json"
-        path_xlsx = f"{base_path}.xlsx"
-
-        df_export.to_csv(path_csv, index=False, encoding='utf-8')
-        df_export.to_json(path_json, orient='records', indent=4, force_ascii=False)
+        erro_excel = gravar_formatos(df_export, str(base_path))
         
-        try:
-            df_export.to_excel(path_xlsx, index=False, engine='openpyxl')
-            print(f"Resultados exportados para: {Path(base_path).name}.[csv, json, xlsx]")
-        except Exception as e:
-            print(f"  ❌ Falha ao exportar para Excel: {e}")
-            print(f"     - Arquivo: {path_xlsx}")
-            print("     - Verifique se a biblioteca 'openpyxl' está instalada e se há permissão de escrita no diretório.")
+        if erro_excel is None:
+            print(f"Resultados exportados para: {Path(base_path).name}.[{', '.join(FORMATOS_EXPORT)}]")
+        else:
+            print(f"  ❌ Falha ao exportar para Excel: {erro_excel}")
+            print(f"     - Arquivo: {base_path}.xlsx")
+            print("     - Verifique se a biblioteca 'xlsxwriter' (ou 'openpyxl') está instalada e se há permissão de escrita no diretório.")
+    
+    def limitar_textos(self, df: pd.DataFrame):
+        """Corta os textos longos do export (in-place); só as linhas acima do limite são fatiadas"""
+        for coluna, limite in LIMITES_TEXTO_EXPORT.items():
+            if coluna in df.columns:
+                longos = df[coluna].str.len() > limite
+                if longos.any():
+                    df.loc[longos, coluna] = df.loc[longos, coluna].str.slice(stop=limite)
     
     def segmentar_clientes(self, df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
         """Segmenta clientes em 5 listas baseado na melhor classificação"""
         
-        # Dicionário para armazenar as listas
-        listas = {
-            'PA': [],  # Produção de Proteína
-            'S': [],   # Síntese de Gene
-            'C': [],   # CFPS
-            'F': [],   # Fatores de Crescimento
-            'N': []    # Fatores Negativos
-        }
-        
-        for _, cliente in df.iterrows():
-            # Primeiro verifica fatores negativos
-            if cliente.get('fator_N1', False) or cliente.get('fator_N2', False):
-                listas['N'].append(cliente)
-                continue
-            
-            # Mapeia classificações para valores numéricos
-            classificacao_valores = {'ALTA': 3, 'MODERADA': 2, 'BAIXA': 1}
-            
-            # Coleta classificações das 4 categorias
-            categorias_classificacao = {
-                'PA': cliente.get('classificacao_PA', 'BAIXA'),
-                'S': cliente.get('classificacao_S', 'BAIXA'), 
-                'C': cliente.get('classificacao_C', 'BAIXA'),
-                'F': cliente.get('classificacao_F', 'BAIXA')
-            }
-            
-            # Encontra melhor classificação
-            melhor_valor = max(classificacao_valores[cls] for cls in categorias_classificacao.values())
-            melhores_categorias = [cat for cat, cls in categorias_classificacao.items() 
-                                 if classificacao_valores[cls] == melhor_valor]
-            
-            # Em caso de empate, usa ordem alfabética (C > F > PA > S)
-            ordem_desempate = ['C', 'F', 'PA', 'S']
-            categoria_escolhida = None
-            
-            for cat in ordem_desempate:
-                if cat in melhores_categorias:
-                    categoria_escolhida = cat
-                    break
-            
-            if categoria_escolhida:
-                listas[categoria_escolhida].append(cliente)
-        
-        # Converte listas em DataFrames e ordena alfabeticamente
+        # Colunas ausentes (ex.: DataFrame de outra versão) entram de uma vez com o
+        # padrão: BAIXA e sem fator negativo
+        padroes = {f'classificacao_{c}': Nivel.BAIXA.name for c in CATEGORIAS}
+        padroes.update({'fator_N1': False, 'fator_N2': False})
+        faltando = {coluna: valor for coluna, valor in padroes.items() if coluna not in df.columns}
+        if faltando:
+            df = df.assign(**faltando)
+        
+        # Fatores negativos têm prioridade sobre qualquer categoria
+        negativos = (df['fator_N1'].fillna(False).astype(bool) |
+                     df['fator_N2'].fillna(False).astype(bool)).to_numpy()
+        
+        # Matriz (clientes x categorias) com o código de cada classificação
+        # (ausente conta como BAIXA); a ordem das colunas é a de desempate
+        # (C > F > PA > S), já que argmax fica com o primeiro máximo
+        niveis = np.stack([
+            np.maximum(df[f'classificacao_{categoria}'].astype(TIPO_NIVEL).cat.codes.to_numpy(), 0)
+            for categoria in ORDEM_DESEMPATE
+        ], axis=1)
+        melhor_categoria = np.argmax(niveis, axis=1)
+        
+        mascaras = {categoria: ~negativos & (melhor_categoria == i)
+                    for i, categoria in enumerate(ORDEM_DESEMPATE)}
+        mascaras['N'] = negativos
+        
+        # Ordem alfabética calculada uma vez; cada lista é um único iloc sobre
+        # as posições dessa ordem que caem na sua máscara
+        ordem_nome = df['nome'].argsort(kind='stable').to_numpy()
+        
+        # Separa as listas e ordena alfabeticamente
         dfs_segmentados = {}
-        for categoria, clientes in listas.items():
-            if clientes:
-                df_categoria = pd.DataFrame(clientes).reset_index(drop=True)
-                df_categoria = df_categoria.sort_values('nome').reset_index(drop=True)
-                df_categoria['rank_categoria'] = range(1, len(df_categoria) + 1)
+        for categoria in ['PA', 'S', 'C', 'F', 'N']:
+            posicoes = ordem_nome[mascaras[categoria][ordem_nome]]
+            if len(posicoes) > 0:
+                df_categoria = df.iloc[posicoes].reset_index(drop=True)
+                df_categoria['rank_categoria'] = np.arange(1, len(df_categoria) + 1)
                 dfs_segmentados[categoria] = df_categoria
             else:
                 dfs_segmentados[categoria] = pd.DataFrame(columns=['nome', 'instituicao'])
@@ -1371,12 +1775,16 @@ IMPORTANTE: Responda APENAS o JSON, sem explicações adicionais.
         return dfs_segmentados
     
     def exportar_listas_separadas(self, df_geral: pd.DataFrame, output_dir: str, timestamp: str):
-        """Exporta listas separadas por categoria para CSV, JSON e Excel."""
+        """Exporta listas separadas por categoria nos formatos de FORMATOS_EXPORT (--formatos=)."""
 
         print(f"\n🔄 Segmentando clientes em listas especializadas...")
 
+        # Prepara o DataFrame geral uma única vez (critérios expandidos, textos
+        # limitados) e segmenta já no formato de export
+        df_geral_export = self.preparar_dataframe_export(df_geral)
+        
         # Segmenta clientes
-        listas_segmentadas = self.segmentar_clientes(df_geral)
+        listas_segmentadas = self.segmentar_clientes(df_geral_export)
 
         # Nomes das categorias
         nomes_categorias = {
@@ -1398,91 +1806,88 @@ IMPORTANTE: Responda APENAS o JSON, sem explicações adicionais.
 
         arquivos_gerados = []
         dfs_viaveis = []
-
-        # Exporta cada lista de categoria
-        for categoria, df_categoria in listas_segmentadas.items():
-            if len(df_categoria) > 0:
-                if categoria != 'N':
-                    dfs_viaveis.append(df_categoria)
-
-                nome_base = f"lista_{categoria}_{nomes_categorias[categoria]}"
-                caminho_base = f"{output_dir}/{nome_base}_{timestamp}"
-                df_export = self.preparar_dataframe_export(df_categoria.copy())
-
-                path_csv = f"{caminho_base}.csv"
-                path_json = f"{caminho_base}.json"
-                path_xlsx = f"{caminho_base}.xlsx"
-
-                df_export.to_csv(path_csv, index=False, encoding='utf-8')
-                df_export.to_json(path_json, orient='records', indent=4, force_ascii=False)
-                
-                try:
-                    df_export.to_excel(path_xlsx, index=False, engine='openpyxl')
-                    print(f"  ✅ {descricoes[categoria]:<35}: {len(df_export):3d} clientes → {Path(caminho_base).name}.[csv, json, xlsx]")
-                except Exception as e:
-                    print(f"  ❌ Falha ao exportar '{descricoes[categoria]}' para Excel: {e}")
-
-                arquivos_gerados.append({
-                    'categoria': categoria,
-                    'nome': descricoes[categoria],
-                    'arquivo': Path(path_csv).name,
-                    'total': len(df_categoria)
-                })
-            else:
-                print(f"  ⚪ {descricoes[categoria]:<35}: {0:3d} clientes → sem arquivo gerado")
-
-        if dfs_viaveis:
-            df_clientes_viaveis = pd.concat(dfs_viaveis, ignore_index=True).sort_values('pontuacao_media', ascending=False).reset_index(drop=True)
+        
+        # Todas as listas (e a consolidada) são gravadas em paralelo, uma por processo
+        # (a serialização do XLSX é Python puro e ficaria presa ao GIL); as mensagens
+        # saem depois, na ordem das categorias
+        with ProcessPoolExecutor(max_workers=min(len(listas_segmentadas) + 1, os.cpu_count() or 1)) as executor:
+            futuros = {}
+            for categoria, df_categoria in listas_segmentadas.items():
+                if len(df_categoria) > 0:
+                    nome_base = f"lista_{categoria}_{nomes_categorias[categoria]}"
+                    caminho_base = f"{output_dir}/{nome_base}_{timestamp}"
+                    if categoria != 'N':
+                        dfs_viaveis.append(df_categoria)
+                    
+                    futuros[categoria] = (caminho_base,
+                                          executor.submit(gravar_formatos, df_categoria, caminho_base, FORMATOS_EXPORT))
             
-            print("\n🔄 Exportando lista consolidada de clientes viáveis...")
-            nome_base_viaveis = f"lista_clientes_viaveis"
-            caminho_base_viaveis = f"{output_dir}/{nome_base_viaveis}_{timestamp}"
-            df_export_viaveis = self.preparar_dataframe_export(df_clientes_viaveis.copy())
-
-            path_csv_v = f"{caminho_base_viaveis}.csv"
-            path_json_v = f"{caminho_base_viaveis}.json"
-            path_xlsx_v = f"{caminho_base_viaveis}.xlsx"
-
-            df_export_viaveis.to_csv(path_csv_v, index=False, encoding='utf-8')
-            df_export_viaveis.to_json(path_json_v, orient='records', indent=4, force_ascii=False)
-
-            try:
-                df_export_viaveis.to_excel(path_xlsx_v, index=False, engine='openpyxl')
-                print(f"  ✅ {'Clientes Viáveis (Consolidado)':<35}: {len(df_export_viaveis):3d} clientes → {Path(caminho_base_viaveis).name}.[csv, json, xlsx]")
-            except Exception as e:
-                print(f"  ❌ Falha ao exportar 'Clientes Viáveis' para Excel: {e}")
+            futuro_viaveis = None
+            if dfs_viaveis:
+                df_export_viaveis = pd.concat(dfs_viaveis, ignore_index=True).sort_values('pontuacao_media', ascending=False).reset_index(drop=True)
+                nome_base_viaveis = f"lista_clientes_viaveis"
+                caminho_base_viaveis = f"{output_dir}/{nome_base_viaveis}_{timestamp}"
+                futuro_viaveis = executor.submit(gravar_formatos, df_export_viaveis, caminho_base_viaveis, FORMATOS_EXPORT)
+            
+            # Exporta cada lista de categoria
+            for categoria, df_categoria in listas_segmentadas.items():
+                if categoria in futuros:
+                    caminho_base, futuro = futuros[categoria]
+                    self._informar_export(descricoes[categoria], len(df_categoria), caminho_base, futuro.result())
+                    
+                    arquivos_gerados.append({
+                        'categoria': categoria,
+                        'nome': descricoes[categoria],
+                        'arquivo': Path(f"{caminho_base}.{FORMATOS_EXPORT[0]}").name,
+                        'total': len(df_categoria)
+                    })
+                else:
+                    print(f"  ⚪ {descricoes[categoria]:<35}: {0:3d} clientes → sem arquivo gerado")
+            
+            if futuro_viaveis is not None:
+                print("\n🔄 Exportando lista consolidada de clientes viáveis...")
+                self._informar_export('Clientes Viáveis (Consolidado)', len(df_export_viaveis),
+                                      caminho_base_viaveis, futuro_viaveis.result())
 
         return arquivos_gerados
     
-    def preparar_dataframe_export(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Prepara DataFrame para exportação"""
+    def _informar_export(self, descricao: str, total: int, caminho_base: str, erro_excel):
+        """Mensagem de uma lista exportada (ou da falha no Excel)"""
+        if erro_excel is None:
+            print(f"  ✅ {descricao:<35}: {total:3d} clientes → {Path(caminho_base).name}.[{', '.join(FORMATOS_EXPORT)}]")
+        else:
+            print(f"  ❌ Falha ao exportar '{descricao}' para Excel: {erro_excel}")
+    
+    def expandir_criterios(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Expande os dicts de critérios por categoria em colunas booleanas (PA_PA1, ..., F_F4)"""
+        colunas_criterios = []
         
-        # Expande critérios em colunas
-        for categoria, criterios in [('PA', ['PA1', 'PA2', 'PA3', 'PA4']),
-                                    ('S', ['S1', 'S2', 'S3']),
-                                    ('C', ['C1', 'C2', 'C3', 'C4', 'C5']),
-                                    ('F', ['F1', 'F2', 'F3', 'F4'])]:
-            for criterio_id in criterios:
-                df[f'{categoria}_{criterio_id}'] = df[f'criterios_{categoria}'].apply(
-                    lambda x: x.get(criterio_id, False) if isinstance(x, dict) else False
-                )
+        for categoria, (inicio, quantidade) in FAIXAS_CATEGORIAS.items():
+            criterios_categoria = list(CRITERIOS[inicio:inicio + quantidade])
+            
+            # Critério ausente do dict fica False
+            expandido = pd.DataFrame(df[f'criterios_{categoria}'].tolist(), index=df.index,
+                                     columns=criterios_categoria)
+            expandido = expandido.where(expandido.notna(), False).astype(bool)
+            colunas_criterios.append(expandido.add_prefix(f'{categoria}_'))
         
-        # Fatores negativos
-        df['N_N1'] = df['fator_N1']
-        df['N_N2'] = df['fator_N2']
+        return pd.concat(colunas_criterios, axis=1)
+    
+    def preparar_dataframe_export(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Prepara DataFrame para exportação"""
         
-        # Remove colunas complexas
+        # Remove colunas complexas e acrescenta, numa única concatenação, os
+        # critérios expandidos e os fatores negativos; o DataFrame de entrada
+        # não é alterado, então dispensa cópia prévia
         colunas_remover = ['criterios_atendidos', 'criterios_PA', 'criterios_S', 'criterios_C', 'criterios_F']
-        df = df.drop([col for col in colunas_remover if col in df.columns], axis=1)
+        fatores_negativos = pd.DataFrame({'N_N1': df['fator_N1'], 'N_N2': df['fator_N2']}, index=df.index)
+        df_export = pd.concat([df.drop(columns=colunas_remover, errors='ignore'),
+                               self.expandir_criterios(df), fatores_negativos], axis=1)
         
         # Limita texto longo
-        if 'linhas_pesquisa' in df.columns:
-            df['linhas_pesquisa'] = df['linhas_pesquisa'].str[:300]
-            
-        if 'justificativa_classificacao' in df.columns:
-            df['justificativa_classificacao'] = df['justificativa_classificacao'].str[:500]
+        self.limitar_textos(df_export)
         
-        return df
+        return df_export
     
     def imprimir_estatisticas(self, df: pd.DataFrame):
         """Imprime estatísticas do processamento"""
@@ -1497,19 +1902,19 @@ IMPORTANTE: Responda APENAS o JSON, sem explicações adicionais.
         
         # Distribuição por classificação final
         print(f"\nCLASSIFICAÇÃO FINAL DOS CLIENTES:")
-        classificacoes = ['CLIENTE ESTRATÉGICO', 'CLIENTE PRIORITÁRIO', 'CLIENTE REGULAR', 
-                         'CLIENTE BAIXA PRIORIDADE', 'CLIENTE INADEQUADO']
-        for classe in classificacoes:
-            count = len(df[df['classificacao_final'] == classe])
+        classificacoes = [cliente.rotulo for cliente in sorted(Cliente, reverse=True)]
+        contagens = df['classificacao_final'].value_counts().reindex(classificacoes, fill_value=0)
+        for classe, count in contagens.items():
             pct = (count / len(df)) * 100 if len(df) > 0 else 0
             print(f"  {classe:<25}: {count:3d} ({pct:4.1f}%)")
         
         # Pontuações médias por categoria
+        medias = df[[f'pontuacao_{c}' for c in CATEGORIAS]].mean()
         print(f"\nPONTUAÇÕES MÉDIAS POR CATEGORIA (0-10):")
-        print(f"  PA (Produção Proteína): {df['pontuacao_PA'].mean():.1f}")
-        print(f"  S  (Síntese Gene):       {df['pontuacao_S'].mean():.1f}")
-        print(f"  C  (CFPS):              {df['pontuacao_C'].mean():.1f}")
-        print(f"  F  (Fatores Crescim.):  {df['pontuacao_F'].mean():.1f}")
+        print(f"  PA (Produção Proteína): {medias['pontuacao_PA']:.1f}")
+        print(f"  S  (Síntese Gene):       {medias['pontuacao_S']:.1f}")
+        print(f"  C  (CFPS):              {medias['pontuacao_C']:.1f}")
+        print(f"  F  (Fatores Crescim.):  {medias['pontuacao_F']:.1f}")
         
         # Top 15 clientes
         print(f"\nTOP 15 CLIENTES:")
@@ -1555,7 +1960,7 @@ IMPORTANTE: Responda APENAS o JSON, sem explicações adicionais.
 
 
         print(f"\n✅ Segmentação concluída com sucesso!")
-        print(f"📁 Arquivos gerados nos formatos .csv, .json e .xlsx para cada categoria.")
+        print(f"📁 Arquivos gerados nos formatos {', '.join('.' + f for f in FORMATOS_EXPORT)} para cada categoria.")
 
 
 def main():
@@ -15,13 +15,19 @@ Data: 2025
 
 import asyncio
 import os
-import json
+import sys
+import orjson
 import time
 import re
+import random
+import shelve
+import unicodedata
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 
 # =============================================================================
 # CONFIGURAÇÃO API GOOGLE GEMINI
@@ -33,16 +39,22 @@ os.environ['GOOGLE_API_KEY'] = GOOGLE_API_KEY
 # IMPORTS E VERIFICAÇÃO DE DEPENDÊNCIAS
 # =============================================================================
 try:
-    from browser_use import Agent
+    from browser_use import Agent, BrowserSession
     from browser_use.llm.google import ChatGoogle
     print("✅ Browser-use e Gemini carregados com sucesso!")
 except ImportError as e:
     print(f"❌ Erro de importação: {e}")
     print("\n🔧 INSTALE AS DEPENDÊNCIAS:")
-    print("pip install browser-use google-generativeai pandas")
+    print("pip install browser-use google-generativeai pandas orjson")
     print("playwright install chromium")
     exit(1)
 
+# Opcional: busca rápida por HTTP (ORCID, página da FAPESP) antes do agente
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
 # =============================================================================
 # CONFIGURAÇÃO DE PASTAS
 # =============================================================================
@@ -53,77 +65,195 @@ PASTA_JSONS_INPUT = BASE_PATH / "Passo_2_json_extraido"
 PASTA_JSONS_OUTPUT = BASE_PATH / "Passo_5_json_final"
 PASTA_LOGS = BASE_PATH / "Logs_busca_email"
 
-DELAY_ENTRE_BUSCAS = 5  # segundos
+DELAY_ENTRE_BUSCAS = 5  # segundos, por busca simultânea (com variação aleatória)
+MAX_BUSCAS_PARALELAS = 3  # pesquisadores processados ao mesmo tempo (um navegador cada)
+
+USAR_CACHE = '--no-cache' not in sys.argv  # reaproveita emails encontrados em execuções anteriores
+VALIDADE_CACHE_DIAS = 7
+
+# Registro (JSONL, uma linha por email salvo) que permite retomar uma execução
+# interrompida: quem já está nele é pulado (--refazer processa todos de novo)
+ARQUIVO_CONCLUIDOS = 'emails_encontrados.jsonl'
+PULAR_CONCLUIDOS = '--refazer' not in sys.argv
+
+# Log das buscas: um JSONL por execução (buscas_<timestamp>.jsonl). A saída completa
+# do agente só entra com --log-completo; sem ele fica só o final dela
+LOG_COMPLETO = '--log-completo' in sys.argv
+LIMITE_LOG_RESUMIDO = 2000  # caracteres finais da saída do agente
+
+# Instituições com diretório público de email: o agente costuma achar em poucos passos,
+# então o teto de passos cai para FRACAO_PASSOS_INSTITUICAO_CONHECIDA do modelo
+REGEX_INSTITUICAO_CONHECIDA = re.compile(
+    r'\b(usp|unicamp|unesp|unifesp|ufscar|ufabc|universidade de sao paulo|'
+    r'universidade estadual de campinas|universidade estadual paulista|'
+    r'universidade federal de sao paulo|universidade federal de sao carlos|universidade federal do abc)\b'
+)
+FRACAO_PASSOS_INSTITUICAO_CONHECIDA = 0.5
+MIN_PASSOS_BUSCA = 10
+
+USAR_HTTP = '--no-http' not in sys.argv  # tenta ORCID/FAPESP por HTTP antes de abrir o navegador
+TIMEOUT_HTTP = 5  # segundos por requisição
+REGEX_ORCID = re.compile(r'\d{4}-\d{4}-\d{4}-\d{3}[\dX]')
+
+# A partir de quantos JSONs de entrada o índice é montado em vários processos
+MIN_JSONS_INDICE_PARALELO = 500
+
+# Pesquisadores por busca do agente (--lote=5 divide o custo fixo do prompt entre 5);
+# 1 mantém uma busca por pesquisador
+TAMANHO_LOTE = next((arg.split('=', 1)[1] for arg in sys.argv if arg.startswith('--lote=')), '1')
+if TAMANHO_LOTE.strip().isdigit() and int(TAMANHO_LOTE) >= 1:
+    TAMANHO_LOTE = int(TAMANHO_LOTE)
+else:
+    print(f"⚠️ --lote={TAMANHO_LOTE} inválido (use um número inteiro a partir de 1); usando 1")
+    TAMANHO_LOTE = 1
+
+# Emails rejeitados (genéricos/departamentos): parte antes do @ (ou seu último trecho
+# após ponto, como em ppg.secretaria@)
+EMAILS_GENERICOS = frozenset({
+    'secretaria', 'diretoria', 'contato', 'info', 'admin',
+    'atendimento', 'administracao', 'departamento', 'depto',
+    'webmaster', 'suporte', 'geral', 'coordenacao',
+    'pos-graduacao', 'posgrad'
+})
+REGEX_EMAIL = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+# Campos do FORMATO DE RESPOSTA (linha a linha, sem quebrar o texto em lista)
+REGEX_CAMPO_EMAIL = re.compile(r'📧 EMAIL:(.*?)(?=📧 EMAIL:|$)', re.MULTILINE)
+REGEX_VALIDACAO_SIM = re.compile(r'^(?=.*VALIDAÇÃO:).*Sim', re.MULTILINE)
+REGEX_LISTA_JSON = re.compile(r'\[\s*\{.*\}\s*\]', re.DOTALL)  # resposta da busca em lote
+REGEX_PONTUACAO = re.compile(r'[^\w\s]')
+REGEX_CARACTERE_ARQUIVO = re.compile(r'[^\w\s-]')
+REGEX_ESPACOS = re.compile(r'\s+')
+
+# Parte fixa do prompt de busca, igual para todos os pesquisadores. Vem antes dos
+# dados do pesquisador para que todas as tarefas comecem com o mesmo texto
+# (cache implícito de prefixo do Gemini)
+REGRAS_BUSCA_EMAIL = """
+⚠️ REGRAS RÍGIDAS:
+❌ REJEITAR emails genéricos: secretaria@, diretoria@, contato@, info@, admin@
+❌ REJEITAR emails de departamentos: depto@, coordenacao@, pos-graduacao@
+✅ ACEITAR apenas emails ESPECÍFICOS do pesquisador individual
+✅ Formatos válidos: nome@universidade.br, nome.sobrenome@email.com
+⏹️ Email confirmado: encerre a busca desse pesquisador na hora, sem passos extras
+"""
+
+INSTRUCOES_BUSCA_EMAIL = """
+🎯 MISSÃO: Encontrar o EMAIL ESPECÍFICO do pesquisador indicado no final
+
+📍 ESTRATÉGIA DE BUSCA:
+1. Busque no Google as buscas sugeridas abaixo (nome + email, contato, símbolo arroba @)
+2. Verifique site da instituição se conhecida
+3. Procure em perfis acadêmicos (Lattes, Google Scholar, ResearchGate)
+4. Tente variações do nome
+""" + REGRAS_BUSCA_EMAIL + """
+📋 FORMATO DE RESPOSTA OBRIGATÓRIO:
+**RESULTADO DA BUSCA**
+📧 EMAIL: [email específico encontrado OU "Não encontrado"]
+✅ VALIDAÇÃO: [Sim - é específico do pesquisador / Não - não encontrado]
+🔍 FONTE: [onde encontrou o email]
+
+⚡ IMPORTANTE: Se não encontrar email específico do pesquisador, responda exatamente "Não encontrado"
+"""
+
+INSTRUCOES_BUSCA_EMAIL_LOTE = """
+🎯 MISSÃO: Encontrar o EMAIL ESPECÍFICO de cada pesquisador da lista no final
+
+📍 ESTRATÉGIA DE BUSCA (para cada pesquisador, um de cada vez):
+1. Busque no Google: "nome do pesquisador" email / contato / @
+2. Verifique site da instituição se conhecida
+3. Procure em perfis acadêmicos (Lattes, Google Scholar, ResearchGate)
+4. Tente variações do nome
+""" + REGRAS_BUSCA_EMAIL + """
+📋 FORMATO DE RESPOSTA OBRIGATÓRIO (lista JSON, um item por pesquisador, nome igual ao da lista):
+[{"nome": "Nome do Pesquisador", "email": "email específico OU Não encontrado", "validado": true/false, "fonte": "onde encontrou"}]
+
+⚡ IMPORTANTE: Pesquisador sem email específico entra na lista com "email": "Não encontrado" e "validado": false
+"""
 
 # =============================================================================
 # MODELOS GEMINI DISPONÍVEIS
 # =============================================================================
+# Temperatura 0 em todos: busca factual, e a mesma tarefa gera sempre a mesma
+# resposta (permite reaproveitar respostas em cache)
 MODELOS_GEMINI = {
     "1": {
         "name": "gemini-2.5-pro",
         "display": "🚀 Gemini 2.5 Pro (Mais Avançado)",
-        "temperature": 0.1,
+        "temperature": 0.0,
         "max_steps": 40,
         "description": "Modelo mais poderoso, melhor para tarefas complexas"
     },
     "2": {
         "name": "gemini-2.5-flash", 
         "display": "⚡ Gemini 2.5 Flash (Recomendado)",
-        "temperature": 0.1,
+        "temperature": 0.0,
         "max_steps": 35,
         "description": "Equilibrio perfeito entre velocidade e qualidade"
     },
     "3": {
         "name": "gemini-2.5-flash-lite",
         "display": "🏃 Gemini 2.5 Flash Lite",
-        "temperature": 0.1,
+        "temperature": 0.0,
         "max_steps": 30,
         "description": "Versão mais rápida e econômica"
     },
     "4": {
         "name": "gemini-2.0-flash",
         "display": "🔥 Gemini 2.0 Flash",
-        "temperature": 0.1,
+        "temperature": 0.0,
         "max_steps": 35,
         "description": "Versão estável anterior"
     },
     "5": {
         "name": "gemini-2.0-flash-lite",
         "display": "💨 Gemini 2.0 Flash Lite", 
-        "temperature": 0.1,
+        "temperature": 0.0,
         "max_steps": 30,
         "description": "Versão lite da 2.0"
     },
     "6": {
         "name": "gemini-2.0-flash-exp",
         "display": "🧪 Gemini 2.0 Flash Experimental",
-        "temperature": 0.1,
+        "temperature": 0.0,
         "max_steps": 35,
         "description": "Recursos experimentais"
     },
     "7": {
         "name": "gemini-2.0-flash-lite-preview-02-05",
         "display": "👀 Gemini 2.0 Flash Lite Preview",
-        "temperature": 0.1,
+        "temperature": 0.0,
         "max_steps": 30,
         "description": "Preview da versão lite"
     },
     "8": {
         "name": "Gemini-2.0-exp",
         "display": "🔬 Gemini 2.0 Experimental",
-        "temperature": 0.1,
+        "temperature": 0.0,
         "max_steps": 35,
         "description": "Versão experimental completa"
     },
     "9": {
         "name": "gemma-3-27b-it",
         "display": "🤖 Gemma 3 27B IT",
-        "temperature": 0.2,
+        "temperature": 0.0,
         "max_steps": 30,
         "description": "Modelo Gemma especializado"
     }
 }
 
+# Leitura de um JSON de entrada para o índice: função de módulo para poder rodar
+# em outros processos (ProcessPoolExecutor)
+def ler_nome_json(arquivo: Path) -> Optional[Tuple[Path, str, frozenset]]:
+    """(arquivo, nome normalizado, tokens do nome) ou None se o JSON não tiver nome"""
+    try:
+        data = orjson.loads(arquivo.read_bytes())
+        if 'dados' in data and 'nome_completo' in data['dados']:
+            nome_completo = data['dados']['nome_completo']
+            return (arquivo, BuscadorEmailFAPESP._normalizar_nome(nome_completo),
+                    BuscadorEmailFAPESP._tokens_nome(nome_completo))
+    except Exception:
+        pass
+    return None
+
 # =============================================================================
 # CLASSE PRINCIPAL - BUSCADOR DE EMAILS
 # =============================================================================
@@ -152,6 +282,14 @@ class BuscadorEmailFAPESP:
         self.headless = headless
         self.use_vision = use_vision
         self.llm = None
+        self.cache = None  # shelve em PASTA_LOGS, aberto em executar_busca_completa()
+        self.registro_concluidos = None  # ARQUIVO_CONCLUIDOS aberto para append
+        self.log_buscas = None  # buscas_<timestamp>.jsonl desta execução
+        self.sessoes_browser = []  # navegadores abertos, reaproveitados entre buscas
+        self.sessoes_livres = asyncio.Queue()
+        self.cliente_http = None  # httpx.AsyncClient compartilhado, aberto na primeira busca HTTP
+        self.indice_json = None  # tokens do nome -> JSON, montado em _montar_indice_json()
+        self.nomes_json = None  # nomes em minúsculas indexados pelo JSON (busca parcial)
         
         # Estatísticas
         self.stats = {
@@ -187,6 +325,24 @@ class BuscadorEmailFAPESP:
             print(f"❌ Erro ao inicializar Gemini: {e}")
             raise
 
+    async def _obter_sessao_browser(self) -> BrowserSession:
+        """Pega um navegador livre; abre um novo só até MAX_BUSCAS_PARALELAS"""
+        if self.sessoes_livres.empty() and len(self.sessoes_browser) < MAX_BUSCAS_PARALELAS:
+            sessao = BrowserSession(headless=self.headless, keep_alive=True)
+            self.sessoes_browser.append(sessao)
+            return sessao
+        return await self.sessoes_livres.get()
+
+    async def fechar_browsers(self):
+        """Encerra os navegadores compartilhados"""
+        for sessao in self.sessoes_browser:
+            try:
+                await sessao.kill()
+            except Exception as e:
+                print(f"⚠️ Erro ao fechar navegador: {e}")
+        self.sessoes_browser.clear()
+        self.sessoes_livres = asyncio.Queue()
+
     # =========================================================================
     # MÉTODOS DE CARREGAMENTO DE DADOS
     # =========================================================================
@@ -202,44 +358,88 @@ class BuscadorEmailFAPESP:
             csv_path = arquivos_csv[0]
             print(f"📊 Carregando: {csv_path.name}")
             
-            df = pd.read_csv(csv_path, encoding='utf-8')
-            print(f"📋 Pesquisadores encontrados: {len(df)}")
+            # Só a coluna usada, já como texto
+            df = pd.read_csv(csv_path, encoding='utf-8', usecols=lambda coluna: coluna == 'nome',
+                             dtype={'nome': 'string'})
             
             if 'nome' not in df.columns:
                 print(f"❌ Coluna 'nome' não encontrada!")
-                print(f"Colunas disponíveis: {list(df.columns)}")
+                print(f"Colunas disponíveis: {list(pd.read_csv(csv_path, encoding='utf-8', nrows=0).columns)}")
                 return None
                 
+            # Nomes repetidos gerariam buscas repetidas
+            total_linhas = len(df)
+            df['nome'] = df['nome'].str.strip()
+            df = df[df['nome'].fillna('') != ''].drop_duplicates(subset=['nome'], ignore_index=True)
+            print(f"📋 Pesquisadores encontrados: {len(df)}")
+            if len(df) < total_linhas:
+                print(f"   ♻️ {total_linhas - len(df)} linhas vazias ou repetidas ignoradas")
+                
             return df
             
         except Exception as e:
             print(f"❌ Erro ao carregar CSV: {e}")
             return None
 
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _normalizar_nome(nome: str) -> str:
+        """Nome sem acentos, pontuação e maiúsculas (José = JOSE), calculado uma vez por nome"""
+        texto = unicodedata.normalize('NFKD', nome)
+        texto = ''.join(c for c in texto if not unicodedata.combining(c))
+        return REGEX_PONTUACAO.sub('', texto).casefold()
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _tokens_nome(nome: str) -> frozenset:
+        """Palavras do nome normalizado com mais de 2 letras"""
+        return frozenset(p for p in BuscadorEmailFAPESP._normalizar_nome(nome).split() if len(p) > 2)
+
+    def _montar_indice_json(self):
+        """Lê os JSONs de entrada uma única vez e indexa pelos tokens do nome"""
+        self.indice_json = {}
+        nomes = {}
+        try:
+            # Uma única listagem da pasta, em ordem de nome (resultado igual entre execuções)
+            with os.scandir(self.pasta_input) as entradas:
+                arquivos_json = sorted(Path(e.path) for e in entradas
+                                       if e.name.endswith('.json') and e.is_file())
+            # Muitos arquivos: leitura + normalização divididas entre os núcleos
+            if len(arquivos_json) >= MIN_JSONS_INDICE_PARALELO:
+                with ProcessPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+                    registros = list(executor.map(ler_nome_json, arquivos_json, chunksize=32))
+            else:
+                registros = [ler_nome_json(arquivo) for arquivo in arquivos_json]
+                
+            for registro in filter(None, registros):
+                arquivo, nome_normalizado, tokens = registro
+                self.indice_json.setdefault(tokens, arquivo)
+                nomes[arquivo] = nome_normalizado
+            print(f"📇 Índice de JSONs: {len(self.indice_json)} pesquisadores")
+        except Exception as e:
+            print(f"❌ Erro ao indexar JSONs: {e}")
+        self.nomes_json = pd.Series(nomes, dtype='string')
+
     def encontrar_json_pesquisador(self, nome_pesquisador: str) -> Optional[Path]:
         """Encontra o arquivo JSON correspondente ao pesquisador"""
         try:
-            arquivos_json = list(self.pasta_input.glob("*.json"))
+            if self.indice_json is None:
+                self._montar_indice_json()
             
-            # Limpar nome para comparação
-            nome_limpo = re.sub(r'[^\w\s]', '', nome_pesquisador).lower()
-            palavras_nome = [p for p in nome_limpo.split() if len(p) > 2]
+            palavras_nome = self._tokens_nome(nome_pesquisador)
+            arquivo = self.indice_json.get(palavras_nome)
             
-            for arquivo in arquivos_json:
-                try:
-                    with open(arquivo, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    if 'dados' in data and 'nome_completo' in data['dados']:
-                        nome_json = data['dados']['nome_completo'].lower()
-                        
-                        # Verificar correspondência de palavras
-                        if all(palavra in nome_json for palavra in palavras_nome):
-                            print(f"  📄 JSON encontrado: {arquivo.name}")
-                            return arquivo
-                            
-                except Exception:
-                    continue
+            # Sem correspondência exata: todas as palavras do CSV contidas no nome do JSON
+            if arquivo is None:
+                mascara = pd.Series(True, index=self.nomes_json.index)
+                for palavra in palavras_nome:
+                    mascara &= self.nomes_json.str.contains(palavra, regex=False)
+                candidatos = self.nomes_json.index[mascara.to_numpy()]
+                arquivo = candidatos[0] if len(candidatos) else None
+            
+            if arquivo is not None:
+                print(f"  📄 JSON encontrado: {arquivo.name}")
+                return arquivo
                     
             print(f"  ❌ JSON não encontrado para: {nome_pesquisador}")
             return None
@@ -248,125 +448,333 @@ class BuscadorEmailFAPESP:
             print(f"  ❌ Erro na busca do JSON: {e}")
             return None
 
+    # =========================================================================
+    # CACHE DE EMAILS
+    # =========================================================================
+    
+    def abrir_cache(self):
+        """Abre o cache de emails em disco (desligado com --no-cache)"""
+        if not USAR_CACHE:
+            print("🚫 Cache desativado")
+            return
+        try:
+            self.cache = shelve.open(str(self.pasta_logs / '.cache_emails'))
+            print(f"🗄️ Cache: {len(self.cache)} emails de execuções anteriores")
+        except Exception as e:
+            print(f"⚠️ Cache indisponível: {e}")
+            self.cache = None
+
+    def chave_cache(self, nome: str, instituicao: str = "") -> str:
+        """Nome + instituição sem acentos, maiúsculas ou espaços extras (variações de grafia caem na mesma chave)"""
+        texto = unicodedata.normalize('NFKD', f"{nome}|{instituicao}")
+        texto = ''.join(c for c in texto if not unicodedata.combining(c))
+        return ' '.join(texto.casefold().split())
+
+    def consultar_cache(self, nome: str, instituicao: str = "") -> Optional[str]:
+        """Email guardado para o pesquisador, ou None se ausente/expirado"""
+        if self.cache is None:
+            return None
+        entrada = self.cache.get(self.chave_cache(nome, instituicao))
+        if not entrada or time.time() - entrada['salvo_em'] > VALIDADE_CACHE_DIAS * 86400:
+            return None
+        return entrada['email']
+
+    def guardar_cache(self, nome: str, instituicao: str, email: str):
+        """Guarda um email encontrado (buscas sem sucesso são refeitas na próxima execução)"""
+        if self.cache is None:
+            return
+        self.cache[self.chave_cache(nome, instituicao)] = {'email': email, 'salvo_em': time.time()}
+
+    def fechar_cache(self):
+        """Grava e fecha o cache"""
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+
+    # =========================================================================
+    # REGISTRO DE CONCLUÍDOS (RETOMADA)
+    # =========================================================================
+    
+    def carregar_concluidos(self) -> set:
+        """Nomes com email já salvo em execuções anteriores"""
+        concluidos = set()
+        arquivo = self.pasta_logs / ARQUIVO_CONCLUIDOS
+        if not arquivo.exists():
+            return concluidos
+        with open(arquivo, 'rb') as f:
+            for linha in f:
+                try:
+                    concluidos.add(' '.join(orjson.loads(linha)['nome'].split()))
+                except Exception:
+                    continue  # linha cortada por uma interrupção
+        return concluidos
+
+    def abrir_registro_concluidos(self):
+        """Abre o registro para append sem buffer: cada linha vai ao disco na hora"""
+        try:
+            self.registro_concluidos = open(self.pasta_logs / ARQUIVO_CONCLUIDOS, 'ab', buffering=0)
+        except Exception as e:
+            print(f"⚠️ Registro de concluídos indisponível: {e}")
+            self.registro_concluidos = None
+
+    def registrar_concluido(self, nome: str, email: str, arquivo_saida: Path):
+        """Acrescenta o pesquisador ao registro (uma única escrita por linha)"""
+        if self.registro_concluidos is not None:
+            self.registro_concluidos.write(orjson.dumps({
+                'nome': nome, 'email': email, 'arquivo': arquivo_saida.name,
+                'salvo_em': datetime.now().isoformat()
+            }) + b"\n")
+
+    def fechar_registro_concluidos(self):
+        """Fecha o registro de concluídos"""
+        if self.registro_concluidos is not None:
+            self.registro_concluidos.close()
+            self.registro_concluidos = None
+
+    def abrir_log_buscas(self):
+        """Abre o log JSONL da execução (append sem buffer, uma escrita por busca)"""
+        try:
+            self.log_buscas = open(self.pasta_logs / f"buscas_{self.timestamp}.jsonl", 'ab', buffering=0)
+        except Exception as e:
+            print(f"⚠️ Log de buscas indisponível: {e}")
+            self.log_buscas = None
+
+    def fechar_log_buscas(self):
+        """Fecha o log de buscas"""
+        if self.log_buscas is not None:
+            self.log_buscas.close()
+            self.log_buscas = None
+
     # =========================================================================
     # MÉTODOS DE BUSCA DE EMAIL
     # =========================================================================
     
     def criar_prompt_busca_email(self, nome: str, instituicao: str = "") -> str:
         """Cria o prompt otimizado para busca de email"""
-        return f"""
-🎯 MISSÃO: Encontrar o EMAIL ESPECÍFICO do pesquisador
-
+        # Espaços normalizados: o mesmo pesquisador gera sempre o mesmo texto
+        nome = ' '.join(nome.split())
+        instituicao = ' '.join((instituicao or '').split())
+        # Instruções fixas primeiro; nome e instituição só no final
+        return INSTRUCOES_BUSCA_EMAIL + f"""
 👤 PESQUISADOR: {nome}
 🏢 INSTITUIÇÃO: {instituicao if instituicao else "Não informada"}
 
-📍 ESTRATÉGIA DE BUSCA:
-1. Busque no Google: "{nome}" email
-2. Busque no Google: "{nome}" contato
-3. Busque no Google: "{nome}" @ (símbolo arroba)
-4. Verifique site da instituição se conhecida
-5. Procure em perfis acadêmicos (Lattes, Google Scholar, ResearchGate)
-6. Tente variações do nome
+🔎 BUSCAS SUGERIDAS:
+1. "{nome}" email
+2. "{nome}" contato
+3. "{nome}" @
+"""
 
-⚠️ REGRAS RÍGIDAS:
-❌ REJEITAR emails genéricos: secretaria@, diretoria@, contato@, info@, admin@
-❌ REJEITAR emails de departamentos: depto@, coordenacao@, pos-graduacao@
-✅ ACEITAR apenas emails ESPECÍFICOS do pesquisador individual
-✅ Formatos válidos: nome@universidade.br, nome.sobrenome@email.com
+    def criar_prompt_busca_email_lote(self, lote: List[Tuple[str, str]]) -> str:
+        """Cria o prompt de busca para vários pesquisadores de uma vez"""
+        # Ordem por nome e espaços normalizados: o mesmo lote gera sempre o mesmo texto
+        lote = sorted((' '.join(nome.split()), ' '.join((instituicao or '').split())) for nome, instituicao in lote)
+        linhas = "\n".join(f"{i}. {nome} | {instituicao if instituicao else 'Não informada'}"
+                           for i, (nome, instituicao) in enumerate(lote, 1))
+        return INSTRUCOES_BUSCA_EMAIL_LOTE + f"""
+👥 PESQUISADORES (nome | instituição):
+{linhas}
+"""
 
-📋 FORMATO DE RESPOSTA OBRIGATÓRIO:
-**RESULTADO DA BUSCA**
-📧 EMAIL: [email específico encontrado OU "Não encontrado"]
-✅ VALIDAÇÃO: [Sim - é específico do pesquisador / Não - não encontrado]
-🔍 FONTE: [onde encontrou o email]
+    def _passos_busca(self, instituicao: str = "") -> int:
+        """Teto de passos do agente: menor para instituições com diretório público"""
+        max_steps = self.modelo_config['max_steps']
+        if instituicao and REGEX_INSTITUICAO_CONHECIDA.search(self._normalizar_nome(instituicao)):
+            return max(MIN_PASSOS_BUSCA, int(max_steps * FRACAO_PASSOS_INSTITUICAO_CONHECIDA))
+        return max_steps
 
-⚡ IMPORTANTE: Se não encontrar email específico do pesquisador, responda exatamente "Não encontrado"
-"""
+    async def buscar_email_http(self, nome: str, dados: Dict) -> Optional[str]:
+        """Procura o email no ORCID público e na página da FAPESP, sem navegador"""
+        if not USAR_HTTP or httpx is None:
+            return None
+            
+        urls = []
+        orcid = REGEX_ORCID.search(str(dados.get('orcid') or ''))
+        if orcid:
+            urls.append((f"https://pub.orcid.org/v3.0/{orcid.group(0)}/email", True))
+        if str(dados.get('url_fapesp') or '').startswith('http'):
+            urls.append((dados['url_fapesp'], False))
+        if not urls:
+            return None
+            
+        if self.cliente_http is None:
+            self.cliente_http = httpx.AsyncClient(
+                timeout=TIMEOUT_HTTP, follow_redirects=True,
+                headers={'Accept': 'application/json, text/html'},
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+            )
+            
+        tokens_nome = self._tokens_nome(nome)
+        for url, email_proprio in urls:
+            try:
+                resposta = await self.cliente_http.get(url)
+                if resposta.status_code != 200:
+                    continue
+                for email in REGEX_EMAIL.findall(resposta.text):
+                    if self._email_generico(email):
+                        continue
+                    # Fora do ORCID, só aceita email com parte do nome antes do @
+                    local = self._normalizar_nome(email.split('@', 1)[0])
+                    if email_proprio or any(token in local for token in tokens_nome):
+                        print(f"    ⚡ Email via HTTP: {email} ({url})")
+                        return email
+            except Exception as e:
+                print(f"    ⚠️ HTTP falhou ({url}): {e}")
+        return None
+
+    async def fechar_cliente_http(self):
+        """Encerra o cliente HTTP compartilhado"""
+        if self.cliente_http is not None:
+            await self.cliente_http.aclose()
+            self.cliente_http = None
 
-    async def buscar_email_pesquisador(self, nome: str, instituicao: str = "") -> str:
+    async def buscar_email_pesquisador(self, nome: str, instituicao: str = "", dados: Optional[Dict] = None) -> str:
         """Executa a busca de email usando Gemini + Browser-use"""
         print(f"  🔍 Buscando email: {nome}")
         
+        email_cache = self.consultar_cache(nome, instituicao)
+        if email_cache:
+            print(f"    🗄️ Email em cache: {email_cache}")
+            return email_cache
+            
+        email_http = await self.buscar_email_http(nome, dados or {})
+        if email_http:
+            await asyncio.to_thread(self._salvar_log_busca, nome, email_http, "HTTP (ORCID/FAPESP)", 0)
+            self.guardar_cache(nome, instituicao, email_http)
+            return email_http
+        
+        sessao = None
         try:
             prompt = self.criar_prompt_busca_email(nome, instituicao)
             
-            # Criar agente com configurações corretas
+            # Agente novo por busca, mas no navegador já aberto (sem reiniciar o browser)
+            sessao = await self._obter_sessao_browser()
             agent = Agent(
                 task=prompt,
                 llm=self.llm,
                 use_vision=self.use_vision,
-                headless=self.headless  # Configuração crítica para headless
+                browser_session=sessao
             )
             
-            print(f"    🚀 Executando busca com Gemini...")
-            resultado = await agent.run(max_steps=self.modelo_config['max_steps'])
+            passos = self._passos_busca(instituicao)
+            print(f"    🚀 Executando busca com Gemini (até {passos} passos)...")
+            resultado = await agent.run(max_steps=passos)
             
             # Processar e validar resultado
             email = self._extrair_email_do_resultado(str(resultado), nome)
             
-            # Salvar log da busca
-            self._salvar_log_busca(nome, email, str(resultado))
+            # Salvar log da busca (disco fora do event loop)
+            await asyncio.to_thread(self._salvar_log_busca, nome, email, str(resultado), passos)
+            
+            if email != "Não encontrado":
+                self.guardar_cache(nome, instituicao, email)
             
             return email
             
         except Exception as e:
             print(f"    ❌ ERRO na busca: {e}")
             return "Não encontrado"
+        finally:
+            if sessao is not None:
+                self.sessoes_livres.put_nowait(sessao)
+
+    async def buscar_emails_lote(self, lote: List[Tuple[str, str]]) -> Dict[str, str]:
+        """Busca os emails de um lote de pesquisadores numa única execução do agente"""
+        nomes = [nome for nome, _ in lote]
+        print(f"  🔍 Buscando emails em lote: {len(lote)} pesquisadores")
+        
+        sessao = None
+        try:
+            sessao = await self._obter_sessao_browser()
+            agent = Agent(
+                task=self.criar_prompt_busca_email_lote(lote),
+                llm=self.llm,
+                use_vision=self.use_vision,
+                browser_session=sessao
+            )
+            
+            passos = sum(self._passos_busca(instituicao) for _, instituicao in lote)
+            print(f"    🚀 Executando busca com Gemini (até {passos} passos)...")
+            resultado = await agent.run(max_steps=passos)
+            
+            # A lista JSON vem na resposta final do agente
+            texto = resultado.final_result() if hasattr(resultado, 'final_result') else None
+            emails = self._extrair_emails_do_lote(texto or str(resultado), nomes)
+            
+            for nome, instituicao in lote:
+                await asyncio.to_thread(self._salvar_log_busca, nome, emails[nome], str(resultado), passos)
+                if emails[nome] != "Não encontrado":
+                    self.guardar_cache(nome, instituicao, emails[nome])
+                    
+            return emails
+            
+        except Exception as e:
+            print(f"    ❌ ERRO na busca em lote: {e}")
+            return dict.fromkeys(nomes, "Não encontrado")
+        finally:
+            if sessao is not None:
+                self.sessoes_livres.put_nowait(sessao)
+
+    def _extrair_emails_do_lote(self, resultado: str, nomes: List[str]) -> Dict[str, str]:
+        """Extrai e valida os emails da lista JSON devolvida pela busca em lote"""
+        emails = dict.fromkeys(nomes, "Não encontrado")
+        try:
+            lista = REGEX_LISTA_JSON.search(resultado)
+            if not lista:
+                print(f"    ⚠️ Resposta do lote sem lista JSON")
+                return emails
+                
+            por_nome = {' '.join(nome.split()).casefold(): nome for nome in nomes}
+            for item in orjson.loads(lista.group(0)):
+                if not isinstance(item, dict):
+                    continue  # item malformado não derruba o resto do lote
+                nome = por_nome.get(' '.join(str(item.get('nome', '')).split()).casefold())
+                email = str(item.get('email', '')).strip()
+                validado = item.get('validado') is True or str(item.get('validado')).lower().startswith('sim')
+                
+                if not nome or email == "Não encontrado" or '@' not in email:
+                    continue
+                if self._email_generico(email):
+                    print(f"    ❌ Email rejeitado (genérico): {email}")
+                elif validado:
+                    print(f"    ✅ Email encontrado: {nome} → {email}")
+                    emails[nome] = email
+                    
+        except Exception as e:
+            print(f"    ❌ Erro ao processar resultado do lote: {e}")
+        return emails
+
+    @staticmethod
+    def _email_generico(email: str) -> bool:
+        """Email de secretaria/departamento em vez do pesquisador"""
+        local = email.lower().split('@', 1)[0].strip(' [("\'').rstrip('.')
+        return local in EMAILS_GENERICOS or local.rsplit('.', 1)[-1] in EMAILS_GENERICOS
 
     def _extrair_email_do_resultado(self, resultado: str, nome_pesquisador: str) -> str:
         """Extrai e valida o email do resultado da busca"""
         try:
-            # Lista de emails genéricos para rejeitar
-            emails_genericos = [
-                'secretaria@', 'diretoria@', 'contato@', 'info@', 'admin@',
-                'atendimento@', 'administracao@', 'departamento@', 'depto@',
-                'webmaster@', 'suporte@', 'geral@', 'coordenacao@',
-                'pos-graduacao@', 'posgrad@', 'secretaria.@'
-            ]
-            
-            linhas = resultado.split('\n')
-            email_validado = False
-            email_encontrado = None
-            
-            # Verificar validação
-            for linha in linhas:
-                if 'VALIDAÇÃO:' in linha and 'Sim' in linha:
-                    email_validado = True
-                    break
-                    
+            email_validado = None  # só procura a VALIDAÇÃO se houver email candidato
+            
             # Extrair email
-            for linha in linhas:
-                linha = linha.strip()
+            for campo in REGEX_CAMPO_EMAIL.finditer(resultado):
+                email = campo.group(1).strip()
                 
-                if '📧 EMAIL:' in linha:
-                    email = linha.split('📧 EMAIL:')[1].strip()
-                    
-                    if email and email != "Não encontrado" and '@' in email:
-                        # Verificar se não é genérico
-                        email_valido = True
-                        for generico in emails_genericos:
-                            if generico in email.lower():
-                                email_valido = False
-                                print(f"    ❌ Email rejeitado (genérico): {email}")
-                                break
-                                
-                        if email_valido and email_validado:
-                            print(f"    ✅ Email encontrado: {email}")
-                            return email
+                if email and email != "Não encontrado" and '@' in email:
+                    # Verificar se não é genérico
+                    email_valido = not self._email_generico(email)
+                    if not email_valido:
+                        print(f"    ❌ Email rejeitado (genérico): {email}")
+                        
+                    if email_validado is None:
+                        email_validado = REGEX_VALIDACAO_SIM.search(resultado) is not None
+                            
+                    if email_valido and email_validado:
+                        print(f"    ✅ Email encontrado: {email}")
+                        return email
                             
             # Busca alternativa por padrões de email
-            import re
-            email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-            emails_encontrados = re.findall(email_pattern, resultado)
-            
-            for email in emails_encontrados:
-                email_valido = True
-                for generico in emails_genericos:
-                    if generico in email.lower():
-                        email_valido = False
-                        break
-                        
-                if email_valido:
+            for email in REGEX_EMAIL.findall(resultado):
+                if not self._email_generico(email):
                     print(f"    ✅ Email extraído: {email}")
                     return email
                     
@@ -384,9 +792,9 @@ class BuscadorEmailFAPESP:
     async def processar_pesquisador(self, nome: str, json_path: Path) -> bool:
         """Processa um pesquisador completo: busca email e salva resultado"""
         try:
-            # Carregar dados do pesquisador
-            with open(json_path, 'r', encoding='utf-8') as f:
-                dados_pesquisador = json.load(f)
+            # Carregar dados do pesquisador (leituras e gravações fora do event loop,
+            # para não travar as outras buscas em andamento)
+            dados_pesquisador = orjson.loads(await asyncio.to_thread(json_path.read_bytes))
                 
             instituicao = dados_pesquisador.get('dados', {}).get('instituicao_vinculo', '')
             
@@ -400,10 +808,10 @@ class BuscadorEmailFAPESP:
             if email_atual != 'Não encontrado' and '@' in email_atual:
                 print(f"  ✅ Email já existe: {email_atual}")
                 self.stats["emails_ja_existiam"] += 1
-                return self._salvar_json_com_email(dados_pesquisador, nome, email_atual)
+                return await asyncio.to_thread(self._salvar_json_com_email, dados_pesquisador, nome, email_atual)
             
             # Buscar novo email
-            email_encontrado = await self.buscar_email_pesquisador(nome, instituicao)
+            email_encontrado = await self.buscar_email_pesquisador(nome, instituicao, dados_pesquisador.get('dados', {}))
             
             # Atualizar estatísticas
             if email_encontrado != "Não encontrado":
@@ -411,19 +819,65 @@ class BuscadorEmailFAPESP:
             else:
                 self.stats["emails_nao_encontrados"] += 1
                 
-            return self._salvar_json_com_email(dados_pesquisador, nome, email_encontrado)
+            return await asyncio.to_thread(self._salvar_json_com_email, dados_pesquisador, nome, email_encontrado)
             
         except Exception as e:
             print(f"  ❌ Erro ao processar: {e}")
             self.stats["erros"] += 1
             return False
 
-    def _salvar_json_com_email(self, dados_originais: Dict, nome: str, email: str) -> bool:
-        """Salva o JSON com o email adicionado/atualizado"""
+    async def processar_lote(self, lote: List[Tuple[str, Path]]):
+        """Processa um lote de pesquisadores: só os sem email e fora do cache vão para a busca"""
+        pendentes = []
+        for nome, json_path in lote:
+            try:
+                dados_pesquisador = orjson.loads(await asyncio.to_thread(json_path.read_bytes))
+                instituicao = dados_pesquisador.get('dados', {}).get('instituicao_vinculo', '')
+                email_atual = dados_pesquisador.get('dados', {}).get('email_contato', 'Não encontrado')
+                
+                if email_atual != 'Não encontrado' and '@' in email_atual:
+                    print(f"  ✅ Email já existe: {nome} → {email_atual}")
+                    self.stats["emails_ja_existiam"] += 1
+                    await asyncio.to_thread(self._salvar_json_com_email, dados_pesquisador, nome, email_atual)
+                    continue
+                    
+                email_cache = self.consultar_cache(nome, instituicao)
+                if email_cache:
+                    print(f"  🗄️ Email em cache: {nome} → {email_cache}")
+                    self.stats["emails_encontrados"] += 1
+                    await asyncio.to_thread(self._salvar_json_com_email, dados_pesquisador, nome, email_cache)
+                    continue
+                    
+                email_http = await self.buscar_email_http(nome, dados_pesquisador.get('dados', {}))
+                if email_http:
+                    self.stats["emails_encontrados"] += 1
+                    await asyncio.to_thread(self._salvar_log_busca, nome, email_http, "HTTP (ORCID/FAPESP)", 0)
+                    self.guardar_cache(nome, instituicao, email_http)
+                    await asyncio.to_thread(self._salvar_json_com_email, dados_pesquisador, nome, email_http)
+                    continue
+                    
+                pendentes.append((nome, instituicao, dados_pesquisador))
+                
+            except Exception as e:
+                print(f"  ❌ Erro ao processar {nome}: {e}")
+                self.stats["erros"] += 1
+                
+        if not pendentes:
+            return
+            
+        emails = await self.buscar_emails_lote([(nome, instituicao) for nome, instituicao, _ in pendentes])
+        
+        for nome, _, dados_pesquisador in pendentes:
+            if emails[nome] != "Não encontrado":
+                self.stats["emails_encontrados"] += 1
+            else:
+                self.stats["emails_nao_encontrados"] += 1
+            await asyncio.to_thread(self._salvar_json_com_email, dados_pesquisador, nome, emails[nome])
+
+    def _salvar_json_com_email(self, dados_atualizados: Dict, nome: str, email: str) -> bool:
+        """Salva o JSON com o email adicionado/atualizado (altera o próprio dicionário recebido)"""
         try:
             # Preparar dados atualizados
-            dados_atualizados = dados_originais.copy()
-            
             if 'dados' not in dados_atualizados:
                 dados_atualizados['dados'] = {}
                 
@@ -445,8 +899,9 @@ class BuscadorEmailFAPESP:
             arquivo_saida = self.pasta_output / f"{nome_arquivo}_email_{self.timestamp}.json"
             
             # Salvar arquivo
-            with open(arquivo_saida, 'w', encoding='utf-8') as f:
-                json.dump(dados_atualizados, f, ensure_ascii=False, indent=2)
+            arquivo_saida.write_bytes(orjson.dumps(dados_atualizados, option=orjson.OPT_INDENT_2))
+            if email != "Não encontrado":
+                self.registrar_concluido(nome, email, arquivo_saida)
                 
             status_icon = "✅" if email != "Não encontrado" else "⚠️"
             print(f"    {status_icon} Salvo: {arquivo_saida.name}")
@@ -458,8 +913,10 @@ class BuscadorEmailFAPESP:
             print(f"    ❌ Erro ao salvar: {e}")
             return False
 
-    def _salvar_log_busca(self, nome: str, email: str, resultado_completo: str):
-        """Salva log detalhado da busca"""
+    def _salvar_log_busca(self, nome: str, email: str, resultado_completo: str, passos: Optional[int] = None):
+        """Acrescenta a busca ao log JSONL da execução"""
+        if self.log_buscas is None:
+            return
         try:
             log_data = {
                 "timestamp": datetime.now().isoformat(),
@@ -469,28 +926,29 @@ class BuscadorEmailFAPESP:
                     "headless": self.headless,
                     "use_vision": self.use_vision,
                     "temperatura": self.modelo_config['temperature'],
-                    "max_steps": self.modelo_config['max_steps']
+                    "max_steps": passos if passos is not None else self.modelo_config['max_steps']
                 },
                 "resultado": {
                     "email_encontrado": email,
                     "sucesso": email != "Não encontrado"
                 },
-                "log_completo": resultado_completo
             }
+            if LOG_COMPLETO:
+                log_data["log_completo"] = resultado_completo
+            else:
+                log_data["log_final"] = resultado_completo[-LIMITE_LOG_RESUMIDO:]
             
-            nome_arquivo = self._criar_nome_arquivo_seguro(nome)
-            arquivo_log = self.pasta_logs / f"busca_{nome_arquivo}_{self.timestamp}.json"
-            
-            with open(arquivo_log, 'w', encoding='utf-8') as f:
-                json.dump(log_data, f, ensure_ascii=False, indent=2)
+            self.log_buscas.write(orjson.dumps(log_data) + b"\n")
                 
         except Exception as e:
             print(f"    ⚠️ Erro ao salvar log: {e}")
 
-    def _criar_nome_arquivo_seguro(self, nome: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _criar_nome_arquivo_seguro(nome: str) -> str:
         """Cria nome de arquivo seguro removendo caracteres especiais"""
-        nome_limpo = re.sub(r'[^\w\s-]', '', nome)
-        nome_seguro = re.sub(r'\s+', '_', nome_limpo.strip())
+        nome_limpo = REGEX_CARACTERE_ARQUIVO.sub('', nome)
+        nome_seguro = REGEX_ESPACOS.sub('_', nome_limpo.strip())
         return nome_seguro[:50]  # Limitar tamanho
 
     # =========================================================================
@@ -505,11 +963,20 @@ class BuscadorEmailFAPESP:
         print("="*70)
         
         # Carregar dados
-        df_pesquisadores = self.carregar_csv_pesquisadores()
+        df_pesquisadores = await asyncio.to_thread(self.carregar_csv_pesquisadores)
         if df_pesquisadores is None:
             return False
             
         pesquisadores = df_pesquisadores['nome'].tolist()
+        
+        # Retomada: pula quem já teve email salvo numa execução anterior
+        if PULAR_CONCLUIDOS:
+            concluidos = await asyncio.to_thread(self.carregar_concluidos)
+            restantes = [nome for nome in pesquisadores if ' '.join(nome.split()) not in concluidos]
+            if len(restantes) < len(pesquisadores):
+                print(f"⏭️ {len(pesquisadores) - len(restantes)} pesquisadores já concluídos (use --refazer para repetir)")
+            pesquisadores = restantes
+            
         total_pesquisadores = len(pesquisadores)
         
         # Mostrar configuração
@@ -518,6 +985,8 @@ class BuscadorEmailFAPESP:
         print(f"   🖥️ Browser: {'Headless (invisível)' if self.headless else 'Visível'}")
         print(f"   👁️ Visão: {'Ativada' if self.use_vision else 'Desativada'}")
         print(f"   📊 Total de pesquisadores: {total_pesquisadores}")
+        if TAMANHO_LOTE > 1:
+            print(f"   📦 Lote: {TAMANHO_LOTE} pesquisadores por busca")
         
         # Confirmação
         if not self._confirmar_execucao(total_pesquisadores):
@@ -527,29 +996,81 @@ class BuscadorEmailFAPESP:
         print(f"\n🚀 INICIANDO PROCESSAMENTO...")
         tempo_inicio = time.time()
         
-        for indice, nome in enumerate(pesquisadores, 1):
-            print(f"\n[{indice}/{total_pesquisadores}] {nome}")
-            self.stats["total_processados"] += 1
-            
-            try:
-                # Encontrar JSON correspondente
-                json_path = self.encontrar_json_pesquisador(nome)
-                if not json_path:
-                    print(f"  ❌ Pulando - JSON não encontrado")
+        # Buscas são quase só espera (navegador + Gemini): até MAX_BUSCAS_PARALELAS
+        # pesquisadores ao mesmo tempo
+        semaforo = asyncio.Semaphore(MAX_BUSCAS_PARALELAS)
+        self.abrir_cache()
+        self.abrir_registro_concluidos()
+        self.abrir_log_buscas()
+        await asyncio.to_thread(self._montar_indice_json)
+        
+        async def processar_com_limite(indice: int, nome: str):
+            async with semaforo:
+                print(f"\n[{indice}/{total_pesquisadores}] {nome}")
+                self.stats["total_processados"] += 1
+                
+                try:
+                    # Encontrar JSON correspondente no índice
+                    json_path = self.encontrar_json_pesquisador(nome)
+                    if not json_path:
+                        print(f"  ❌ Pulando - JSON não encontrado")
+                        self.stats["erros"] += 1
+                        return
+                        
+                    # Processar pesquisador
+                    await self.processar_pesquisador(nome, json_path)
+                    
+                except Exception as e:
+                    print(f"  ❌ ERRO CRÍTICO: {e}")
                     self.stats["erros"] += 1
-                    continue
                     
-                # Processar pesquisador
-                await self.processar_pesquisador(nome, json_path)
-                
-            except Exception as e:
-                print(f"  ❌ ERRO CRÍTICO: {e}")
-                self.stats["erros"] += 1
+                await pausar(indice, total_pesquisadores)
+        
+        async def processar_lote_com_limite(indice: int, lote: List[str], total_lotes: int):
+            async with semaforo:
+                print(f"\n[lote {indice}/{total_lotes}] {len(lote)} pesquisadores")
                 
-            # Pausa entre buscas
-            if indice < total_pesquisadores:
-                print(f"  ⏳ Pausando {DELAY_ENTRE_BUSCAS}s...")
-                await asyncio.sleep(DELAY_ENTRE_BUSCAS)
+                encontrados = []
+                for nome in lote:
+                    self.stats["total_processados"] += 1
+                    json_path = self.encontrar_json_pesquisador(nome)
+                    if json_path:
+                        encontrados.append((nome, json_path))
+                    else:
+                        print(f"  ❌ Pulando {nome} - JSON não encontrado")
+                        self.stats["erros"] += 1
+                        
+                try:
+                    await self.processar_lote(encontrados)
+                except Exception as e:
+                    print(f"  ❌ ERRO CRÍTICO: {e}")
+                    self.stats["erros"] += 1
+                    
+                await pausar(indice, total_lotes)
+        
+        async def pausar(indice: int, total: int):
+            # Pausa antes de liberar a vaga, com variação para não sincronizar as buscas
+            if indice < total:
+                pausa = DELAY_ENTRE_BUSCAS * random.uniform(0.5, 1.5)
+                print(f"  ⏳ Pausando {pausa:.1f}s...")
+                await asyncio.sleep(pausa)
+        
+        if TAMANHO_LOTE > 1:
+            lotes = [pesquisadores[i:i + TAMANHO_LOTE] for i in range(0, total_pesquisadores, TAMANHO_LOTE)]
+            tarefas = [processar_lote_com_limite(indice, lote, len(lotes))
+                       for indice, lote in enumerate(lotes, 1)]
+        else:
+            tarefas = [processar_com_limite(indice, nome)
+                       for indice, nome in enumerate(pesquisadores, 1)]
+        
+        try:
+            await asyncio.gather(*tarefas)
+        finally:
+            self.fechar_cache()
+            self.fechar_registro_concluidos()
+            self.fechar_log_buscas()
+            await self.fechar_browsers()
+            await self.fechar_cliente_http()
                 
         # Relatório final
         self._mostrar_relatorio_final(time.time() - tempo_inicio)
@@ -688,7 +1209,7 @@ async def main():
     except Exception as e:
         print(f"\n💥 ERRO CRÍTICO: {e}")
         print("\n🔧 Verifique se as dependências estão instaladas:")
-        print("pip install browser-use google-generativeai pandas")
+        print("pip install browser-use google-generativeai pandas orjson")
         print("playwright install chromium")
 
 # =============================================================================